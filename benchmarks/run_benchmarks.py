@@ -0,0 +1,366 @@
+# ======================================================
+# 🏎️ MIDAS BENCHMARKS
+# Offline timings for the trading hot paths:
+#   • log_trade with 1k / 100k entries already journaled
+#   • update_capital
+#   • paper exchange market orders (batched fill journal)
+#   • a full live trading cycle across N pairs
+#     (FakeExchange + polling feed + TradingSession)
+#   • one optimizer config evaluation (cold / cached)
+#   • cold start: importing the live trading module in
+#     a fresh interpreter
+# Telegram goes to a local stub HTTP server and every
+# data file lives in a temp directory, so nothing real
+# is touched. Results are written as JSON; pass
+# --compare old.json to see the change per benchmark.
+#
+#   python -m benchmarks.run_benchmarks [--quick] [--pairs 3,10,50]
+# ======================================================
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BASE_DIR)
+RESULTS_DIR = os.path.join(BASE_DIR, "results")
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+import numpy as np
+
+from core import midas_capital_tracker, midas_daily_summary, midas_durable, midas_markets, midas_notifier
+from core import midas_paper_exchange, midas_positions, midas_telegram, midas_trade_journal
+from core.midas_capital_tracker import CapitalLedger, update_capital
+from core.midas_daily_summary import DailyAggregator
+from core.midas_fake_exchange import FakeExchange
+from core.midas_feed import PollingFeed
+from core.midas_logger import log_trade
+from core.midas_notifier import TelegramDispatcher
+from core.midas_paper_exchange import PaperExchange
+from core.midas_positions import PositionBook
+from core.midas_session import TradingSession
+from core.midas_trade_journal import TradeJournal
+from extras.midas_backtest_engine import run_backtest_with_params
+from extras.midas_indicator_cache import IndicatorCache
+
+
+# ======================================================
+# 📬 TELEGRAM STUB
+# ======================================================
+class _TelegramStub(BaseHTTPRequestHandler):
+    requests_seen = 0
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        type(self).requests_seen += 1
+        body = b'{"ok": true, "result": {}}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@contextlib.contextmanager
+def telegram_stub():
+    """Local sendMessage endpoint; yields the server so callers can read the request count."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _TelegramStub)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# ======================================================
+# 🧪 ISOLATED STATE
+# ======================================================
+@contextlib.contextmanager
+def isolated_state(telegram_url):
+    """
+    Points every process-wide store (journal, capital, positions, paper fills,
+    daily aggregates, markets caches) at a temp directory and Telegram at the stub, then restores them.
+    """
+    saved = {
+        (midas_trade_journal, "_journal"): midas_trade_journal._journal,
+        (midas_capital_tracker, "_ledger"): midas_capital_tracker._ledger,
+        (midas_positions, "_book"): midas_positions._book,
+        (midas_paper_exchange, "_paper"): midas_paper_exchange._paper,
+        (midas_daily_summary, "_aggregator"): midas_daily_summary._aggregator,
+        (midas_notifier, "_dispatcher"): midas_notifier._dispatcher,
+        (midas_markets, "_caches"): midas_markets._caches,
+        (midas_markets, "_default"): midas_markets._default,
+        (midas_markets, "MARKETS_CACHE_DIR"): midas_markets.MARKETS_CACHE_DIR,
+        (midas_telegram, "BOT_TOKEN"): midas_telegram.BOT_TOKEN,
+        (midas_telegram, "CHAT_ID"): midas_telegram.CHAT_ID,
+        (midas_telegram, "TELEGRAM_API_URL"): midas_telegram.TELEGRAM_API_URL,
+    }
+    with tempfile.TemporaryDirectory(prefix="midas-bench-") as tmp:
+        midas_trade_journal._journal = TradeJournal(os.path.join(tmp, "trade_log.jsonl"), legacy_path=None)
+        midas_capital_tracker._ledger = CapitalLedger(os.path.join(tmp, "capital.json"))
+        midas_positions._book = PositionBook(os.path.join(tmp, "positions.json"))
+        midas_paper_exchange._paper = PaperExchange(balances={"USDT": 1e9},
+                                                    fills_path=os.path.join(tmp, "paper_fills.jsonl"),
+                                                    balances_path=os.path.join(tmp, "paper_balances.json"))
+        midas_daily_summary._aggregator = DailyAggregator(os.path.join(tmp, "aggregates.json"))
+        midas_markets._caches, midas_markets._default, midas_markets.MARKETS_CACHE_DIR = {}, None, tmp
+        midas_telegram.BOT_TOKEN, midas_telegram.CHAT_ID = "bench", "1"
+        midas_telegram.TELEGRAM_API_URL = f"{telegram_url}/botbench/sendMessage"
+        midas_notifier._dispatcher = TelegramDispatcher(min_interval=0.0, digest_window=0.0).start()
+        try:
+            yield tmp
+        finally:
+            midas_notifier._dispatcher.stop(timeout=5.0)
+            midas_capital_tracker._ledger.close()
+            midas_daily_summary._aggregator.close()
+            midas_paper_exchange._paper.close()
+            midas_trade_journal._journal.close()
+            midas_durable.close_store(tmp)
+            for (module, name), value in saved.items():
+                setattr(module, name, value)
+
+
+@contextlib.contextmanager
+def quiet():
+    """The bot prints on every trade; keep that out of the timings."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+# ======================================================
+# ⏱️ TIMING
+# ======================================================
+def summarize(samples_ns, ops_per_sample=1):
+    samples = np.asarray(samples_ns, dtype=np.float64) / 1e3  # µs
+    total_s = samples.sum() / 1e6
+    return {
+        "samples": int(len(samples)),
+        "mean_us": round(float(samples.mean()), 3),
+        "p50_us": round(float(np.percentile(samples, 50)), 3),
+        "p95_us": round(float(np.percentile(samples, 95)), 3),
+        "p99_us": round(float(np.percentile(samples, 99)), 3),
+        "max_us": round(float(samples.max()), 3),
+        "ops_per_sec": round(len(samples) * ops_per_sample / total_s, 1) if total_s else None,
+    }
+
+
+def timed(func, iterations):
+    samples = []
+    for i in range(iterations):
+        started = time.perf_counter_ns()
+        func(i)
+        samples.append(time.perf_counter_ns() - started)
+    return samples
+
+
+# ======================================================
+# 🏁 BENCHMARKS
+# ======================================================
+def bench_log_trade(history, iterations):
+    """Cost of one log_trade call with `history` entries already in the journal."""
+    journal = midas_trade_journal.get_journal()
+    journal.reset()
+    entry = {"timestamp": "2025-01-01 00:00:00", "pair": "BTC/USDT", "side": "buy",
+             "price": 92500.0, "size": 0.001, "result": "open"}
+    for start in range(0, history, 10_000):
+        journal.append_many([entry] * min(10_000, history - start))
+
+    with quiet():
+        samples = timed(lambda i: log_trade("2025-01-01 00:00:00", "BTC/USDT", "buy", 92500.0 + i, 0.001), iterations)
+    return summarize(samples)
+
+
+def bench_update_capital(iterations):
+    with quiet():
+        samples = timed(lambda i: update_capital(0.5 if i % 3 else -0.4, is_win=bool(i % 3)), iterations)
+    return summarize(samples)
+
+
+def bench_paper_orders(iterations):
+    """One market order on the paper exchange; fills are journaled in batches."""
+    paper = midas_paper_exchange.get_paper_exchange()
+    paper.on_ticker("BENCH/USDT", 100.0)
+    samples = timed(lambda i: paper.create_order("BENCH/USDT", "market", "buy" if i % 2 == 0 else "sell", 0.01),
+                    iterations)
+    paper.flush()
+    return summarize(samples)
+
+
+def make_pairs(n):
+    base = {"XRP/USDT": 0.55, "BTC/USDT": 92500.0, "SOL/USDT": 130.0}
+    pairs = dict(list(base.items())[:n])
+    for i in range(len(pairs), n):
+        pairs[f"COIN{i}/USDT"] = 1.0 + i
+    return pairs
+
+
+def bench_live_cycle(n_pairs, cycles):
+    """
+    One cycle = poll all pairs from the fake exchange, then run the full
+    TradingSession handler (paper fills, exits, signals, entries) on every event.
+    Candle time advances 1 minute per cycle so 5m candles close and signals fire.
+    """
+    exchange = FakeExchange(prices=make_pairs(n_pairs), seed=7)
+    pairs = list(exchange.prices)
+    feed = PollingFeed(exchange, pairs, publish_unchanged=True)
+    config = {"rsi_bullish": 50, "rsi_bearish": 50, "adx_min": 5, "ema_fast": 3, "ema_slow": 8,
+              "take_profit": 1.6, "stop_mult": 1.3}
+    session = TradingSession(exchange, pairs, mode="PAPER", strategy_config=config,
+                             daily_max_loss=float("inf"), verbose=False)
+    # Indicators start warm, as they do live after warm_start_from_exchange
+    history = make_candles(200, 300_000, 3)
+    for strategy in session.strategies.values():
+        strategy.warm_start(np.column_stack([history[c] for c in ("timestamp", "open", "high", "low", "close", "volume")]))
+    clock = {"ms": 1_735_689_600_000}
+
+    def cycle(_):
+        exchange.step(0.004)
+        feed.poll_once()
+        clock["ms"] += 60_000
+        while True:
+            event = feed.get(timeout=0)
+            if event is None:
+                break
+            session.process_event(event._replace(timestamp=clock["ms"]))
+
+    with quiet():
+        samples = timed(cycle, cycles)
+    result = summarize(samples, ops_per_sample=n_pairs)
+    result["ops_per_sec_unit"] = "pair updates"
+    result["positions_opened"] = session.positions.opened
+    result["positions_closed"] = session.positions.closed
+    return result
+
+
+def make_candles(n, step_ms, seed):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    spread = np.abs(rng.normal(0, 0.003, n)) * close
+    return {"timestamp": np.arange(n, dtype=np.int64) * step_ms, "open": close, "high": close + spread,
+            "low": close - spread, "close": close, "volume": np.ones(n)}
+
+
+def bench_optimizer_config(bars, iterations):
+    """One run_backtest_with_params call: cold (fresh indicator cache) and warm (cached indicators)."""
+    data = {"df5": make_candles(bars, 300_000, 1), "df15": make_candles(bars // 3, 900_000, 2), "pair": "BENCH"}
+    cfg = {"rsi_bullish": 50, "rsi_bearish": 46, "adx_min": 16, "ema_fast": 8, "ema_slow": 40,
+           "take_profit": 1.6, "stop_mult": 1.3}
+    cold = timed(lambda i: run_backtest_with_params(cfg, data, cache=IndicatorCache()), iterations)
+    cache = IndicatorCache()
+    run_backtest_with_params(cfg, data, cache=cache)
+    warm = timed(lambda i: run_backtest_with_params(cfg, data, cache=cache), iterations)
+    return {"bars": bars, "cold": summarize(cold), "warm": summarize(warm)}
+
+
+# ======================================================
+# 📁 RUN / SAVE / COMPARE
+# ======================================================
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def bench_cold_start(iterations):
+    """Fresh-interpreter import of core.midas_live_trading (what every restart pays before main())."""
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter_ns()
+        subprocess.run([sys.executable, "-c", "import core.midas_live_trading"], cwd=ROOT_DIR, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        samples.append(time.perf_counter_ns() - started)
+    return summarize(samples)
+
+
+def run_all(pair_counts=(3, 10, 50), quick=False):
+    scale = 0.1 if quick else 1.0
+    results = {}
+    with telegram_stub() as server, isolated_state(f"http://127.0.0.1:{server.server_port}"):
+        for history in (1_000, 100_000):
+            results[f"log_trade_history_{history}"] = bench_log_trade(int(history * scale) or 1, int(2_000 * scale))
+        results["update_capital"] = bench_update_capital(int(20_000 * scale))
+        results["paper_market_order"] = bench_paper_orders(int(20_000 * scale))
+        for n in pair_counts:
+            results[f"live_cycle_{n}_pairs"] = bench_live_cycle(n, int(500 * scale))
+        results["optimizer_config"] = bench_optimizer_config(int(50_000 * scale), max(3, int(10 * scale)))
+        results["cold_start_import"] = bench_cold_start(max(2, int(10 * scale)))
+        midas_notifier._dispatcher.flush(timeout=5.0)
+        results["telegram_stub_requests"] = _TelegramStub.requests_seen
+
+    return {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "quick": quick,
+        "results": results,
+    }
+
+
+def _metric(result):
+    """The figure compared between runs: mean latency in µs (lower is better)."""
+    if isinstance(result, dict) and "mean_us" in result:
+        return result["mean_us"]
+    return None
+
+
+def compare(current, baseline):
+    print("\n📊 Change vs baseline (mean latency, negative = faster):")
+    for name, result in current["results"].items():
+        old = baseline.get("results", {}).get(name)
+        pairs = [(name, result, old)]
+        if isinstance(result, dict) and "cold" in result:
+            pairs = [(f"{name}.{k}", result[k], (old or {}).get(k)) for k in ("cold", "warm")]
+        for label, new_result, old_result in pairs:
+            new_value, old_value = _metric(new_result), _metric(old_result)
+            if new_value is None or not old_value:
+                continue
+            change = (new_value - old_value) / old_value * 100
+            flag = "⚠️" if change > 10 else "✅"
+            print(f"   {flag} {label}: {old_value:.1f}µs → {new_value:.1f}µs ({change:+.1f}%)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="MIDAS hot-path benchmarks")
+    parser.add_argument("--pairs", default="3,10,50", help="comma-separated pair counts for the live cycle")
+    parser.add_argument("--quick", action="store_true", help="10%% of the iterations (smoke run)")
+    parser.add_argument("--output", help="result file (default: benchmarks/results/bench_<timestamp>.json)")
+    parser.add_argument("--compare", help="earlier result file to compare against")
+    args = parser.parse_args(argv)
+
+    report = run_all(tuple(int(n) for n in args.pairs.split(",")), quick=args.quick)
+    output = args.output or os.path.join(RESULTS_DIR, f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=4)
+
+    for name, result in report["results"].items():
+        print(f"🏎️ {name}: {json.dumps(result)}")
+    print(f"📁 Benchmark results saved to: {output}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            compare(report, json.load(f))
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,108 @@
+import hashlib
 import os
 import json
+import sys
 from datetime import datetime
 
+from core.midas_durable import recover_directory
+from core.midas_trade_journal import LEGACY_FILE, TradeJournal
+
 # Define all data file paths
 BASE_DIR = os.path.dirname(__file__)
 
 DATA_FILES = {
-    "trade_log": os.path.join(BASE_DIR, "trade_log.json"),
+    "trade_log": os.path.join(BASE_DIR, "trade_log.jsonl"),
     "capital_tracker": os.path.join(BASE_DIR, "capital_tracker.json"),
     "daily_summary": os.path.join(BASE_DIR, "daily_summary.json")
 }
 
+# Size / mtime / checksum of every file as of its last clean check
+MANIFEST_FILE = os.path.join(BASE_DIR, "data_manifest.json")
+# Bytes just before the last checked offset of an append-only file, hashed to prove
+# the already-validated prefix was not rewritten
+ANCHOR_BYTES = 4096
+READ_CHUNK = 1024 * 1024
+
+
+# ======================================================
+# 🧾 MANIFEST
+# ======================================================
+def file_state(file_path):
+    """(size, mtime_ns) of a file, or None if it does not exist."""
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def checksum(file_path, start=0, end=None):
+    """BLAKE2b of bytes [start, end) of a file, read in chunks."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        remaining = (end if end is not None else os.path.getsize(file_path)) - start
+        while remaining > 0:
+            chunk = f.read(min(READ_CHUNK, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+    return digest.hexdigest()
+
+
+def anchor(file_path, size):
+    return checksum(file_path, max(0, size - ANCHOR_BYTES), size)
+
+
+def load_manifest(manifest_path=MANIFEST_FILE):
+    if not manifest_path or not os.path.exists(manifest_path):
+        return {}
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        return manifest if isinstance(manifest, dict) else {}
+    except json.JSONDecodeError:
+        return {}  # a lost manifest only means one full check
+
+
+def save_manifest(manifest, manifest_path=MANIFEST_FILE):
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=4, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def _unchanged(entry, state):
+    return entry is not None and state is not None and (entry.get("size"), entry.get("mtime_ns")) == state
+
+
+# ======================================================
+# 🩺 WHOLE-FILE JSON CHECKS
+# ======================================================
+def _write_json(file_path, data):
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp_path, file_path)
+
+
+def backup_corrupt(file_path):
+    """Moves an unreadable file aside as <name>.corrupt-<timestamp> so it can be inspected or restored."""
+    backup_path = f"{file_path}.corrupt-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}"
+    os.replace(file_path, backup_path)
+    print(f"🗄️ Corrupted copy kept at: {os.path.basename(backup_path)}")
+    return backup_path
+
 
 def ensure_json_list(file_path):
     """
     Ensures the file contains a valid JSON list.
-    If missing or corrupted, resets to [].
+    If missing, creates []; if corrupted, backs it up and starts a new []. Healthy files are not rewritten.
     """
     if not os.path.exists(file_path):
         print(f"⚠️ File missing — creating new: {os.path.basename(file_path)}")
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump([], f, indent=4)
+        _write_json(file_path, [])
         return
 
     try:
@@ -30,30 +112,28 @@ def ensure_json_list(file_path):
         # Convert dict → list
         if isinstance(data, dict):
             print(f"🩹 Repairing: {os.path.basename(file_path)} (dict → list)")
-            data = [data]
+            _write_json(file_path, [data])
+            return
 
         # If empty or invalid, reinit
         if not isinstance(data, list):
             raise ValueError("Invalid JSON format")
 
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4)
-
     except (json.JSONDecodeError, ValueError):
         print(f"⚠️ Corrupted file repaired: {os.path.basename(file_path)}")
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump([], f, indent=4)
+        backup_corrupt(file_path)
+        _write_json(file_path, [])
 
 
 def ensure_capital_tracker(file_path):
     """
     Ensures the capital tracker file is valid and has a numeric capital entry.
+    Only rewritten when something had to be repaired; a corrupted file is backed up first.
     """
     default_capital = {"capital": 100.0}
     if not os.path.exists(file_path):
         print("⚠️ Missing capital tracker — creating new with $100 balance.")
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(default_capital, f, indent=4)
+        _write_json(file_path, default_capital)
         return
 
     try:
@@ -64,31 +144,127 @@ def ensure_capital_tracker(file_path):
             raise ValueError("Invalid format for capital tracker")
 
         # Repair non-numeric values
-        data["capital"] = round(float(data.get("capital", 100.0)), 2)
-
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4)
+        capital = round(float(data.get("capital", 100.0)), 2)
+        if capital != data["capital"]:
+            data["capital"] = capital
+            _write_json(file_path, data)
 
-    except (json.JSONDecodeError, ValueError):
+    except (json.JSONDecodeError, ValueError, TypeError):
         print("⚠️ Corrupted capital tracker repaired.")
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(default_capital, f, indent=4)
+        backup_corrupt(file_path)
+        _write_json(file_path, default_capital)
 
 
-def run_data_safety_check():
+def check_json_file(file_path, ensure, entry=None):
+    """
+    Runs `ensure` only if the file changed since its last clean check:
+    same size and mtime → skipped without reading; same checksum → skipped without parsing.
+    Returns the file's new manifest entry.
+    """
+    state = file_state(file_path)
+    if _unchanged(entry, state):
+        return entry
+    if state is not None and entry is not None and entry.get("size") == state[0]:
+        digest = checksum(file_path)
+        if digest == entry.get("checksum"):
+            return {"size": state[0], "mtime_ns": state[1], "checksum": digest}
+
+    ensure(file_path)
+    size, mtime_ns = file_state(file_path)
+    return {"size": size, "mtime_ns": mtime_ns, "checksum": checksum(file_path)}
+
+
+# ======================================================
+# 📒 APPEND-ONLY JOURNAL (TAIL CHECKS)
+# ======================================================
+def validate_lines(file_path, start, end):
+    """Parses every complete line in bytes [start, end). Returns the number of unreadable lines."""
+    bad = 0
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        offset = start
+        for line in f:
+            offset += len(line)
+            if offset > end:
+                break
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                json.loads(line)
+            except (UnicodeDecodeError, json.JSONDecodeError):
+                bad += 1
+    if bad:
+        print(f"⚠️ {bad} unreadable line(s) in {os.path.basename(file_path)} — readers skip them.")
+    return bad
+
+
+def ensure_trade_journal(file_path, legacy_path=LEGACY_FILE, manifest=None):
+    """
+    Ensures the append-only trade journal is readable.
+    Migrates a legacy trade_log.json and drops only a torn last line.
+    With a manifest ({path: entry}), segments unchanged since the last check are
+    skipped and grown ones are validated from their previous end only.
+    """
+    journal = TradeJournal(path=file_path, legacy_path=legacy_path)
+    manifest = {} if manifest is None else manifest
+    segments = journal.segments()
+    if not segments or not _unchanged(manifest.get(segments[-1]), file_state(segments[-1])):
+        journal.recover()
+    journal.migrate_legacy()
+    if not os.path.exists(file_path):
+        print(f"⚠️ File missing — creating new: {os.path.basename(file_path)}")
+        open(file_path, "a", encoding="utf-8").close()
+
+    # Sealed segments keep their entry when rotation renamed a checked file
+    previous = {(entry.get("size"), entry.get("anchor")): entry for entry in manifest.values()}
+    checked = {}
+    for path in journal.segments():
+        size, mtime_ns = file_state(path)
+        entry = manifest.get(path)
+        if _unchanged(entry, (size, mtime_ns)):
+            checked[path] = entry
+            continue
+        tail_anchor = anchor(path, size)
+        if entry is None and (size, tail_anchor) in previous:
+            start = size
+        elif entry is not None and size >= entry["size"] and anchor(path, entry["size"]) == entry.get("anchor"):
+            start = entry["size"]
+        else:
+            start = 0
+        validate_lines(path, start, size)
+        checked[path] = {"size": size, "mtime_ns": mtime_ns, "anchor": tail_anchor}
+    return checked
+
+
+def run_data_safety_check(files=None, manifest_path=MANIFEST_FILE, legacy_path=LEGACY_FILE, full=False):
     """
     Scans and repairs all critical MIDAS data files.
+    Commits left in the write-ahead log by a crashed run are replayed first, so a file
+    torn mid-write is restored rather than reset. Only files that changed since the last
+    clean check are read (full=True re-checks everything); the manifest is rewritten
+    only if something changed.
     """
+    files = files or DATA_FILES
     print("🔍 Running MIDAS Data Safety Check...\n")
 
-    ensure_json_list(DATA_FILES["trade_log"])
-    ensure_capital_tracker(DATA_FILES["capital_tracker"])
-    ensure_json_list(DATA_FILES["daily_summary"])
+    for directory in sorted({os.path.dirname(os.path.abspath(path)) for path in files.values()}):
+        recover_directory(directory)
+
+    manifest = {} if full else load_manifest(manifest_path)
+    updated = ensure_trade_journal(files["trade_log"], legacy_path, manifest)
+    updated[files["capital_tracker"]] = check_json_file(
+        files["capital_tracker"], ensure_capital_tracker, manifest.get(files["capital_tracker"]))
+    updated[files["daily_summary"]] = check_json_file(
+        files["daily_summary"], ensure_json_list, manifest.get(files["daily_summary"]))
+    if updated != manifest and manifest_path:
+        save_manifest(updated, manifest_path)
 
     print("\n✅ Data integrity check complete.")
     print(f"🕒 Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("---------------------------------------------------")
+    return updated
 
 
 if __name__ == "__main__":
-    run_data_safety_check()
\ No newline at end of file
+    run_data_safety_check(full="--full" in sys.argv)
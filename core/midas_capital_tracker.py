@@ -1,59 +1,261 @@
+import atexit
 import json
 import os
+import threading
 from datetime import datetime
 
+from core import midas_durable, midas_storage
+from core.data_safety_check import backup_corrupt
+from core.midas_metrics import stage
+
 # File to store current capital
 CAPITAL_FILE = os.path.join(os.path.dirname(__file__), "capital_tracker.json")
 
+DEFAULT_CAPITAL = 100.0
+# Seconds between a change and its write to disk (write-behind)
+FLUSH_INTERVAL = float(os.getenv("CAPITAL_FLUSH_INTERVAL", 5.0))
+
+
+# ======================================================
+# 📒 IN-MEMORY CAPITAL LEDGER
+# ======================================================
+class CapitalLedger:
+    """
+    Holds balance, win/loss counts and P&L in memory.
+    Changes are persisted by a background timer (write-behind) with an
+    atomic file replace, so trades never wait on disk I/O.
+    """
+
+    def __init__(self, path=CAPITAL_FILE, flush_interval=FLUSH_INTERVAL, store=None):
+        self.path = path
+        self.store = store  # SQLiteStore replacing the JSON file, if set
+        self.flush_interval = flush_interval
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._timer = None
+        self._dirty = False
+        self.current_balance = DEFAULT_CAPITAL
+        self.total_trades = 0
+        self.win_trades = 0
+        self.loss_trades = 0
+        self.total_profit = 0.0
+        self.total_loss = 0.0
+        self.load()
+
+    def load(self):
+        """Reads the ledger from disk (accepts the legacy {"capital": x} format)."""
+        data = None
+        if self.store is not None:
+            data = self.store.load_capital()
+        elif os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except json.JSONDecodeError:
+                # Never overwrite the only copy of the balance history
+                print("⚠️ Corrupted capital file detected. Backing it up and starting from the default capital.")
+                backup_corrupt(self.path)
+
+        with self._lock:
+            if isinstance(data, dict) and ("current_balance" in data or "capital" in data):
+                self.current_balance = float(data.get("current_balance", data.get("capital")))
+                self.total_trades = int(data.get("total_trades", 0))
+                self.win_trades = int(data.get("win_trades", 0))
+                self.loss_trades = int(data.get("loss_trades", 0))
+                self.total_profit = float(data.get("total_profit", 0.0))
+                self.total_loss = float(data.get("total_loss", 0.0))
+            else:
+                # Default capital if missing or broken
+                self.current_balance = DEFAULT_CAPITAL
+                self._dirty = True
+        if self._dirty:
+            self.flush()
+
+    def snapshot(self):
+        """Returns the ledger as a plain dict."""
+        with self._lock:
+            return {
+                "capital": round(self.current_balance, 2),
+                "current_balance": self.current_balance,
+                "total_trades": self.total_trades,
+                "win_trades": self.win_trades,
+                "loss_trades": self.loss_trades,
+                "total_profit": round(self.total_profit, 6),
+                "total_loss": round(self.total_loss, 6),
+            }
+
+    # ======================================================
+    # ✍️ MUTATIONS (memory only, persisted later)
+    # ======================================================
+    # Each mutation marks the ledger dirty under _lock and only flushes after releasing it,
+    # so _lock is never held while flush() takes _flush_lock (flush takes them the other way)
+    def set_balance(self, balance):
+        with self._lock:
+            self.current_balance = float(balance)
+            flush_now = self._mark_dirty()
+        if flush_now:
+            self.flush()
+
+    def _apply(self, amount, is_win):
+        amount = abs(float(amount))
+        self.total_trades += 1
+        if is_win:
+            self.win_trades += 1
+            self.total_profit += amount
+            self.current_balance += amount
+        else:
+            self.loss_trades += 1
+            self.total_loss += amount
+            self.current_balance -= amount
+
+    def record(self, amount, is_win):
+        """Applies an absolute P&L amount from a closed trade."""
+        with self._lock:
+            self._apply(amount, is_win)
+            flush_now = self._mark_dirty()
+        if flush_now:
+            self.flush()
+
+    def record_profit(self, profit):
+        """Applies a closed trade's signed profit: > 0 is a win, < 0 a loss, 0 a breakeven."""
+        profit = float(profit)
+        with self._lock:
+            if profit:
+                self._apply(profit, is_win=profit > 0)
+            else:
+                self.total_trades += 1  # no balance change
+            flush_now = self._mark_dirty()
+        if flush_now:
+            self.flush()
+
+    def apply_result(self, result, profit_pct):
+        """Applies a WIN / LOSS / BREAKEVEN result as a percentage of the balance."""
+        with self._lock:
+            if result == "WIN":
+                self._apply(self.current_balance * profit_pct, is_win=True)
+            elif result == "LOSS":
+                self._apply(self.current_balance * profit_pct, is_win=False)
+            elif result == "BREAKEVEN":
+                self.total_trades += 1  # no balance change
+            else:
+                return
+            flush_now = self._mark_dirty()
+        if flush_now:
+            self.flush()
 
+    # ======================================================
+    # 💾 WRITE-BEHIND PERSISTENCE
+    # ======================================================
+    def _mark_dirty(self):
+        """Called under _lock. Returns True if the caller must flush now (no write-behind delay)."""
+        self._dirty = True
+        if self.flush_interval <= 0:
+            return True
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+        return False
+
+    def flush(self):
+        """Writes the ledger to disk if it changed (through the durable-state WAL)."""
+        # Serialized so a timer flush and close() can never land an older snapshot last
+        with self._flush_lock:
+            with self._lock:
+                self._timer = None
+                if not self._dirty:
+                    return False
+                data = self.snapshot()
+                self._dirty = False
+
+            with stage("capital_flush"):
+                if self.store is not None:
+                    self.store.save_capital(data)
+                else:
+                    midas_durable.write_json(self.path, data)
+        return True
+
+    def close(self):
+        """Cancels the pending timer and flushes immediately."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        self.flush()
+
+
+_ledger = None
+_ledger_lock = threading.Lock()
+
+
+def get_ledger():
+    """Returns the process-wide capital ledger, loading it from disk once."""
+    global _ledger
+    with _ledger_lock:
+        if _ledger is None:
+            _ledger = CapitalLedger(store=midas_storage.get_store() if midas_storage.sqlite_enabled() else None)
+            atexit.register(_ledger.close)
+    return _ledger
+
+
+# ======================================================
+# 💰 PUBLIC API
+# ======================================================
 def load_capital():
     """
-    Loads the last known capital balance from file.
-    If not found, initializes with 100 (default starting balance).
+    Returns the current capital state (served from memory after the first load).
+    Keys: current_balance, total_trades, win_trades, loss_trades, total_profit, total_loss.
     """
-    if os.path.exists(CAPITAL_FILE):
-        try:
-            with open(CAPITAL_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                if isinstance(data, dict) and "capital" in data:
-                    return data["capital"]
-        except json.JSONDecodeError:
-            print("⚠️ Corrupted capital file detected. Resetting...")
-    # Default capital if missing or broken
-    save_capital(100.0)
-    return 100.0
+    return get_ledger().snapshot()
 
 
 def save_capital(capital):
-    """Saves the current capital value safely."""
-    with open(CAPITAL_FILE, "w", encoding="utf-8") as f:
-        json.dump({"capital": round(float(capital), 2)}, f, indent=4)
+    """Sets the current capital value (persisted by the write-behind timer)."""
+    get_ledger().set_balance(round(float(capital), 2))
     print(f"💰 Capital saved: ${capital:.2f}")
 
 
-def update_capital(result: str, profit_pct: float, balance=None):
+def update_capital(result, profit_pct=None, balance=None, is_win=None):
     """
-    Updates capital based on trade result (WIN / LOSS / BREAKEVEN).
-    Automatically saves new balance to JSON.
+    Updates capital after a trade and returns the new capital state.
+    - update_capital("WIN" / "LOSS" / "BREAKEVEN", profit_pct) applies a percentage move.
+    - update_capital(amount, is_win=True/False) applies an absolute profit or loss.
     """
-    capital = load_capital() if balance is None else balance
+    ledger = get_ledger()
+    if balance is not None:
+        ledger.set_balance(balance)
 
-    if result == "WIN":
-        capital *= (1 + profit_pct)
-    elif result == "LOSS":
-        capital *= (1 - profit_pct)
-    elif result == "BREAKEVEN":
-        pass  # no change
+    if is_win is not None:
+        ledger.record(result, is_win)
+        label = "WIN" if is_win else "LOSS"
+    else:
+        ledger.apply_result(result, profit_pct or 0.0)
+        label = result
 
-    save_capital(capital)
-    print(f"💹 Updated capital after {result}: ${capital:.2f}")
+    capital = ledger.snapshot()
+    print(f"💹 Updated capital after {label}: ${capital['current_balance']:.2f}")
     return capital
 
 
+def record_trade_profit(profit):
+    """Applies a closed trade's signed profit (zero counts as breakeven) and returns the new capital state."""
+    ledger = get_ledger()
+    ledger.record_profit(profit)
+    label = "WIN" if profit > 0 else "LOSS" if profit < 0 else "BREAKEVEN"
+    capital = ledger.snapshot()
+    print(f"💹 Updated capital after {label}: ${capital['current_balance']:.2f}")
+    return capital
+
+
+def flush_capital():
+    """Forces pending capital changes to disk (e.g. on shutdown)."""
+    return get_ledger().close()
+
+
 def reset_daily_capital():
     """Resets daily capital at midnight (or testing start)."""
     base = load_capital()
-    print(f"🕛 Daily capital reset completed. Starting with: ${base:.2f}")
+    print(f"🕛 Daily capital reset completed. Starting with: ${base['current_balance']:.2f}")
     return base
 
 
@@ -61,8 +263,9 @@ if __name__ == "__main__":
     print("🔧 Testing capital tracker...")
 
     capital = load_capital()
-    print(f"Starting capital: ${capital:.2f}")
+    print(f"Starting capital: ${capital['current_balance']:.2f}")
 
     update_capital("WIN", 0.02)
     update_capital("LOSS", 0.015)
-    reset_daily_capital()
\ No newline at end of file
+    reset_daily_capital()
+    flush_capital()
@@ -1,16 +1,227 @@
+import atexit
 import json
 import os
-from datetime import datetime
-from core.midas_telegram import send_telegram_message
+import threading
+from datetime import datetime, timedelta
+from core import midas_durable, midas_storage
+from core.midas_notifier import notify
 
 # File to store daily summaries
 SUMMARY_FILE = os.path.join(os.path.dirname(__file__), "daily_summary.json")
+# Checkpoint of the running per-day / per-pair trade aggregates
+AGGREGATES_FILE = os.path.join(os.path.dirname(__file__), "daily_aggregates.json")
 
+AGGREGATES_FLUSH_INTERVAL = float(os.getenv("SUMMARY_FLUSH_INTERVAL", 5.0))
+RETENTION_DAYS = int(os.getenv("SUMMARY_RETENTION_DAYS", 90))
+ALL_PAIRS = "ALL"
 
-def log_daily_summary(trades_today, profit_loss, capital, win_rate, date=None):
+
+# ======================================================
+# 📊 RUNNING DAILY AGGREGATES
+# ======================================================
+class PairDay:
+    """Running totals for one pair (or all pairs) on one day; O(1) per closed trade."""
+
+    __slots__ = ("count", "wins", "losses", "pnl", "peak", "max_drawdown")
+
+    def __init__(self, count=0, wins=0, losses=0, pnl=0.0, peak=0.0, max_drawdown=0.0):
+        self.count = count
+        self.wins = wins
+        self.losses = losses
+        self.pnl = pnl
+        self.peak = peak  # highest cumulative P&L reached during the day
+        self.max_drawdown = max_drawdown  # largest drop from that peak
+
+    def record(self, profit):
+        self.count += 1
+        if profit > 0:
+            self.wins += 1
+        elif profit < 0:
+            self.losses += 1
+        self.pnl += profit
+        self.peak = max(self.peak, self.pnl)
+        self.max_drawdown = max(self.max_drawdown, self.peak - self.pnl)
+
+    @property
+    def win_rate(self):
+        return self.wins / self.count * 100 if self.count else 0.0
+
+    def to_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class DailyAggregator:
+    """
+    Per-day, per-pair trade totals fed by trade close events.
+    Summaries read the running totals, so their cost does not grow with
+    trade history. Checkpointed with a write-behind timer and atomic replace.
+    """
+
+    def __init__(self, path=AGGREGATES_FILE, flush_interval=AGGREGATES_FLUSH_INTERVAL, retention_days=RETENTION_DAYS):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._timer = None
+        self._dirty = False
+        self.days = {}  # "YYYY-MM-DD" → {pair: PairDay, ALL_PAIRS: PairDay}
+        self.load()
+
+    def load(self):
+        if self.path is None or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.days = {day: {pair: PairDay(**stats) for pair, stats in pairs.items()} for day, pairs in data.items()}
+        except (json.JSONDecodeError, AttributeError, TypeError):
+            print("⚠️ Corrupted daily aggregates checkpoint. Starting fresh.")
+            self.days = {}
+
+    def _day(self, day):
+        pairs = self.days.get(day)
+        if pairs is None:
+            pairs = self.days[day] = {ALL_PAIRS: PairDay()}
+            self._prune(day)
+        return pairs
+
+    def _prune(self, newest):
+        cutoff = (datetime.strptime(newest, "%Y-%m-%d") - timedelta(days=self.retention_days)).strftime("%Y-%m-%d")
+        for day in [d for d in self.days if d < cutoff]:
+            del self.days[day]
+
+    def record(self, pair, profit, day=None):
+        """Adds one closed trade's profit (quote currency) to its day and pair."""
+        day = day or datetime.utcnow().strftime("%Y-%m-%d")
+        profit = float(profit)
+        with self._lock:
+            pairs = self._day(day)
+            pairs[ALL_PAIRS].record(profit)
+            pairs.setdefault(pair, PairDay()).record(profit)
+            flush_now = self._mark_dirty()
+        if flush_now:
+            self.flush()  # outside _lock: flush() takes _flush_lock first
+
+    def summary(self, day=None):
+        """Totals for one day: {"date", "trades", "wins", "losses", "pnl", "max_drawdown", "win_rate", "pairs"}."""
+        day = day or datetime.utcnow().strftime("%Y-%m-%d")
+        with self._lock:
+            pairs = self.days.get(day, {ALL_PAIRS: PairDay()})
+            total = pairs[ALL_PAIRS]
+            return {
+                "date": day,
+                "trades": total.count,
+                "wins": total.wins,
+                "losses": total.losses,
+                "pnl": total.pnl,
+                "max_drawdown": total.max_drawdown,
+                "win_rate": total.win_rate,
+                "pairs": {pair: stats.to_dict() for pair, stats in pairs.items() if pair != ALL_PAIRS},
+            }
+
+    # ======================================================
+    # 💾 WRITE-BEHIND CHECKPOINT
+    # ======================================================
+    def _mark_dirty(self):
+        """Called under _lock. Returns True if the caller must flush now (no write-behind delay)."""
+        self._dirty = True
+        if self.flush_interval <= 0:
+            return True
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+        return False
+
+    def flush(self):
+        # Serialized so a timer flush and close() can never land an older snapshot last
+        with self._flush_lock:
+            with self._lock:
+                self._timer = None
+                if not self._dirty or self.path is None:
+                    return False
+                data = {day: {pair: stats.to_dict() for pair, stats in pairs.items()}
+                        for day, pairs in self.days.items()}
+                self._dirty = False
+
+            midas_durable.write_json(self.path, data)
+        return True
+
+    def close(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        self.flush()
+
+
+_aggregator = None
+_aggregator_lock = threading.Lock()
+
+
+def get_aggregator():
+    """Returns the process-wide daily aggregator, restored from its checkpoint once."""
+    global _aggregator
+    with _aggregator_lock:
+        if _aggregator is None:
+            _aggregator = DailyAggregator()
+            atexit.register(_aggregator.close)
+    return _aggregator
+
+
+def record_trade_close(pair, profit, day=None):
+    """Feeds one closed trade into the running daily totals."""
+    get_aggregator().record(pair, profit, day)
+
+
+def flush_daily_aggregates():
+    """Writes pending aggregate changes now (joins the current durable cycle, if any)."""
+    return get_aggregator().close()
+
+
+def build_daily_summary(day=None):
+    """O(1) summary of one day's closed trades."""
+    return get_aggregator().summary(day)
+
+
+# ======================================================
+# 📅 DAILY SUMMARY HISTORY
+# ======================================================
+def _read_summary_file():
+    """Summary history from SUMMARY_FILE (a lone dict is wrapped in a list)."""
+    if not os.path.exists(SUMMARY_FILE):
+        return []
+    try:
+        with open(SUMMARY_FILE, "r", encoding="utf-8") as f:
+            existing = json.load(f)
+        return existing if isinstance(existing, list) else [existing]
+    except json.JSONDecodeError:
+        print("⚠️ Warning: summary file corrupted. Rebuilding...")
+        return []
+
+
+def _append_summary_file(new_entry):
+    # ✅ Load existing data safely, append and save back
+    data = _read_summary_file()
+    data.append(new_entry)
+    midas_durable.write_json(SUMMARY_FILE, data)
+
+
+def load_daily_summaries(start=None, end=None):
+    """Logged summaries with start <= date < end, oldest first (indexed with SQLite storage)."""
+    if midas_storage.sqlite_enabled():
+        return midas_storage.get_store().summaries(start, end)
+    start = midas_storage.time_bound(start, midas_storage.MIN_TIMESTAMP)
+    end = midas_storage.time_bound(end, midas_storage.MAX_TIMESTAMP)
+    return [entry for entry in _read_summary_file() if start <= str(entry.get("date", "")) < end]
+
+
+def log_daily_summary(trades_today, profit_loss, capital, win_rate, date=None, max_drawdown=None, pairs=None):
     """
     Logs a compact daily summary for reporting.
-    Appends to the JSON file safely.
+    Appends to the JSON file (or the SQLite store with MIDAS_STORAGE=sqlite) safely.
+    - max_drawdown / pairs: optional extras from DailyAggregator.summary()
     """
     date = date or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
@@ -21,26 +232,16 @@ def log_daily_summary(trades_today, profit_loss, capital, win_rate, date=None):
         "capital": round(float(capital), 2),
         "win_rate_pct": round(win_rate, 2)
     }
+    if max_drawdown is not None:
+        new_entry["max_drawdown"] = round(float(max_drawdown), 2)
+    if pairs:
+        new_entry["pairs"] = {pair: {"trades": stats["count"], "wins": stats["wins"], "pnl": round(stats["pnl"], 2)}
+                              for pair, stats in pairs.items()}
 
-    # ✅ Load existing data safely
-    data = []
-    if os.path.exists(SUMMARY_FILE):
-        try:
-            with open(SUMMARY_FILE, "r", encoding="utf-8") as f:
-                existing = json.load(f)
-                if isinstance(existing, list):
-                    data = existing
-                else:
-                    data = [existing]
-        except json.JSONDecodeError:
-            print("⚠️ Warning: summary file corrupted. Rebuilding...")
-            data = []
-
-    # ✅ Append and save back
-    data.append(new_entry)
-
-    with open(SUMMARY_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4)
+    if midas_storage.sqlite_enabled():
+        midas_storage.get_store().add_summary(new_entry)
+    else:
+        _append_summary_file(new_entry)
 
     print(f"📅 Daily summary logged: {new_entry}")
 
@@ -52,7 +253,11 @@ def log_daily_summary(trades_today, profit_loss, capital, win_rate, date=None):
         f"• Capital: ${capital:.2f}\n"
         f"• Win Rate: {win_rate:.1f}%"
     )
-    send_telegram_message(message)
+    if max_drawdown is not None:
+        message += f"\n• Max Drawdown: ${max_drawdown:.2f}"
+    for pair, stats in (pairs or {}).items():
+        message += f"\n  {pair}: {stats['count']} trades, {stats['wins']} wins, ${stats['pnl']:+.2f}"
+    notify(message)
 
     return new_entry
 
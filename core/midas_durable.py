@@ -0,0 +1,326 @@
+# ======================================================
+# 🛡️ MIDAS DURABLE STATE
+# Crash-safe writes for the bot's state files through a
+# per-directory write-ahead log with group commit:
+#   • write_json(path, data)  — whole-document snapshot
+#   • append_text(path, text) — append-only files (journals)
+# Each commit is one WAL record (CRC-checked) written with
+# a single fsync, then applied to the target files without
+# further fsyncs. Inside `with cycle():` (one trading
+# cycle) every write is grouped into one commit. Torn WAL
+# records are ignored; complete ones are replayed on the
+# next start, so a crash mid-write never loses a file.
+# ======================================================
+
+import atexit
+import json
+import os
+import threading
+import zlib
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: WALs are locked with msvcrt instead
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+
+DURABLE_STATE = os.getenv("MIDAS_DURABLE_STATE", "true").lower() == "true"
+WAL_PREFIX = ".midas_state."
+WAL_SUFFIX = ".wal"
+WAL_CHECKPOINT_BYTES = int(os.getenv("WAL_CHECKPOINT_BYTES", 1024 * 1024))  # WAL size that triggers a checkpoint
+
+
+def wal_path(directory, pid=None):
+    return os.path.join(directory, f"{WAL_PREFIX}{pid or os.getpid()}{WAL_SUFFIX}")
+
+
+def _write_atomic(path, text):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def _try_lock(handle):
+    """
+    Non-blocking exclusive lock on an open WAL (flock, or a 1-byte msvcrt lock on Windows).
+    False if another handle holds it, i.e. the WAL belongs to a store that is still running.
+    """
+    try:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        elif msvcrt is not None:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        return False
+    return True
+
+
+def _fsync_path(path):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass  # directories cannot be fsynced on every platform
+    finally:
+        os.close(fd)
+
+
+def _apply_append(path, offset, data):
+    """
+    Idempotent append: skipped if the bytes are already at `offset`, a torn write is
+    completed, and anything else is appended at the end. Never truncates (other
+    processes may append to the same journal).
+    """
+    size = os.path.getsize(path) if os.path.exists(path) else 0
+    with open(path, "ab+") as f:
+        if size > offset:
+            f.seek(offset)
+            present = f.read(len(data))
+            if present == data:
+                return False
+            if size < offset + len(data) and data.startswith(present):
+                f.write(data[len(present):])
+                return True
+            f.seek(0, os.SEEK_END)
+        f.write(data)
+    return True
+
+
+# ======================================================
+# 📒 WRITE-AHEAD LOG
+# ======================================================
+class DurableStore:
+    """
+    Write-ahead log for the state files of one directory, owned by one process.
+    put()/append() stage writes; commit() makes everything staged durable with one fsync.
+    """
+
+    def __init__(self, directory, checkpoint_bytes=WAL_CHECKPOINT_BYTES):
+        self.directory = os.path.abspath(directory)
+        self.path = wal_path(self.directory)
+        self.checkpoint_bytes = checkpoint_bytes
+        self._lock = threading.Lock()
+        self._commit_lock = threading.Lock()
+        self._pending = []  # ops staged since the last commit
+        self._touched = set()  # targets applied since the last checkpoint
+        self.seq = 0
+        self.commits = 0
+        self.fsyncs = 0
+        recover_directory(self.directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self._wal = open(self.path, "ab")
+        if not _try_lock(self._wal):
+            self._wal.close()
+            raise OSError(f"WAL {self.path} is locked by another store")
+
+    @property
+    def pending(self):
+        return bool(self._pending)
+
+    def put(self, path, data, indent=4):
+        text = json.dumps(data, indent=indent)
+        with self._lock:
+            self._pending.append(["put", os.path.basename(path), text])
+
+    def append(self, path, text):
+        with self._lock:
+            self._pending.append(["append", os.path.basename(path), text])
+
+    def commit(self):
+        """Writes every staged op as one WAL record (one fsync), then applies them. Returns ops committed."""
+        with self._commit_lock:
+            with self._lock:
+                ops, self._pending = self._pending, []
+            if not ops:
+                return 0
+            # Offsets are fixed here so a replayed append can tell whether it already landed
+            sizes = {}
+            for op in ops:
+                if op[0] == "append":
+                    target = os.path.join(self.directory, op[1])
+                    if op[1] not in sizes:
+                        sizes[op[1]] = os.path.getsize(target) if os.path.exists(target) else 0
+                    op[2:] = [sizes[op[1]], op[2]]
+                    sizes[op[1]] += len(op[3].encode("utf-8"))
+            self.seq += 1
+            body = json.dumps({"seq": self.seq, "ops": ops})
+            self._wal.write(f"{zlib.crc32(body.encode('utf-8')):08x} {body}\n".encode("utf-8"))
+            self._wal.flush()
+            os.fsync(self._wal.fileno())
+            self.fsyncs += 1
+            self.commits += 1
+
+            apply_ops(self.directory, ops)
+            self._touched.update(op[1] for op in ops)
+            if self._wal.tell() >= self.checkpoint_bytes:
+                self._checkpoint()
+            return len(ops)
+
+    def _checkpoint(self):
+        """Makes the applied targets durable on their own, then empties the WAL."""
+        for name in self._touched:
+            _fsync_path(os.path.join(self.directory, name))
+        _fsync_path(self.directory)
+        self._touched.clear()
+        self._wal.truncate(0)
+        self._wal.seek(0)
+        os.fsync(self._wal.fileno())
+
+    def checkpoint(self):
+        with self._commit_lock:
+            self._checkpoint()
+
+    def close(self):
+        """Commits what is staged, checkpoints and removes the WAL (a clean shutdown leaves none behind)."""
+        self.commit()
+        self.checkpoint()
+        self._wal.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def apply_ops(directory, ops):
+    for op in ops:
+        target = os.path.join(directory, op[1])
+        if op[0] == "put":
+            _write_atomic(target, op[2])
+        else:
+            _apply_append(target, op[2], op[3].encode("utf-8"))
+
+
+def read_wal(path):
+    """Complete, CRC-valid records of a WAL file, in order (a torn last record is ignored)."""
+    with open(path, "rb") as f:
+        return _read_records(f)
+
+
+def _read_records(f):
+    records = []
+    for line in f:
+        if not line.endswith(b"\n"):
+            break
+        crc, _, body = line.rstrip(b"\n").partition(b" ")
+        try:
+            if int(crc, 16) != zlib.crc32(body):
+                break
+            records.append(json.loads(body))
+        except (ValueError, json.JSONDecodeError):
+            break
+    return records
+
+
+def recover_directory(directory):
+    """Replays the WALs left in `directory` by processes (or earlier boots) that are gone. Returns the records replayed."""
+    if not os.path.isdir(directory):
+        return 0
+    replayed = 0
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if not (name.startswith(WAL_PREFIX) and name.endswith(WAL_SUFFIX)):
+            continue
+        # A WAL under our own PID is from an earlier boot that reused it (PID 1 in containers):
+        # replayed like any other unless a live store of this process holds its lock
+        with open(path, "a+b") as handle:
+            if not _try_lock(handle):
+                continue  # owner is still running
+            handle.seek(0)
+            records = _read_records(handle)  # through the locked handle (Windows locks block other readers)
+            for record in records:
+                apply_ops(directory, record["ops"])
+            for target in {op[1] for record in records for op in record["ops"]}:
+                _fsync_path(os.path.join(directory, target))
+        os.remove(path)
+        replayed += len(records)
+        if records:
+            print(f"🛡️ Recovered {len(records)} state commit(s) from {name}")
+    return replayed
+
+
+# ======================================================
+# 🌍 PROCESS-WIDE STORES
+# ======================================================
+_stores = {}
+_stores_lock = threading.Lock()
+_cycle = threading.local()
+
+
+def get_store(directory):
+    directory = os.path.abspath(directory)
+    store = _stores.get(directory)
+    if store is None:
+        with _stores_lock:
+            store = _stores.get(directory)
+            if store is None:
+                store = _stores[directory] = DurableStore(directory)
+    return store
+
+
+def _in_cycle():
+    return getattr(_cycle, "depth", 0) > 0
+
+
+def write_json(path, data, indent=4):
+    """Durable JSON snapshot of a state file (committed now, or at the end of the current cycle)."""
+    if not DURABLE_STATE:
+        _write_atomic(path, json.dumps(data, indent=indent))
+        return
+    store = get_store(os.path.dirname(path) or ".")
+    store.put(path, data, indent)
+    if not _in_cycle():
+        store.commit()
+
+
+def append_text(path, text):
+    """Durable append to an append-only file (committed now, or at the end of the current cycle)."""
+    if not DURABLE_STATE:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(text)
+        return
+    store = get_store(os.path.dirname(path) or ".")
+    store.append(path, text)
+    if not _in_cycle():
+        store.commit()
+
+
+def commit_all():
+    return sum(store.commit() for store in list(_stores.values()))
+
+
+@contextmanager
+def cycle():
+    """Groups every state write made by this thread inside the block into one commit per directory."""
+    _cycle.depth = getattr(_cycle, "depth", 0) + 1
+    try:
+        yield
+    finally:
+        _cycle.depth -= 1
+        if not _cycle.depth:
+            commit_all()
+
+
+def close_store(directory):
+    """Closes the store of one directory (e.g. a temp dir about to be removed)."""
+    with _stores_lock:
+        store = _stores.pop(os.path.abspath(directory), None)
+    if store is not None:
+        store.close()
+
+
+def close_all():
+    with _stores_lock:
+        stores = list(_stores.values())
+        _stores.clear()
+    for store in stores:
+        store.close()
+
+
+atexit.register(close_all)
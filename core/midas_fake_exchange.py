@@ -0,0 +1,116 @@
+# ======================================================
+# 🧪 MIDAS FAKE EXCHANGE
+# Offline stand-in for a ccxt exchange: serves tickers
+# from an in-memory price table with optional latency,
+# slow or failing symbols, and records placed orders.
+# ======================================================
+
+import random
+import threading
+import time
+
+
+class FakeExchange:
+    """Minimal ccxt-compatible exchange for offline tests and benchmarks."""
+
+    def __init__(self, prices=None, latency=0.0, slow_pairs=None, slow_latency=30.0,
+                 fail_pairs=None, supports_batch=True, seed=None):
+        self.id = "fake"
+        self.prices = dict(prices or {"XRP/USDT": 0.55, "BTC/USDT": 92500.0, "SOL/USDT": 130.0})
+        self.latency = latency
+        self.slow_pairs = set(slow_pairs or [])
+        self.slow_latency = slow_latency
+        self.fail_pairs = set(fail_pairs or [])
+        self.has = {"fetchTicker": True, "fetchTickers": supports_batch, "createOrder": True}
+        self.precisionMode = 4  # ccxt TICK_SIZE
+        self.markets = None
+        self.orders = []
+        self.calls = {"fetch_ticker": 0, "fetch_tickers": 0, "create_order": 0, "load_markets": 0}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    # ======================================================
+    # 📊 MARKET DATA
+    # ======================================================
+    def _ticker(self, pair):
+        if pair in self.fail_pairs:
+            raise RuntimeError(f"fake exchange: {pair} unavailable")
+        if pair not in self.prices:
+            raise KeyError(f"fake exchange: unknown symbol {pair}")
+        last = self.prices[pair]
+        return {
+            "symbol": pair,
+            "last": last,
+            "bid": last * 0.9999,
+            "ask": last * 1.0001,
+            "timestamp": int(time.time() * 1000),
+        }
+
+    def _market(self, pair):
+        base, quote = pair.split("/")
+        price = self.prices[pair]
+        amount_step = 10.0 ** -max(0, min(8, len(str(int(price))) + 1))  # ~0.01-1 USDT per step
+        return {
+            "id": base + quote,
+            "symbol": pair,
+            "base": base,
+            "quote": quote,
+            "type": "spot",
+            "spot": True,
+            "active": True,
+            "precision": {"amount": amount_step, "price": 10.0 ** -max(0, 6 - len(str(int(price))))},
+            "limits": {"amount": {"min": amount_step, "max": None}, "cost": {"min": 1.0, "max": None}},
+            "taker": 0.001,
+            "maker": 0.0,
+            "info": {"symbol": base + quote, "padding": "x" * 512},
+        }
+
+    def load_markets(self, reload=False):
+        if self.markets is None or reload:
+            with self._lock:
+                self.calls["load_markets"] += 1
+            time.sleep(self.latency)
+            self.markets = {pair: self._market(pair) for pair in self.prices}
+        return self.markets
+
+    def set_markets(self, markets, currencies=None):
+        self.markets = markets
+
+    def fetch_ticker(self, pair):
+        with self._lock:
+            self.calls["fetch_ticker"] += 1
+        time.sleep(self.slow_latency if pair in self.slow_pairs else self.latency)
+        return self._ticker(pair)
+
+    def fetch_tickers(self, symbols=None):
+        if not self.has["fetchTickers"]:
+            raise NotImplementedError("fake exchange: fetchTickers disabled")
+        with self._lock:
+            self.calls["fetch_tickers"] += 1
+        time.sleep(self.latency)
+        symbols = symbols or list(self.prices)
+        return {pair: self._ticker(pair) for pair in symbols if pair not in self.fail_pairs}
+
+    def step(self, volatility=0.001):
+        """Moves every price by a small random step (random walk)."""
+        for pair, price in self.prices.items():
+            self.prices[pair] = price * (1 + self._random.gauss(0, volatility))
+
+    # ======================================================
+    # 💹 ORDERS
+    # ======================================================
+    def create_order(self, symbol, type, side, amount, price=None, params=None):
+        with self._lock:
+            self.calls["create_order"] += 1
+            order = {
+                "id": str(len(self.orders) + 1),
+                "symbol": symbol,
+                "type": type,
+                "side": side,
+                "amount": amount,
+                "price": price if price is not None else self.prices.get(symbol),
+                "status": "closed",
+                "timestamp": int(time.time() * 1000),
+            }
+            self.orders.append(order)
+        return order
@@ -0,0 +1,283 @@
+# ======================================================
+# 📡 MIDAS MARKET FEEDS
+# Pluggable push-style market data: every backend turns
+# ticker / trade updates into FeedEvents on one queue
+# that the trading loop consumes as they arrive.
+#   • PollingFeed   — REST polling (fetch_tickers / fetch_ticker)
+#   • WebsocketFeed — ccxt.pro watch_ticker / watch_trades
+#   • ReplayFeed    — local JSONL file replay for tests
+# ======================================================
+
+import asyncio
+import json
+import os
+import queue
+import threading
+import time
+from collections import namedtuple
+
+from core.midas_market_data import fetch_tickers
+
+FEED_MODE = os.getenv("FEED_MODE", "polling").lower()
+FEED_POLL_INTERVAL = float(os.getenv("FEED_POLL_INTERVAL", 60))
+FEED_REPLAY_FILE = os.getenv("FEED_REPLAY_FILE", "")
+FEED_MAX_QUEUE = int(os.getenv("FEED_MAX_QUEUE", 10000))
+
+# kind: "ticker" or "trade"; timestamp in epoch milliseconds; data = raw exchange payload
+FeedEvent = namedtuple("FeedEvent", ["kind", "pair", "price", "timestamp", "data"])
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+class MarketFeed:
+    """Base feed: owns the event queue and the background worker lifecycle."""
+
+    name = "base"
+
+    def __init__(self, pairs, max_queue=FEED_MAX_QUEUE):
+        self.pairs = list(pairs)
+        self._events = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread = None
+        self.published = 0
+        self.dropped = 0
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"midas-feed-{self.name}", daemon=True)
+            self._thread.start()
+        print(f"📡 {self.name} feed started for {', '.join(self.pairs)}")
+        return self
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def publish(self, kind, pair, price, timestamp=None, data=None):
+        """Pushes one event to the consumer. If the consumer lags, the oldest event is dropped."""
+        if price is None:
+            return
+        event = FeedEvent(kind, pair, float(price), timestamp or _now_ms(), data)
+        while True:
+            try:
+                self._events.put_nowait(event)
+                self.published += 1
+                return
+            except queue.Full:
+                try:
+                    self._events.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        """Returns the next event, or None if nothing arrived within `timeout` seconds."""
+        try:
+            return self._events.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def events(self, timeout=1.0):
+        """Yields events until the feed stops and its queue is drained."""
+        while self.running or not self._events.empty():
+            event = self.get(timeout)
+            if event is not None:
+                yield event
+
+    def _run(self):
+        raise NotImplementedError
+
+
+# ======================================================
+# 🔁 REST POLLING BACKEND
+# ======================================================
+class PollingFeed(MarketFeed):
+    """Polls tickers on a fixed interval and publishes every price that changed."""
+
+    name = "polling"
+
+    def __init__(self, exchange, pairs, interval=FEED_POLL_INTERVAL, publish_unchanged=False, **kwargs):
+        super().__init__(pairs, **kwargs)
+        self.exchange = exchange
+        self.interval = interval
+        self.publish_unchanged = publish_unchanged
+        self._last = {}
+
+    def poll_once(self, pairs=None):
+        """Fetches the given pairs (default: all) once and publishes their tickers."""
+        tickers = fetch_tickers(self.exchange, pairs or self.pairs)
+        for pair, ticker in tickers.items():
+            if not ticker:
+                continue
+            price = ticker.get("last")
+            if price is None or (not self.publish_unchanged and self._last.get(pair) == price):
+                continue
+            self._last[pair] = price
+            self.publish("ticker", pair, price, ticker.get("timestamp"), ticker)
+
+    def _run(self):
+        next_poll = time.monotonic()
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                print(f"⚠️ Polling feed error: {e}")
+            next_poll += self.interval
+            self._stop.wait(max(0.0, next_poll - time.monotonic()))
+
+
+# ======================================================
+# ⚡ EXCHANGE WEBSOCKET BACKEND
+# ======================================================
+class WebsocketFeed(MarketFeed):
+    """Streams tickers (and optionally trades) through ccxt.pro websockets."""
+
+    name = "websocket"
+
+    def __init__(self, exchange_name, pairs, watch_trades=False, reconnect_delay=5.0, **kwargs):
+        super().__init__(pairs, **kwargs)
+        self.exchange_name = exchange_name.lower()
+        self.watch_trades = watch_trades
+        self.reconnect_delay = reconnect_delay
+        self._loop = None
+
+    def _create_exchange(self):
+        import ccxt.pro as ccxtpro
+
+        exchange_class = getattr(ccxtpro, self.exchange_name, None)
+        if exchange_class is None:
+            raise ValueError(f"❌ No websocket support for exchange: {self.exchange_name}")
+        return exchange_class({"enableRateLimit": True, "options": {"defaultType": "spot"}})
+
+    async def _ticker_loop(self, exchange, pair):
+        while not self._stop.is_set():
+            try:
+                ticker = await exchange.watch_ticker(pair)
+                self.publish("ticker", pair, ticker.get("last"), ticker.get("timestamp"), ticker)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Websocket ticker error for {pair}: {e} — reconnecting in {self.reconnect_delay}s")
+                await asyncio.sleep(self.reconnect_delay)
+
+    async def _trade_loop(self, exchange, pair):
+        while not self._stop.is_set():
+            try:
+                for trade in await exchange.watch_trades(pair):
+                    self.publish("trade", pair, trade.get("price"), trade.get("timestamp"), trade)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"⚠️ Websocket trade error for {pair}: {e} — reconnecting in {self.reconnect_delay}s")
+                await asyncio.sleep(self.reconnect_delay)
+
+    async def _main(self):
+        exchange = self._create_exchange()
+        tasks = [asyncio.ensure_future(self._ticker_loop(exchange, pair)) for pair in self.pairs]
+        if self.watch_trades:
+            tasks += [asyncio.ensure_future(self._trade_loop(exchange, pair)) for pair in self.pairs]
+        try:
+            while not self._stop.is_set():
+                await asyncio.sleep(0.2)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            await exchange.close()
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._main())
+        except Exception as e:
+            print(f"❌ Websocket feed stopped: {e}")
+        finally:
+            self._loop.close()
+
+
+# ======================================================
+# 📼 LOCAL FILE REPLAY BACKEND
+# ======================================================
+class ReplayFeed(MarketFeed):
+    """
+    Replays recorded events from a JSONL file, one object per line:
+    {"timestamp": 1737260463000, "pair": "BTC/USDT", "price": 92816.2, "kind": "ticker"}
+    speed=1.0 keeps the recorded pacing, speed=0 replays as fast as the consumer reads.
+    """
+
+    name = "replay"
+
+    def __init__(self, path, pairs=None, speed=0.0, loop=False, **kwargs):
+        super().__init__(pairs or [], **kwargs)
+        self.path = path
+        self.speed = speed
+        self.loop = loop
+        self._wanted = set(pairs) if pairs else None
+
+    def _records(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if self._wanted is None or record.get("pair") in self._wanted:
+                    yield record
+
+    def _publish_blocking(self, record):
+        """Replay must not lose events, so wait for queue space instead of dropping."""
+        event = FeedEvent(record.get("kind", "ticker"), record["pair"], float(record["price"]),
+                          record.get("timestamp") or _now_ms(), record)
+        while not self._stop.is_set():
+            try:
+                self._events.put(event, timeout=0.2)
+                self.published += 1
+                return
+            except queue.Full:
+                continue
+
+    def _run(self):
+        while not self._stop.is_set():
+            first_ts = None
+            started = time.monotonic()
+            for record in self._records():
+                if self._stop.is_set():
+                    return
+                timestamp = record.get("timestamp")
+                if self.speed and timestamp is not None:
+                    first_ts = timestamp if first_ts is None else first_ts
+                    due = started + (timestamp - first_ts) / 1000.0 / self.speed
+                    self._stop.wait(max(0.0, due - time.monotonic()))
+                self._publish_blocking(record)
+            if not self.loop:
+                return
+
+
+# ======================================================
+# 🏭 FACTORY
+# ======================================================
+def get_feed(mode=FEED_MODE, exchange=None, pairs=(), exchange_name=None, **kwargs):
+    """Builds the feed backend selected by FEED_MODE (polling / websocket / replay)."""
+    mode = (mode or "polling").lower()
+    if mode == "polling":
+        return PollingFeed(exchange, pairs, **kwargs)
+    if mode == "websocket":
+        name = exchange_name or getattr(exchange, "id", None) or os.getenv("EXCHANGE_NAME", "mexc")
+        return WebsocketFeed(name, pairs, **kwargs)
+    if mode == "replay":
+        path = kwargs.pop("path", None) or FEED_REPLAY_FILE
+        if not path:
+            raise ValueError("❌ FEED_MODE=replay requires FEED_REPLAY_FILE")
+        return ReplayFeed(path, pairs, **kwargs)
+    raise ValueError(f"❌ Unsupported feed mode: {mode}")
@@ -0,0 +1,263 @@
+# ======================================================
+# 📈 MIDAS STREAMING INDICATORS
+# O(1) per-update EMA, Wilder RSI, ATR and ADX with the
+# same formulas as the vectorized backtest engine, plus a
+# per-pair strategy state that turns ticks into closed
+# candles and evaluates the tuned RSI/ADX/EMA crossover.
+# ======================================================
+
+import json
+import os
+
+BEST_CONFIG_FILE = os.path.join(os.path.dirname(__file__), "..", "midas_best_config.json")
+
+RSI_PERIOD = 14
+ADX_PERIOD = 14
+ATR_PERIOD = 14
+
+TIMEFRAME_MS = {"1m": 60_000, "5m": 300_000, "15m": 900_000, "1h": 3_600_000}
+
+DEFAULT_STRATEGY = {
+    "rsi_bullish": 50,
+    "rsi_bearish": 46,
+    "adx_min": 16,
+    "ema_fast": 8,
+    "ema_slow": 40,
+    "take_profit": 1.6,
+    "stop_mult": 1.3,
+}
+
+
+def load_strategy_config(path=BEST_CONFIG_FILE):
+    """Loads the optimizer's tuned parameters (midas_best_config.json)."""
+    config = dict(DEFAULT_STRATEGY)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            config.update({k: v for k, v in json.load(f).items() if k in DEFAULT_STRATEGY})
+    except (OSError, json.JSONDecodeError):
+        print("⚠️ midas_best_config.json not found or unreadable — using default strategy parameters.")
+    return config
+
+
+# ======================================================
+# 🧮 O(1) INDICATORS
+# ======================================================
+class EMA:
+    """Exponential moving average, alpha = 2 / (period + 1), seeded with the first value."""
+
+    __slots__ = ("alpha", "value")
+
+    def __init__(self, period, alpha=None):
+        self.alpha = alpha if alpha is not None else 2.0 / (period + 1)
+        self.value = None
+
+    def update(self, x):
+        if self.value is None:
+            self.value = float(x)
+        else:
+            self.value += self.alpha * (x - self.value)
+        return self.value
+
+
+class Wilder(EMA):
+    """Wilder's smoothing, alpha = 1 / period."""
+
+    __slots__ = ()
+
+    def __init__(self, period):
+        super().__init__(period, alpha=1.0 / period)
+
+
+class RSI:
+    __slots__ = ("prev_close", "avg_gain", "avg_loss", "value")
+
+    def __init__(self, period=RSI_PERIOD):
+        self.prev_close = None
+        self.avg_gain = Wilder(period)
+        self.avg_loss = Wilder(period)
+        self.value = None
+
+    def update(self, close):
+        delta = 0.0 if self.prev_close is None else close - self.prev_close
+        self.prev_close = close
+        gain = self.avg_gain.update(max(delta, 0.0))
+        loss = self.avg_loss.update(max(-delta, 0.0))
+        if loss == 0:
+            self.value = 50.0 if gain == 0 else 100.0
+        else:
+            self.value = 100.0 - 100.0 / (1.0 + gain / loss)
+        return self.value
+
+
+def _true_range(high, low, prev_close):
+    return max(high - low, abs(high - prev_close), abs(low - prev_close))
+
+
+class ATR:
+    __slots__ = ("prev_close", "smoothed", "value")
+
+    def __init__(self, period=ATR_PERIOD):
+        self.prev_close = None
+        self.smoothed = Wilder(period)
+        self.value = None
+
+    def update(self, high, low, close):
+        prev_close = close if self.prev_close is None else self.prev_close
+        self.prev_close = close
+        self.value = self.smoothed.update(_true_range(high, low, prev_close))
+        return self.value
+
+
+class ADX:
+    __slots__ = ("prev_high", "prev_low", "prev_close", "tr", "plus_dm", "minus_dm", "dx", "value")
+
+    def __init__(self, period=ADX_PERIOD):
+        self.prev_high = self.prev_low = self.prev_close = None
+        self.tr = Wilder(period)
+        self.plus_dm = Wilder(period)
+        self.minus_dm = Wilder(period)
+        self.dx = Wilder(period)
+        self.value = None
+
+    def update(self, high, low, close):
+        if self.prev_high is None:
+            up = down = 0.0
+            prev_close = close
+        else:
+            up = high - self.prev_high
+            down = self.prev_low - low
+            prev_close = self.prev_close
+        self.prev_high, self.prev_low, self.prev_close = high, low, close
+
+        plus = up if (up > down and up > 0) else 0.0
+        minus = down if (down > up and down > 0) else 0.0
+        tr = self.tr.update(_true_range(high, low, prev_close))
+        plus_avg = self.plus_dm.update(plus)
+        minus_avg = self.minus_dm.update(minus)
+
+        plus_di = 100.0 * plus_avg / tr if tr > 0 else 0.0
+        minus_di = 100.0 * minus_avg / tr if tr > 0 else 0.0
+        di_sum = plus_di + minus_di
+        dx = 100.0 * abs(plus_di - minus_di) / di_sum if di_sum > 0 else 0.0
+        self.value = self.dx.update(dx)
+        return self.value
+
+
+# ======================================================
+# 🕯️ TICK → CANDLE AGGREGATION
+# ======================================================
+class CandleBuilder:
+    """Aggregates ticks into fixed-interval candles; returns a candle when its interval closes."""
+
+    __slots__ = ("interval_ms", "open_time", "open", "high", "low", "close")
+
+    def __init__(self, timeframe="5m"):
+        self.interval_ms = TIMEFRAME_MS[timeframe]
+        self.open_time = None
+        self.open = self.high = self.low = self.close = None
+
+    def update(self, price, timestamp_ms):
+        bucket = timestamp_ms - timestamp_ms % self.interval_ms
+        closed = None
+        if self.open_time is not None and bucket > self.open_time:
+            closed = (self.open_time, self.open, self.high, self.low, self.close)
+            self.open_time = None
+        if self.open_time is None:
+            self.open_time = bucket
+            self.open = self.high = self.low = self.close = price
+        else:
+            self.high = max(self.high, price)
+            self.low = min(self.low, price)
+            self.close = price
+        return closed
+
+
+# ======================================================
+# 🎯 PER-PAIR STRATEGY STATE
+# ======================================================
+class PairStrategy:
+    """
+    Streaming version of the optimizer's strategy for one pair:
+    5m EMA crossover confirmed by RSI and ADX, filtered by the 15m EMA trend.
+    """
+
+    __slots__ = ("config", "ema_fast", "ema_slow", "rsi", "adx", "atr", "trend_fast", "trend_slow",
+                 "builder5", "builder15", "prev_above", "bars", "warmup")
+
+    def __init__(self, config=None):
+        self.config = config or load_strategy_config()
+        fast, slow = int(round(self.config["ema_fast"])), int(round(self.config["ema_slow"]))
+        self.ema_fast, self.ema_slow = EMA(fast), EMA(slow)
+        self.trend_fast, self.trend_slow = EMA(fast), EMA(slow)
+        self.rsi, self.adx, self.atr = RSI(), ADX(), ATR()
+        self.builder5, self.builder15 = CandleBuilder("5m"), CandleBuilder("15m")
+        self.prev_above = None
+        self.bars = 0
+        self.warmup = int(max(self.config["ema_slow"], ADX_PERIOD * 2))
+
+    def update_trend(self, close):
+        """Feeds one closed 15m candle close."""
+        self.trend_fast.update(close)
+        self.trend_slow.update(close)
+
+    def update_candle(self, high, low, close):
+        """Feeds one closed 5m candle and returns "buy", "sell" or None."""
+        fast = self.ema_fast.update(close)
+        slow = self.ema_slow.update(close)
+        rsi = self.rsi.update(close)
+        adx = self.adx.update(high, low, close)
+        self.atr.update(high, low, close)
+        self.bars += 1
+
+        above = fast > slow
+        prev_above, self.prev_above = self.prev_above, above
+        if prev_above is None or self.bars <= self.warmup or adx <= self.config["adx_min"]:
+            return None
+
+        trend_known = self.trend_fast.value is not None
+        if above and not prev_above and rsi > self.config["rsi_bullish"]:
+            if not trend_known or self.trend_fast.value > self.trend_slow.value:
+                return "buy"
+        if prev_above and not above and rsi < self.config["rsi_bearish"]:
+            if not trend_known or self.trend_fast.value < self.trend_slow.value:
+                return "sell"
+        return None
+
+    def on_price(self, price, timestamp_ms):
+        """Feeds one tick; evaluates the strategy only when a 5m candle closes."""
+        closed15 = self.builder15.update(price, timestamp_ms)
+        if closed15:
+            self.update_trend(closed15[4])
+        closed5 = self.builder5.update(price, timestamp_ms)
+        if closed5:
+            _, _, high, low, close = closed5
+            return self.update_candle(high, low, close)
+        return None
+
+    def warm_start(self, candles5, candles15=()):
+        """Replays history ([timestamp, open, high, low, close, volume] rows) without emitting signals."""
+        for row in candles15:
+            self.update_trend(row[4])
+        for row in candles5:
+            self.update_candle(row[2], row[3], row[4])
+
+    def snapshot(self):
+        return {
+            "ema_fast": self.ema_fast.value,
+            "ema_slow": self.ema_slow.value,
+            "rsi": self.rsi.value,
+            "adx": self.adx.value,
+            "atr": self.atr.value,
+            "bars": self.bars,
+        }
+
+
+def warm_start_from_exchange(strategy, exchange, pair, limit=500):
+    """Seeds a PairStrategy with recent closed 5m / 15m candles from the exchange."""
+    try:
+        candles5 = exchange.fetch_ohlcv(pair, "5m", limit=limit)[:-1]  # last candle is still open
+        candles15 = exchange.fetch_ohlcv(pair, "15m", limit=limit)[:-1]
+        strategy.warm_start(candles5, candles15)
+        print(f"🔥 {pair}: indicators warmed up on {len(candles5)} candles.")
+    except Exception as e:
+        print(f"⚠️ {pair}: indicator warm-up failed ({e}) — starting cold.")
@@ -1,21 +1,18 @@
 import os
 import time
-import json
-import ccxt
-from datetime import datetime, timedelta, timezone
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
 
-from core.midas_logger import log_trade
-from core.midas_capital_tracker import update_capital, load_capital, reset_daily_capital
-from core.midas_smart_order import execute_trade
-from core.midas_telegram import send_telegram_message
-from core.validate_data_files import validate_and_fix_json_files
+from core.midas_feed import get_feed, FEED_MODE, FEED_POLL_INTERVAL
+from core.midas_markets import find_markets, get_markets_cache
+from core.midas_metrics import METRICS_PORT, METRICS_SNAPSHOT_INTERVAL, registry, start_metrics_server
+from core.midas_notifier import notify
+from core.data_safety_check import run_data_safety_check
+from core.midas_scheduler import Scheduler
+from core.midas_session import TradingSession
 
-
-# ============================================================
-# 🧩 PRE-START VALIDATION
-# ============================================================
-validate_and_fix_json_files(silent=True)
-print("✅ Data validation complete. Proceeding with trading engine startup.\n")
+# Importing this module has no side effects: ccxt, the data files, the exchange and
+# the trading session are only touched by main(), so restarts and tests import it fast.
 
 
 # ============================================================
@@ -32,34 +29,53 @@ TRAILING_STOP_PCT = 0.02  # optional trailing stop
 CAPITAL = 100.0
 DAILY_RESET_HOUR = 0  # reset at 00:00 UTC+1
 TIMEZONE_OFFSET = timedelta(hours=1)  # UTC+1 for Nigeria
+STATS_INTERVAL = float(os.getenv("SCHEDULER_STATS_INTERVAL", 3600))  # scheduler lag report
+
+
+def parse_pair_intervals(spec, default=FEED_POLL_INTERVAL):
+    """PAIR_POLL_INTERVALS="BTC/USDT=15,XRP/USDT=30" → per-pair polling cadence in seconds."""
+    intervals = {pair: default for pair in PAIR_LIST}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        pair, _, seconds = item.partition("=")
+        intervals[pair.strip()] = float(seconds)
+    return intervals
+
+
+PAIR_INTERVALS = parse_pair_intervals(os.getenv("PAIR_POLL_INTERVALS", ""))
 
 
 # ============================================================
 # 🌐 EXCHANGE INITIALIZATION
 # ============================================================
 def get_exchange(name="mexc"):
-    """Initialize CCXT exchange with safe defaults."""
+    """Initialize CCXT exchange with safe defaults (ccxt is imported on first use)."""
     name = name.lower()
+    import ccxt  # ~1-2s to import every exchange class: only paid when an exchange is built
     try:
         exchange_class = getattr(ccxt, name)
-        exchange = exchange_class({
-            "enableRateLimit": True,
-            "options": {"defaultType": "spot"}
-        })
-        return exchange
     except AttributeError:
         raise ValueError(f"❌ Unsupported exchange: {name}")
+    return exchange_class({
+        "enableRateLimit": True,
+        "options": {"defaultType": "spot"}
+    })
 
 
-exchange = get_exchange(EXCHANGE_NAME)
-send_telegram_message(f"🚀 MIDAS Trading Bot started in {MODE} mode — Monitoring {', '.join(PAIR_LIST)}")
+def connect_exchange(name=EXCHANGE_NAME, exchange=None):
+    """Builds the exchange (unless given) and installs its markets from the disk cache."""
+    exchange = exchange or get_exchange(name)
+    try:
+        get_markets_cache(exchange).ensure()
+    except Exception as e:
+        print(f"⚠️ Markets unavailable for {getattr(exchange, 'id', name)} ({e}) — order sizes are not rounded.")
+    return exchange
 
 
 # ============================================================
 # 📊 HELPER FUNCTIONS
 # ============================================================
-def fetch_price(pair):
-    """Fetch latest ticker price."""
+def fetch_price(exchange, pair):
+    """Fetch latest ticker price (one-off REST call; the loop itself is fed by the feed)."""
     try:
         ticker = exchange.fetch_ticker(pair)
         return ticker["last"]
@@ -68,121 +84,103 @@ def fetch_price(pair):
         return None
 
 
-def analyze_signal(price, last_price):
-    """Placeholder signal logic — to be replaced with your real strategy."""
-    if last_price is None:
-        return None
-    if price > last_price * 1.001:
-        return {"side": "buy"}
-    elif price < last_price * 0.999:
-        return {"side": "sell"}
-    return None
-
-
-def within_trading_hours():
-    """Always true for now — can add custom hours if needed."""
-    return True
-
-
-def is_reset_time():
-    """Check if it's 00:00 UTC+1."""
-    current_utc = datetime.utcnow()
-    local_time = current_utc + TIMEZONE_OFFSET
-    return local_time.hour == DAILY_RESET_HOUR and local_time.minute < 5
-
-
-def send_daily_summary():
-    """Summarize and report daily performance."""
-    capital = load_capital()
-    summary_msg = (
-        f"📅 *Daily Summary ({datetime.utcnow().strftime('%Y-%m-%d')})*\n"
-        f"💰 Balance: ${capital['current_balance']:.2f}\n"
-        f"🏆 Total Trades: {capital['total_trades']}\n"
-        f"✅ Wins: {capital['win_trades']} | ❌ Losses: {capital['loss_trades']}\n"
-        f"📈 Profit: ${capital['total_profit']:.2f}\n"
-        f"📉 Loss: ${capital['total_loss']:.2f}"
-    )
-    send_telegram_message(summary_msg)
+def report_scheduler_stats(scheduler):
+    for name, stats in scheduler.stats().items():
+        registry.histogram("midas_scheduler_lag_seconds", {"job": name},
+                           help="Scheduler job start lag").record(stats["last_lag"])
+        if stats["overruns"] or stats["max_lag"] > 1.0:
+            print(f"⏱️ {name}: {stats}")
 
 
 # ============================================================
-# 🔁 MAIN TRADING LOOP
+# 🚀 STARTUP
 # ============================================================
-capital = load_capital()
-print(f"💰 Starting capital: ${capital['current_balance']:.2f}")
-
-last_prices = {pair: None for pair in PAIR_LIST}
-daily_loss = 0.0
+def start_session(exchange=None, pairs=PAIR_LIST, mode=MODE, exchange_name=EXCHANGE_NAME):
+    """
+    Builds the trading session with the slow startup steps overlapped:
+    the ccxt import, exchange construction and markets cache load run in the
+    background while the data files are checked, and indicator warm-up fetches
+    all pairs in parallel.
+    Returns (session, exchange).
+    """
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="midas-startup") as pool:
+        pending_exchange = pool.submit(connect_exchange, exchange_name, exchange)
+        # 🧩 Data files must be repaired before the session loads capital and positions
+        run_data_safety_check()
+        exchange = pending_exchange.result()
+
+    # 🎯 Capital, positions, paper fills and per-pair strategies for this run
+    session = TradingSession(
+        exchange,
+        pairs,
+        mode=mode,
+        risk_per_trade=RISK_PER_TRADE,
+        take_profit_pct=TAKE_PROFIT_PCT,
+        stop_loss_pct=STOP_LOSS_PCT,
+        trailing_stop_pct=TRAILING_STOP_PCT,
+        daily_max_loss=DAILY_MAX_LOSS,
+        tz_offset=TIMEZONE_OFFSET
+    )
+    session.warm_start(parallel=True)
+    print(f"⚡ Startup completed in {time.perf_counter() - started:.2f}s")
+    print(f"💰 Starting capital: ${session.capital['current_balance']:.2f}")
+    return session, exchange
+
+
+def build_scheduler(session, feed, pair_intervals=PAIR_INTERVALS):
+    """Per-pair poll cadences, the exact daily rollover and the periodic reports."""
+    scheduler = Scheduler()
+    if feed.name == "polling":
+        # Polling is driven by per-pair jobs instead of the feed's own thread
+        for pair, interval in pair_intervals.items():
+            scheduler.every(f"poll:{pair}", interval, lambda pair=pair: feed.poll_once([pair]))
+    else:
+        feed.start()
+    scheduler.daily("daily_rollover", DAILY_RESET_HOUR, session.daily_rollover, tz_offset=TIMEZONE_OFFSET)
+    scheduler.every("scheduler_stats", STATS_INTERVAL, lambda: report_scheduler_stats(scheduler),
+                    first_delay=STATS_INTERVAL)
+    # 📏 Per-stage latency / throughput snapshot
+    scheduler.every("metrics_snapshot", METRICS_SNAPSHOT_INTERVAL, registry.write_snapshot,
+                    first_delay=METRICS_SNAPSHOT_INTERVAL)
+    # 🗂️ Markets metadata refreshed in the background once the cached copy expires
+    markets = find_markets(session.exchange)
+    if markets is not None and markets.markets:
+        scheduler.every("markets_refresh", markets.ttl, markets.refresh_async,
+                        first_delay=max(0.0, markets.ttl - markets.age))
+    return scheduler
 
-while True:
-    try:
-        if is_reset_time():
-            reset_daily_capital()
-            send_daily_summary()
-            send_telegram_message("🔄 Daily reset complete. Starting new trading cycle.")
-            daily_loss = 0.0
-            time.sleep(300)
-            continue
-
-        if not within_trading_hours():
-            time.sleep(60)
-            continue
-
-        for pair in PAIR_LIST:
-            price = fetch_price(pair)
-            if price is None:
-                continue
-
-            signal = analyze_signal(price, last_prices[pair])
-            last_prices[pair] = price
-            if not signal:
-                print(f"⏸️ {pair}: No signal triggered.")
-                continue
-
-            side = signal["side"].upper()
-            trade_size = capital["current_balance"] * RISK_PER_TRADE / price
-            print(f"📊 {pair} price: {price}")
-            print(f"💰 Trade size: {trade_size:.3f}")
-
-            try:
-                trade_result = execute_trade(
-                    pair=pair,
-                    side=side,
-                    price=price,
-                    size=trade_size,
-                    mode=MODE,
-                    take_profit_pct=TAKE_PROFIT_PCT,
-                    stop_loss_pct=STOP_LOSS_PCT,
-                    trailing_stop_pct=TRAILING_STOP_PCT
-                )
-
-                if trade_result["result"] == "win":
-                    update_capital(trade_result["profit"], is_win=True)
-                    send_telegram_message(f"🏆 {pair} WIN +{TAKE_PROFIT_PCT*100:.2f}% ✅")
-                elif trade_result["result"] == "loss":
-                    update_capital(trade_result["profit"], is_win=False)
-                    daily_loss += abs(trade_result["profit"])
-                    send_telegram_message(f"⚠️ {pair} LOSS -{STOP_LOSS_PCT*100:.2f}% ❌")
-                else:
-                    send_telegram_message(f"⚖️ {pair} Breakeven: {TAKE_PROFIT_PCT*100:.2f}%")
-
-                print(f"✅ {pair}: Trade result — {trade_result['result'].upper()} ({trade_result['profit']:.2f}%)")
-
-            except Exception as e:
-                send_telegram_message(f"⚠️ Trade execution error: {e}")
-                print(f"⚠️ Trade execution error: {e}")
-
-            # 🚫 Stop trading if daily max loss reached
-            if daily_loss / capital["current_balance"] >= DAILY_MAX_LOSS:
-                send_telegram_message("🛑 Daily max loss reached. Trading halted until reset.")
-                print("🛑 Daily max loss reached. Pausing trading.")
-                time.sleep(3600)
-                break
-
-        print("✅ Cycle completed.\n")
-        time.sleep(60)
 
-    except Exception as e:
-        print(f"⚠️ Loop error: {e}")
-        send_telegram_message(f"⚠️ Loop error: {e}")
-        time.sleep(60)
+# ============================================================
+# 🔁 MAIN TRADING LOOP (event-driven)
+# ============================================================
+def run_trading_loop(session, feed, scheduler, stop=lambda: False):
+    def process_event(timeout):
+        """Waits up to `timeout` seconds for one feed event and runs the trading cycle on it."""
+        event = feed.get(timeout=timeout)
+        if event is not None:
+            session.process_event(event)
+
+    while not stop():
+        try:
+            scheduler.run(process_event, stop)
+        except Exception as e:
+            print(f"⚠️ Loop error: {e}")
+            notify(f"⚠️ Loop error: {e}")
+            time.sleep(5)
+
+
+def main():
+    session, exchange = start_session()
+    notify(f"🚀 MIDAS Trading Bot started in {MODE} mode — Monitoring {', '.join(PAIR_LIST)}")
+    if METRICS_PORT:
+        start_metrics_server(METRICS_PORT)
+
+    # 📡 Prices are pushed by the feed (polling / websocket / replay) as soon as they change
+    feed = get_feed(FEED_MODE, exchange=exchange, pairs=PAIR_LIST, exchange_name=EXCHANGE_NAME)
+    scheduler = build_scheduler(session, feed)
+    run_trading_loop(session, feed, scheduler)
+
+
+if __name__ == "__main__":
+    main()
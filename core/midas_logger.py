@@ -1,15 +1,17 @@
-import json
-import os
 from datetime import datetime
 
-# Path to the trade log file
-TRADE_LOG_FILE = os.path.join(os.path.dirname(__file__), "trade_log.json")
+from core import midas_storage
+from core.midas_trade_journal import JOURNAL_FILE, get_journal
 
+# Path to the trade log journal (line-delimited, append-only)
+TRADE_LOG_FILE = JOURNAL_FILE
 
-def log_trade(timestamp, pair, side, price, size, result="open"):
+
+def log_trade(timestamp, pair, side, price, size, result="open", profit=None):
     """
-    Logs each trade into trade_log.json without overwriting old data.
-    Automatically repairs corrupted or non-list JSON files.
+    Logs each trade into the append-only trade journal (or the SQLite store with MIDAS_STORAGE=sqlite).
+    Only the new entry is written — existing history is never re-read or rewritten.
+    - profit: realized P&L of a closing trade (quote currency), used by pair_pnl()
     """
 
     new_entry = {
@@ -20,33 +22,41 @@ def log_trade(timestamp, pair, side, price, size, result="open"):
         "size": round(float(size), 3),
         "result": result
     }
+    if profit is not None:
+        new_entry["profit"] = round(float(profit), 6)
 
-    # ✅ Load existing trade data safely
-    data = []
-    if os.path.exists(TRADE_LOG_FILE):
-        try:
-            with open(TRADE_LOG_FILE, "r", encoding="utf-8") as f:
-                existing = json.load(f)
-                if isinstance(existing, list):
-                    data = existing
-                else:
-                    # Convert a single dict into a list
-                    data = [existing]
-        except json.JSONDecodeError:
-            print("⚠️ Warning: trade_log.json was corrupted. Rebuilding...")
-            data = []
-
-    # ✅ Append the new trade
-    data.append(new_entry)
-
-    # ✅ Write back cleanly
-    with open(TRADE_LOG_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4)
+    # ✅ Append the new trade (O(1), independent of history length)
+    if midas_storage.sqlite_enabled():
+        midas_storage.get_store().add_trade(new_entry)
+    else:
+        get_journal().append(new_entry)
 
     print(f"📝 Trade logged: {new_entry}")
     return new_entry
 
 
+def query_trades(pair=None, start=None, end=None):
+    """
+    Trades of one pair (or all) with start <= timestamp < end, oldest first.
+    Indexed with SQLite storage; the JSON journal is streamed and filtered.
+    """
+    if midas_storage.sqlite_enabled():
+        return midas_storage.get_store().trades(pair, start, end)
+    start = midas_storage.time_bound(start, midas_storage.MIN_TIMESTAMP)
+    end = midas_storage.time_bound(end, midas_storage.MAX_TIMESTAMP)
+    return [entry for entry in get_journal().iter_entries()
+            if (pair is None or entry.get("pair") == pair) and start <= entry.get("timestamp", "") < end]
+
+
+def pair_pnl(pair, start=None, end=None):
+    """Realized P&L of one pair between two timestamps: {"pair", "trades", "wins", "losses", "pnl"}."""
+    if midas_storage.sqlite_enabled():
+        return midas_storage.get_store().pair_pnl(pair, start, end)
+    profits = [entry["profit"] for entry in query_trades(pair, start, end) if entry.get("profit") is not None]
+    return {"pair": pair, "trades": len(profits), "wins": sum(p > 0 for p in profits),
+            "losses": sum(p < 0 for p in profits), "pnl": sum(profits)}
+
+
 def log_message(message):
     """Utility function for basic console + file logging (optional)."""
     log_entry = f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {message}"
@@ -55,8 +65,10 @@ def log_message(message):
 
 def reset_trade_log():
     """Clears the trade log — useful for starting a new test session."""
-    with open(TRADE_LOG_FILE, "w", encoding="utf-8") as f:
-        json.dump([], f, indent=4)
+    if midas_storage.sqlite_enabled():
+        midas_storage.get_store().reset_trades()
+    else:
+        get_journal().reset()
     print("🧹 Trade log reset successfully.")
 
 
@@ -68,4 +80,4 @@ if __name__ == "__main__":
     log_trade(datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "XRP/USDT", "buy", 0.5471, 25)
     log_trade(datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "BTC/USDT", "sell", 92500.55, 0.15, "closed")
 
-    print("✅ Logging test complete. Check trade_log.json.")
\ No newline at end of file
+    print("✅ Logging test complete. Check trade_log.jsonl.")
\ No newline at end of file
@@ -0,0 +1,172 @@
+# ======================================================
+# 📡 MIDAS MARKET DATA FETCH STAGE
+# Fetches tickers for every pair in one pass: a single
+# batched fetch_tickers call when the exchange supports
+# it, otherwise bounded concurrent fetch_ticker calls
+# with a per-pair timeout.
+# ======================================================
+
+import copy
+import math
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures import TimeoutError as FutureTimeoutError  # not the builtin before Python 3.11
+
+from core.midas_metrics import count, stage
+
+# Max number of ticker requests in flight at once
+FETCH_MAX_WORKERS = int(os.getenv("FETCH_MAX_WORKERS", 8))
+# Seconds a single pair may take before it is skipped for this cycle
+FETCH_TIMEOUT = float(os.getenv("FETCH_TIMEOUT", 5.0))
+
+_executor = None
+_executor_workers = 0
+_abandoned = set()  # timed-out requests still holding a pool thread
+_executor_lock = threading.Lock()
+_clients = weakref.WeakKeyDictionary()  # exchange → copy with the capped HTTP timeout
+
+
+def _get_executor(max_workers):
+    """
+    Shared worker pool, created on first use and grown if needed. A pool whose threads
+    are held by timed-out requests is replaced, so hung calls never starve later cycles
+    (their threads exit once the request's own timeout fires).
+    """
+    global _executor, _executor_workers
+    with _executor_lock:
+        _abandoned.difference_update([future for future in _abandoned if future.done()])
+        if _executor is None or _executor_workers - len(_abandoned) < max_workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor_workers = max(max_workers, _executor_workers)
+            _executor = ThreadPoolExecutor(max_workers=_executor_workers, thread_name_prefix="midas-fetch")
+            _abandoned.clear()
+        return _executor
+
+
+def _abandon(future):
+    """Gives up on a request: cancelled if still queued, otherwise counted against the pool."""
+    if not future.cancel():
+        with _executor_lock:
+            _abandoned.add(future)
+
+
+def fetch_client(exchange, timeout):
+    """
+    The exchange object ticker fetches go through: a shallow copy whose HTTP timeout
+    (ccxt `timeout`, in ms) is capped at the fetch timeout. It shares the original's
+    session and markets; the shared instance is never mutated, so order calls made
+    from other threads keep their own timeout.
+    """
+    previous = getattr(exchange, "timeout", None)
+    limit = int(timeout * 1000)
+    if not isinstance(previous, (int, float)) or previous <= limit:
+        return exchange
+    with _executor_lock:
+        try:
+            client = _clients.get(exchange)
+        except TypeError:  # not weak-referenceable: copy per call
+            client = None
+        if client is None or client.timeout != limit:
+            client = copy.copy(exchange)
+            client.timeout = limit
+            try:
+                _clients[exchange] = client
+            except TypeError:
+                pass
+    return client
+
+
+def supports_batch(exchange):
+    """True if the exchange can return several tickers in one request."""
+    has = getattr(exchange, "has", None) or {}
+    return bool(has.get("fetchTickers"))
+
+
+def _fetch_batch(exchange, pairs, timeout):
+    """One fetch_tickers round trip for all pairs."""
+    future = _get_executor(1).submit(exchange.fetch_tickers, list(pairs))
+    try:
+        tickers = future.result(timeout=timeout) or {}
+    except FutureTimeoutError:
+        _abandon(future)
+        raise
+    return {pair: tickers.get(pair) for pair in pairs}
+
+
+def _fetch_concurrent(exchange, pairs, max_workers, timeout):
+    """
+    Fetches each pair with its own fetch_ticker call, at most `max_workers` in flight.
+    A pair that has been running longer than `timeout` is dropped for this cycle.
+    """
+    executor = _get_executor(max_workers)
+    started = {}
+
+    def timed_fetch(pair):
+        started[pair] = time.monotonic()
+        return exchange.fetch_ticker(pair)
+
+    pending = {executor.submit(timed_fetch, pair): pair for pair in pairs}
+    results = {pair: None for pair in pairs}
+
+    # Hard stop in case hung requests keep the queued pairs from ever starting
+    deadline = time.monotonic() + timeout * (math.ceil(len(pairs) / max_workers) + 1)
+
+    while pending:
+        now = time.monotonic()
+        expiries = [started[p] + timeout for p in pending.values() if p in started]
+        next_check = min(expiries + [deadline]) - now
+        done, _ = wait(pending, timeout=max(next_check, 0), return_when=FIRST_COMPLETED)
+
+        for future in done:
+            pair = pending.pop(future)
+            try:
+                results[pair] = future.result()
+            except Exception as e:
+                print(f"⚠️ Failed to fetch price for {pair}: {e}")
+
+        now = time.monotonic()
+        for future, pair in list(pending.items()):
+            start = started.get(pair)
+            if now >= deadline or (start is not None and now - start >= timeout):
+                _abandon(future)
+                pending.pop(future)
+                print(f"⚠️ Ticker timeout for {pair} after {timeout:.1f}s — skipped this cycle.")
+
+    return results
+
+
+def fetch_tickers(exchange, pairs, max_workers=FETCH_MAX_WORKERS, timeout=FETCH_TIMEOUT):
+    """
+    Returns {pair: ticker or None} for all pairs.
+    Uses one batched request when available, falling back to concurrent single fetches.
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return {}
+
+    exchange = fetch_client(exchange, timeout)
+    with stage("fetch"):
+        tickers = None
+        if supports_batch(exchange):
+            try:
+                tickers = _fetch_batch(exchange, pairs, timeout)
+            except Exception as e:
+                count("midas_fetch_batch_failures_total", help="Batched fetch_tickers calls that failed")
+                print(f"⚠️ Batched ticker fetch failed ({e}) — falling back to per-pair requests.")
+        if tickers is None:
+            tickers = _fetch_concurrent(exchange, pairs, max(1, min(max_workers, len(pairs))), timeout)
+
+    for pair, ticker in tickers.items():
+        if ticker is None:
+            count("midas_fetch_failures_total", help="Pairs with no ticker after a fetch (error or timeout)", pair=pair)
+    return tickers
+
+
+def fetch_prices(exchange, pairs, max_workers=FETCH_MAX_WORKERS, timeout=FETCH_TIMEOUT):
+    """Returns {pair: last price or None} for all pairs."""
+    tickers = fetch_tickers(exchange, pairs, max_workers=max_workers, timeout=timeout)
+    return {pair: (ticker or {}).get("last") for pair, ticker in tickers.items()}
@@ -0,0 +1,226 @@
+# ======================================================
+# 🗂️ MIDAS MARKETS CACHE
+# Exchange market metadata (precision, limits, fees)
+# persisted to disk so restarts skip load_markets:
+#   • fresh cache  → installed on the exchange, no download
+#   • stale cache  → used immediately, refreshed in the background
+#   • no cache     → one synchronous load_markets
+# Orders are sized against it: amounts are floored to
+# the market's step and checked against min amount /
+# min notional before they reach the exchange.
+# ======================================================
+
+import json
+import os
+import threading
+import time
+from decimal import Decimal, ROUND_DOWN, ROUND_HALF_UP
+
+MARKETS_CACHE_DIR = os.getenv("MARKETS_CACHE_DIR", os.path.dirname(__file__))
+MARKETS_CACHE_TTL = float(os.getenv("MARKETS_CACHE_TTL", 6 * 3600))  # seconds before a background refresh
+
+# ccxt precision modes (ccxt.base.decimal_to_precision)
+DECIMAL_PLACES = 2
+SIGNIFICANT_DIGITS = 3
+TICK_SIZE = 4
+
+
+class OrderSizeError(ValueError):
+    """Raised when an order is below the market's minimum amount or notional after rounding."""
+
+
+def markets_cache_path(exchange_id):
+    return os.path.join(MARKETS_CACHE_DIR, f"markets_{exchange_id}.json")
+
+
+def _strip(market):
+    """Drops the raw exchange payload ("info"), which is most of the download size."""
+    return {key: value for key, value in market.items() if key != "info"}
+
+
+def _to_step(precision, mode):
+    if precision is None:
+        return None
+    if mode == TICK_SIZE:
+        return Decimal(str(precision))
+    return Decimal(1).scaleb(-int(precision))  # decimal places → step
+
+
+def _quantize(value, step, rounding):
+    value = Decimal(str(value))
+    return float((value / step).to_integral_value(rounding=rounding) * step)
+
+
+# ======================================================
+# 🗄️ CACHE
+# ======================================================
+class MarketsCache:
+    """
+    Market metadata for one exchange, by symbol. load() / refresh() install the
+    markets on the exchange (set_markets) so ccxt does not download them again.
+    """
+
+    def __init__(self, exchange, path=None, ttl=MARKETS_CACHE_TTL, clock=time.time):
+        self.exchange = exchange
+        self.exchange_id = getattr(exchange, "id", "exchange")
+        self.path = path or markets_cache_path(self.exchange_id)
+        self.ttl = ttl
+        self.clock = clock
+        self.markets = {}
+        self.precision_mode = getattr(exchange, "precisionMode", TICK_SIZE)
+        self.fetched_at = 0.0
+        self.refreshes = 0
+        self._lock = threading.Lock()
+        self._refreshing = None
+
+    def __contains__(self, symbol):
+        return symbol in self.markets
+
+    def get(self, symbol):
+        return self.markets.get(symbol)
+
+    @property
+    def age(self):
+        return self.clock() - self.fetched_at
+
+    @property
+    def stale(self):
+        return not self.markets or self.age >= self.ttl
+
+    # ==================================================
+    # 💾 DISK
+    # ==================================================
+    def load(self):
+        """Reads the cache file and installs it on the exchange. Returns True if markets were loaded."""
+        if not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            markets = data["markets"]
+        except (json.JSONDecodeError, KeyError, TypeError):
+            print(f"⚠️ Corrupted markets cache for {self.exchange_id} — it will be downloaded again.")
+            return False
+        self._install(markets, data.get("precision_mode", self.precision_mode), data.get("fetched_at", 0.0))
+        return True
+
+    def save(self):
+        with self._lock:
+            data = {"exchange": self.exchange_id, "fetched_at": self.fetched_at,
+                    "precision_mode": self.precision_mode, "markets": self.markets}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def _install(self, markets, precision_mode, fetched_at):
+        with self._lock:
+            self.markets = markets
+            self.precision_mode = precision_mode
+            self.fetched_at = fetched_at
+        set_markets = getattr(self.exchange, "set_markets", None)
+        if set_markets is not None:
+            set_markets(markets)
+
+    # ==================================================
+    # 🔄 REFRESH
+    # ==================================================
+    def refresh(self):
+        """Downloads the markets from the exchange and rewrites the cache file."""
+        markets = self.exchange.load_markets(True)
+        self._install({symbol: _strip(m) for symbol, m in markets.items()},
+                      getattr(self.exchange, "precisionMode", self.precision_mode), self.clock())
+        self.refreshes += 1
+        self.save()
+        print(f"🗂️ Markets refreshed for {self.exchange_id}: {len(self.markets)} symbols.")
+        return self.markets
+
+    def refresh_async(self):
+        """Starts a background refresh unless one is already running. Returns the thread."""
+        with self._lock:
+            if self._refreshing is not None and self._refreshing.is_alive():
+                return self._refreshing
+            self._refreshing = threading.Thread(target=self._refresh_quietly, name="midas-markets", daemon=True)
+            self._refreshing.start()
+            return self._refreshing
+
+    def _refresh_quietly(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"⚠️ Markets refresh failed for {self.exchange_id}: {e} — keeping the cached copy.")
+
+    def ensure(self):
+        """Startup path: disk cache if present (refreshed in the background when stale), else one download."""
+        if not self.load():
+            return self.refresh()
+        if self.stale:
+            self.refresh_async()
+        return self.markets
+
+    # ==================================================
+    # 📏 ORDER SIZING
+    # ==================================================
+    def amount_to_precision(self, symbol, amount):
+        """Floors `amount` to the market's amount step (never rounds an order up)."""
+        market = self.markets.get(symbol)
+        step = market and _to_step((market.get("precision") or {}).get("amount"), self.precision_mode)
+        if not step or self.precision_mode == SIGNIFICANT_DIGITS:
+            return float(amount)
+        return _quantize(amount, step, ROUND_DOWN)
+
+    def price_to_precision(self, symbol, price):
+        market = self.markets.get(symbol)
+        step = market and _to_step((market.get("precision") or {}).get("price"), self.precision_mode)
+        if not step or self.precision_mode == SIGNIFICANT_DIGITS:
+            return float(price)
+        return _quantize(price, step, ROUND_HALF_UP)
+
+    def fee_rate(self, symbol, taker=True):
+        market = self.markets.get(symbol) or {}
+        return market.get("taker" if taker else "maker")
+
+    def normalize_order(self, symbol, amount, price):
+        """
+        Order size the exchange will accept: amount floored to its step, then checked
+        against limits.amount.min and limits.cost.min (min notional at `price`).
+        Raises OrderSizeError if the rounded order is too small. Unknown symbols pass through.
+        """
+        market = self.markets.get(symbol)
+        if market is None:
+            return float(amount)
+        amount = self.amount_to_precision(symbol, amount)
+        limits = market.get("limits") or {}
+        min_amount = (limits.get("amount") or {}).get("min")
+        min_cost = (limits.get("cost") or {}).get("min")
+        if amount <= 0 or (min_amount and amount < min_amount):
+            raise OrderSizeError(f"❌ {symbol}: amount {amount} below the minimum of {min_amount}")
+        if min_cost and price and amount * price < min_cost:
+            raise OrderSizeError(f"❌ {symbol}: notional {amount * price:.4f} below the minimum of {min_cost}")
+        return amount
+
+
+# ======================================================
+# 🌍 PROCESS-WIDE CACHES
+# ======================================================
+_caches = {}
+_default = None
+_caches_lock = threading.Lock()
+
+
+def get_markets_cache(exchange, **kwargs):
+    """Returns the cache for this exchange; the first one created also sizes PAPER orders."""
+    global _default
+    exchange_id = getattr(exchange, "id", "exchange")
+    with _caches_lock:
+        cache = _caches.get(exchange_id)
+        if cache is None:
+            cache = _caches[exchange_id] = MarketsCache(exchange, **kwargs)
+            if _default is None:
+                _default = cache
+    return cache
+
+
+def find_markets(exchange=None):
+    """Cache for `exchange` if one was loaded, else the default one (the real exchange behind PAPER mode)."""
+    return _caches.get(getattr(exchange, "id", None)) or _default
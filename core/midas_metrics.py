@@ -0,0 +1,319 @@
+# ======================================================
+# 📏 MIDAS METRICS
+# Low-overhead latency histograms and counters for the
+# live loop and order path:
+#   • LatencyHistogram — HDR-style log-linear buckets
+#     (~1.6% precision, O(1) record, sparse storage)
+#   • Counter          — monotonically increasing totals
+#   • stage("name")    — context manager / decorator timer
+# Exported as Prometheus text over HTTP (METRICS_PORT)
+# and as a periodic JSON snapshot file.
+# ======================================================
+
+import json
+import os
+import threading
+import time
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_PORT = int(os.getenv("METRICS_PORT", 0))  # 0 = no HTTP endpoint
+METRICS_SNAPSHOT_FILE = os.getenv("METRICS_SNAPSHOT_FILE",
+                                  os.path.join(os.path.dirname(__file__), "metrics_snapshot.json"))
+METRICS_SNAPSHOT_INTERVAL = float(os.getenv("METRICS_SNAPSHOT_INTERVAL", 60))
+
+SUB_BITS = 6  # 2^(SUB_BITS-1) linear sub-buckets per power of two
+_HALF = 1 << (SUB_BITS - 1)
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+# ======================================================
+# 📊 HISTOGRAM
+# ======================================================
+def bucket_index(value):
+    """Log-linear bucket for a non-negative integer: exact below 2^SUB_BITS, ~1/32 relative width above."""
+    if value < (1 << SUB_BITS):
+        return value
+    shift = value.bit_length() - SUB_BITS
+    return (shift + 1) * _HALF + (value >> shift) - _HALF
+
+
+def bucket_lower_bound(index):
+    if index < (1 << SUB_BITS):
+        return index
+    shift = index // _HALF - 1
+    return (index - shift * _HALF) << shift
+
+
+class LatencyHistogram:
+    """Latency distribution in microseconds; record() takes seconds."""
+
+    __slots__ = ("counts", "count", "total", "min", "max", "_lock")
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        micros = seconds * 1e6
+        index = bucket_index(int(micros))
+        with self._lock:
+            self.counts[index] = self.counts.get(index, 0) + 1
+            self.count += 1
+            self.total += micros
+            if self.min is None or micros < self.min:
+                self.min = micros
+            if micros > self.max:
+                self.max = micros
+
+    def percentile(self, q):
+        """Value (µs) at quantile q in [0, 1], reported as the bucket's midpoint."""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            target = max(1, int(round(q * self.count)))
+            seen = 0
+            for index in sorted(self.counts):
+                seen += self.counts[index]
+                if seen >= target:
+                    low, high = bucket_lower_bound(index), bucket_lower_bound(index + 1)
+                    return min(self.max, (low + high) / 2)
+        return self.max
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "mean_us": round(self.total / self.count, 3) if self.count else 0.0,
+            "min_us": round(self.min or 0.0, 3),
+            "max_us": round(self.max, 3),
+            **{f"p{q * 100:g}_us": round(self.percentile(q), 3) for q in QUANTILES},
+        }
+
+    def reset(self):
+        with self._lock:
+            self.counts.clear()
+            self.count = 0
+            self.total = 0.0
+            self.min = None
+            self.max = 0.0
+
+
+class Counter:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+# ======================================================
+# 🗂️ REGISTRY
+# ======================================================
+def _key(name, labels):
+    return name, tuple(sorted((labels or {}).items()))
+
+
+def _label_text(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.help = {}
+        self.started = time.time()
+        self._previous = None  # (timestamp, counters) of the last snapshot, for per-second rates
+
+    def histogram(self, name, labels=None, help=""):
+        key = _key(name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(key, LatencyHistogram())
+                self.help.setdefault(name, help)
+        return histogram
+
+    def counter(self, name, labels=None, help=""):
+        key = _key(name, labels)
+        counter = self.counters.get(key)
+        if counter is None:
+            with self._lock:
+                counter = self.counters.setdefault(key, Counter())
+                self.help.setdefault(name, help)
+        return counter
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.started = time.time()
+
+    # ==================================================
+    # 📤 EXPORT
+    # ==================================================
+    def _items(self):
+        """Sorted (counters, histograms, help) copied under the lock, so a metric registered mid-export can't break it."""
+        with self._lock:
+            return sorted(self.counters.items()), sorted(self.histograms.items()), dict(self.help)
+
+    def prometheus(self):
+        """Prometheus text exposition format (histograms as summaries, in seconds)."""
+        counters, histograms, help = self._items()
+        lines = []
+        described = set()
+
+        def describe(name, kind):
+            if name not in described:
+                described.add(name)
+                if help.get(name):
+                    lines.append(f"# HELP {name} {help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), counter in counters:
+            describe(name, "counter")
+            lines.append(f"{name}{_label_text(labels)} {counter.value}")
+        for (name, labels), histogram in histograms:
+            describe(name, "summary")
+            for q in QUANTILES:
+                lines.append(f"{name}{_label_text(labels, [('quantile', q)])} {histogram.percentile(q) / 1e6:.9f}")
+            lines.append(f"{name}_sum{_label_text(labels)} {histogram.total / 1e6:.9f}")
+            lines.append(f"{name}_count{_label_text(labels)} {histogram.count}")
+        lines.append(f"midas_uptime_seconds {time.time() - self.started:.3f}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        def label(name, labels):
+            return name + _label_text(labels)
+
+        counter_items, histogram_items, _ = self._items()
+        now = time.time()
+        counters = {label(n, l): c.value for (n, l), c in counter_items}
+        since, before = self._previous or (self.started, {})
+        elapsed = max(now - since, 1e-9)
+        self._previous = (now, counters)
+        return {
+            "timestamp": now,
+            "uptime_seconds": round(now - self.started, 3),
+            "counters": counters,
+            # e.g. orders/sec since the previous snapshot
+            "rates_per_sec": {name: round((value - before.get(name, 0)) / elapsed, 3) for name, value in counters.items()},
+            "latency": {label(n, l): h.snapshot() for (n, l), h in histogram_items},
+        }
+
+    def write_snapshot(self, path=METRICS_SNAPSHOT_FILE):
+        """Writes the JSON snapshot (temp file + atomic replace)."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=4)
+        os.replace(tmp_path, path)
+
+
+registry = MetricsRegistry()
+
+
+# ======================================================
+# ⏱️ INSTRUMENTATION HELPERS
+# ======================================================
+class _Stage:
+    """Reusable timer for one stage; works as a context manager or decorator."""
+
+    __slots__ = ("histogram", "started")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+        self.started = threading.local()
+
+    def __enter__(self):
+        self.started.value = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.record(time.perf_counter() - self.started.value)
+        return False
+
+    def __call__(self, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.histogram.record(time.perf_counter() - started)
+        return wrapper
+
+
+class _NoopStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __call__(self, func):
+        return func
+
+
+_NOOP = _NoopStage()
+_stages = {}
+
+
+def stage(name):
+    """
+    Timer for a stage of the live loop / order path, recorded in
+    midas_stage_latency_seconds{stage=name}:
+        with stage("fetch"): ...     or     @stage("execute_trade")
+    """
+    if not METRICS_ENABLED:
+        return _NOOP
+    timer = _stages.get(name)
+    if timer is None:
+        timer = _stages[name] = _Stage(registry.histogram(
+            "midas_stage_latency_seconds", {"stage": name}, help="Latency of each live loop / order stage"))
+    return timer
+
+
+def count(name, amount=1, help="", **labels):
+    """Increments a counter (e.g. count("midas_fetch_failures_total", pair=pair))."""
+    if METRICS_ENABLED:
+        registry.counter(name, labels, help=help).inc(amount)
+
+
+# ======================================================
+# 🌐 PROMETHEUS ENDPOINT
+# ======================================================
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = registry.prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_metrics_server(port=METRICS_PORT, host="0.0.0.0"):
+    """Serves /metrics in a daemon thread (port 0 picks a free port). Returns the server."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="midas-metrics", daemon=True).start()
+    print(f"📏 Metrics endpoint on http://{host}:{server.server_port}/metrics")
+    return server
@@ -0,0 +1,208 @@
+# ======================================================
+# 📬 MIDAS BACKGROUND NOTIFIER
+# Queues Telegram messages and delivers them from a
+# background thread, merging bursts into digest messages
+# and pacing sends under Telegram's rate limits.
+# The trading path only pays for a queue put.
+# ======================================================
+
+import atexit
+import os
+import queue
+import threading
+import time
+
+from core.midas_telegram import send_telegram_message
+
+# Telegram rejects messages longer than this
+TELEGRAM_MAX_LENGTH = 4096
+# Minimum gap between two sends to the same chat (Telegram allows ~1 msg/s)
+MIN_SEND_INTERVAL = float(os.getenv("TELEGRAM_MIN_INTERVAL", 1.0))
+# How long to keep collecting a burst before sending it as one digest
+DIGEST_WINDOW = float(os.getenv("TELEGRAM_DIGEST_WINDOW", 0.5))
+# Pending messages kept while Telegram is unreachable (oldest dropped first)
+MAX_PENDING = int(os.getenv("TELEGRAM_MAX_PENDING", 1000))
+
+DIGEST_SEPARATOR = "\n\n"
+
+
+def build_digests(messages, max_length=TELEGRAM_MAX_LENGTH):
+    """Packs messages into as few Telegram-sized texts as possible, preserving order."""
+    digests = []
+    current = ""
+    for message in messages:
+        # Over-long single messages are cut into chunks
+        chunks = [message[i:i + max_length] for i in range(0, len(message), max_length)] or [""]
+        for chunk in chunks:
+            if not current:
+                current = chunk
+            elif len(current) + len(DIGEST_SEPARATOR) + len(chunk) <= max_length:
+                current += DIGEST_SEPARATOR + chunk
+            else:
+                digests.append(current)
+                current = chunk
+    if current:
+        digests.append(current)
+    return digests
+
+
+class TelegramDispatcher:
+    """
+    Non-blocking Telegram sender.
+    notify() enqueues and returns immediately; a daemon thread does the HTTP work.
+    """
+
+    def __init__(self, sender=send_telegram_message, min_interval=MIN_SEND_INTERVAL,
+                 digest_window=DIGEST_WINDOW, max_pending=MAX_PENDING):
+        self.sender = sender
+        self.min_interval = min_interval
+        self.digest_window = digest_window
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._stop = threading.Event()
+        self._idle = threading.Condition()
+        self._pending = 0
+        self._thread = None
+        self._last_send = 0.0
+        self.sent = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="midas-telegram", daemon=True)
+            self._thread.start()
+        return self
+
+    # ======================================================
+    # 📨 PRODUCER SIDE (hot path)
+    # ======================================================
+    def notify(self, message):
+        """Queues a message for delivery. Never blocks."""
+        message = str(message)
+        with self._idle:
+            self._pending += 1
+        while True:
+            try:
+                self._queue.put_nowait(message)
+                return True
+            except queue.Full:
+                # Telegram has been down for a while — keep the newest messages
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                    self._done(1)
+                except queue.Empty:
+                    pass
+
+    def _done(self, count):
+        with self._idle:
+            self._pending -= count
+            self._idle.notify_all()
+
+    # ======================================================
+    # 🚚 CONSUMER SIDE (background thread)
+    # ======================================================
+    def _collect_burst(self):
+        """Blocks for the first message, then gathers whatever arrives within the digest window."""
+        try:
+            first = self._queue.get(timeout=0.2)
+        except queue.Empty:
+            return []
+
+        messages = [first]
+        deadline = time.monotonic() + self.digest_window
+        while not self._stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                messages.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        # Take anything else already waiting without further delay
+        while True:
+            try:
+                messages.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return messages
+
+    def _send(self, text):
+        wait = self._last_send + self.min_interval - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        try:
+            ok = self.sender(text)
+        except Exception as e:
+            print(f"⚠️ Telegram dispatcher send error: {e}")
+            ok = False
+        self._last_send = time.monotonic()
+        if ok is False:
+            self.failed += 1
+        else:
+            self.sent += 1
+
+    def _run(self):
+        while not (self._stop.is_set() and self._queue.empty()):
+            messages = self._collect_burst()
+            if not messages:
+                continue
+            try:
+                for digest in build_digests(messages):
+                    self._send(digest)
+            finally:
+                self._done(len(messages))
+
+    # ======================================================
+    # 🛑 FLUSH / SHUTDOWN
+    # ======================================================
+    def flush(self, timeout=10.0):
+        """Waits until every queued message has been handed to Telegram."""
+        deadline = time.monotonic() + timeout
+        with self._idle:
+            while self._pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self._thread is None or not self._thread.is_alive():
+                    return False
+                self._idle.wait(min(remaining, 0.1))
+        return True
+
+    def stop(self, timeout=10.0):
+        """Flushes pending messages and stops the background thread."""
+        flushed = self.flush(timeout)
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        if not flushed:
+            print(f"⚠️ Telegram dispatcher stopped with {self._pending} unsent messages.")
+        return flushed
+
+
+# ======================================================
+# 🌐 SHARED DISPATCHER
+# ======================================================
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher():
+    """Returns the process-wide dispatcher, starting it on first use."""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = TelegramDispatcher().start()
+            atexit.register(_dispatcher.stop)
+    return _dispatcher
+
+
+def notify(message):
+    """Fire-and-forget Telegram notification for the trading path."""
+    return get_dispatcher().notify(message)
+
+
+def shutdown_notifier(timeout=10.0):
+    """Flushes and stops the shared dispatcher (called on bot shutdown)."""
+    if _dispatcher is not None:
+        return _dispatcher.stop(timeout)
+    return True
@@ -0,0 +1,286 @@
+# ======================================================
+# 🧾 MIDAS PAPER EXCHANGE
+# Simulated exchange for PAPER mode: keeps balances,
+# fills market and limit orders against the latest
+# ticker or order book (spread + slippage + fees), and
+# batches fill persistence into an append-only journal.
+# Exposes the ccxt calls the bot uses (create_order,
+# fetch_balance, fetch_ticker, ...) so it can stand in
+# for a real exchange object.
+# ======================================================
+
+import atexit
+import itertools
+import json
+import os
+import threading
+import time
+
+from core import midas_durable
+from core.midas_trade_journal import TradeJournal
+
+BASE_DIR = os.path.dirname(__file__)
+PAPER_FILLS_FILE = os.path.join(BASE_DIR, "paper_fills.jsonl")
+PAPER_BALANCES_FILE = os.path.join(BASE_DIR, "paper_balances.json")
+
+PAPER_FEE_PCT = float(os.getenv("PAPER_FEE_PCT", 0.001))  # 0.1% taker fee
+PAPER_MAKER_FEE_PCT = float(os.getenv("PAPER_MAKER_FEE_PCT", PAPER_FEE_PCT))
+PAPER_SLIPPAGE_BPS = float(os.getenv("PAPER_SLIPPAGE_BPS", 2.0))  # market orders only
+PAPER_SPREAD_BPS = float(os.getenv("PAPER_SPREAD_BPS", 2.0))  # used when a ticker has no bid/ask
+PAPER_QUOTE = os.getenv("PAPER_QUOTE", "USDT")
+PAPER_START_BALANCE = float(os.getenv("PAPER_START_BALANCE", 100.0))
+PAPER_FLUSH_SIZE = int(os.getenv("PAPER_FLUSH_SIZE", 1000))  # fills buffered before a journal write
+
+
+class PaperOrderError(Exception):
+    """Raised for orders the paper exchange rejects (unknown price, insufficient balance)."""
+
+
+def split_symbol(symbol):
+    base, _, quote = symbol.partition("/")
+    return base, quote.split(":")[0] or PAPER_QUOTE
+
+
+class PaperExchange:
+    """
+    In-memory simulated exchange.
+    - fee_pct / maker_fee_pct: fraction of notional charged in quote currency
+    - slippage_bps: extra adverse move applied to market orders filled from a ticker
+    - spread_bps: synthetic spread when the ticker carries no bid/ask
+    - allow_short: lets base balances go negative so sell signals can open shorts
+    """
+
+    id = "paper"
+
+    def __init__(self, balances=None, fee_pct=PAPER_FEE_PCT, maker_fee_pct=PAPER_MAKER_FEE_PCT,
+                 slippage_bps=PAPER_SLIPPAGE_BPS, spread_bps=PAPER_SPREAD_BPS, allow_short=True,
+                 fills_path=PAPER_FILLS_FILE, balances_path=PAPER_BALANCES_FILE, flush_size=PAPER_FLUSH_SIZE):
+        self.fee_pct = fee_pct
+        self.maker_fee_pct = maker_fee_pct
+        self.slippage = slippage_bps / 10_000
+        self.half_spread = spread_bps / 20_000
+        self.allow_short = allow_short
+        self.balances_path = balances_path
+        self.flush_size = flush_size
+        self.journal = TradeJournal(fills_path, legacy_path=None) if fills_path else None
+        self.has = {"fetchTicker": True, "fetchTickers": True, "createOrder": True, "fetchBalance": True}
+
+        self._lock = threading.RLock()
+        self._ids = itertools.count(1)
+        self.balances = {PAPER_QUOTE: PAPER_START_BALANCE} if balances is None else dict(balances)
+        if balances is None:
+            self._load_balances()
+        self.tickers = {}  # symbol → (bid, ask, last, timestamp)
+        self.books = {}  # symbol → (bids, asks, timestamp) with levels as [[price, amount], ...]
+        self.orders = {}  # id → order dict
+        self.open_orders = {}  # symbol → {id: order}
+        self.fees_paid = 0.0
+        self.fills = 0
+        self._pending = []  # fills waiting for the next journal write
+
+    # ==================================================
+    # 📡 MARKET DATA
+    # ==================================================
+    def on_ticker(self, symbol, ticker):
+        """
+        Updates the reference price for `symbol` (a ccxt ticker dict or a plain price)
+        and fills any resting limit orders it crosses. Returns the fills made.
+        """
+        if isinstance(ticker, dict):
+            last = ticker.get("last")
+            bid, ask = ticker.get("bid") or last, ticker.get("ask") or last
+            timestamp = ticker.get("timestamp")
+        else:
+            last = bid = ask = float(ticker)
+            timestamp = None
+        if last is None:
+            return []
+        if bid == ask:
+            bid, ask = last * (1 - self.half_spread), last * (1 + self.half_spread)
+        timestamp = timestamp or int(time.time() * 1000)
+        self.tickers[symbol] = (bid, ask, last, timestamp)
+        if symbol in self.books and self.books[symbol][2] < timestamp:
+            del self.books[symbol]  # a newer price makes the book stale; fall back to top of book
+        if self.open_orders.get(symbol):
+            return self._match_resting(symbol, bid, ask)
+        return []
+
+    def on_order_book(self, symbol, order_book):
+        """
+        Stores a ccxt order book ({"bids": [[p, a], ...], "asks": ...}); market orders walk it
+        until a newer ticker arrives.
+        """
+        bids, asks = order_book.get("bids") or [], order_book.get("asks") or []
+        timestamp = order_book.get("timestamp") or int(time.time() * 1000)
+        self.books[symbol] = (bids, asks, timestamp)
+        if bids and asks:
+            last = self.tickers.get(symbol, (None, None, (bids[0][0] + asks[0][0]) / 2))[2]
+            return self.on_ticker(symbol, {"bid": bids[0][0], "ask": asks[0][0], "last": last,
+                                           "timestamp": timestamp})
+        return []
+
+    def fetch_ticker(self, symbol):
+        bid, ask, last, timestamp = self.tickers[symbol]
+        return {"symbol": symbol, "bid": bid, "ask": ask, "last": last, "timestamp": timestamp}
+
+    def fetch_tickers(self, symbols=None):
+        return {s: self.fetch_ticker(s) for s in (symbols or self.tickers) if s in self.tickers}
+
+    def fetch_balance(self):
+        with self._lock:
+            return {"free": dict(self.balances), "total": dict(self.balances)}
+
+    # ==================================================
+    # 🧾 ORDERS
+    # ==================================================
+    def create_order(self, symbol, type, side, amount, price=None, params=None):
+        """
+        ccxt-compatible order entry.
+        Market orders fill immediately; limit orders fill now if marketable, otherwise rest.
+        `price` on a market order is only a fallback reference when no ticker is known yet.
+        """
+        side, type, amount = side.lower(), type.lower(), float(amount)
+        if amount <= 0:
+            raise PaperOrderError(f"❌ Invalid amount for {symbol}: {amount}")
+        if symbol not in self.tickers:
+            if price is None:
+                raise PaperOrderError(f"❌ No market price for {symbol} yet")
+            self.on_ticker(symbol, price)
+
+        order = {"id": str(next(self._ids)), "symbol": symbol, "type": type, "side": side,
+                 "amount": amount, "price": price, "filled": 0.0, "average": None,
+                 "status": "open", "fee": None, "timestamp": int(time.time() * 1000)}
+        with self._lock:
+            self.orders[order["id"]] = order
+            bid, ask = self.tickers[symbol][:2]
+            if type == "market":
+                fill_price = self._market_price(symbol, side, amount, bid, ask)
+                self._fill(order, fill_price, self.fee_pct)
+            elif type == "limit":
+                if price is None:
+                    raise PaperOrderError("❌ Limit orders need a price")
+                if (side == "buy" and ask <= price) or (side == "sell" and bid >= price):
+                    self._fill(order, min(price, ask) if side == "buy" else max(price, bid), self.fee_pct)
+                else:
+                    self.open_orders.setdefault(symbol, {})[order["id"]] = order
+            else:
+                raise PaperOrderError(f"❌ Unsupported order type: {type}")
+        return order
+
+    def cancel_order(self, id, symbol=None, params=None):
+        with self._lock:
+            order = self.orders[id]
+            if order["status"] == "open":
+                self.open_orders.get(order["symbol"], {}).pop(id, None)
+                order["status"] = "canceled"
+            return order
+
+    def fetch_order(self, id, symbol=None, params=None):
+        return self.orders[id]
+
+    def fetch_open_orders(self, symbol=None, since=None, limit=None, params=None):
+        with self._lock:
+            books = [self.open_orders.get(symbol, {})] if symbol else self.open_orders.values()
+            return [order for book in books for order in book.values()]
+
+    def _market_price(self, symbol, side, amount, bid, ask):
+        """Average fill price: walks the order book if one is known, else top of book plus slippage."""
+        bids, asks, _ = self.books.get(symbol, ((), (), None))
+        levels = asks if side == "buy" else bids
+        if levels:
+            remaining, cost = amount, 0.0
+            for level_price, level_amount in levels:
+                take = min(remaining, level_amount)
+                cost += take * level_price
+                remaining -= take
+                if remaining <= 0:
+                    return cost / amount
+            # Book exhausted: the rest fills at the last level with slippage
+            worst = levels[-1][0] * (1 + self.slippage if side == "buy" else 1 - self.slippage)
+            return (cost + remaining * worst) / amount
+        return ask * (1 + self.slippage) if side == "buy" else bid * (1 - self.slippage)
+
+    def _match_resting(self, symbol, bid, ask):
+        """Fills the resting orders this price crosses; one the balance no longer covers is rejected."""
+        fills = []
+        with self._lock:
+            resting = self.open_orders[symbol]
+            for order_id, order in list(resting.items()):
+                if (order["side"] == "buy" and ask <= order["price"]) or (order["side"] == "sell" and bid >= order["price"]):
+                    del resting[order_id]
+                    try:
+                        fills.append(self._fill(order, order["price"], self.maker_fee_pct))
+                    except PaperOrderError as e:
+                        print(f"{e} — resting order {order_id} rejected")  # status already "rejected"
+        return fills
+
+    def _fill(self, order, fill_price, fee_pct):
+        base, quote = split_symbol(order["symbol"])
+        amount = order["amount"]
+        notional = amount * fill_price
+        fee = notional * fee_pct
+        balances = self.balances
+        if order["side"] == "buy":
+            if balances.get(quote, 0.0) < notional + fee:
+                order["status"] = "rejected"
+                raise PaperOrderError(f"❌ Insufficient {quote} balance for {order['symbol']} buy")
+            balances[quote] = balances.get(quote, 0.0) - notional - fee
+            balances[base] = balances.get(base, 0.0) + amount
+        else:
+            if not self.allow_short and balances.get(base, 0.0) < amount:
+                order["status"] = "rejected"
+                raise PaperOrderError(f"❌ Insufficient {base} balance for {order['symbol']} sell")
+            balances[base] = balances.get(base, 0.0) - amount
+            balances[quote] = balances.get(quote, 0.0) + notional - fee
+
+        order.update(filled=amount, average=fill_price, status="closed", cost=notional,
+                     fee={"cost": fee, "currency": quote})
+        self.fees_paid += fee
+        self.fills += 1
+        self._pending.append({"id": order["id"], "timestamp": order["timestamp"], "symbol": order["symbol"],
+                              "type": order["type"], "side": order["side"], "amount": amount,
+                              "price": fill_price, "fee": fee})
+        if len(self._pending) >= self.flush_size:
+            self.flush()
+        return order
+
+    # ==================================================
+    # 💾 BATCHED PERSISTENCE
+    # ==================================================
+    def _load_balances(self):
+        if self.balances_path and os.path.exists(self.balances_path):
+            try:
+                with open(self.balances_path, "r", encoding="utf-8") as f:
+                    self.balances = {k: float(v) for k, v in json.load(f).items()}
+            except (json.JSONDecodeError, AttributeError, ValueError):
+                print("⚠️ Corrupted paper balances file detected. Starting from the default balance.")
+
+    def flush(self):
+        """Appends buffered fills to the journal in one write and snapshots balances."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+            balances = dict(self.balances)
+        if self.journal is not None and pending:
+            self.journal.append_many(pending)
+        if self.balances_path:
+            midas_durable.write_json(self.balances_path, balances)
+        return len(pending)
+
+    def close(self):
+        self.flush()
+        if self.journal is not None:
+            self.journal.close()
+
+
+_paper = None
+_paper_lock = threading.Lock()
+
+
+def get_paper_exchange():
+    """Returns the process-wide paper exchange (balances restored from disk once)."""
+    global _paper
+    with _paper_lock:
+        if _paper is None:
+            _paper = PaperExchange()
+            atexit.register(_paper.close)
+    return _paper
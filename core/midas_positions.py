@@ -0,0 +1,266 @@
+# ======================================================
+# 📂 MIDAS POSITION BOOK
+# In-memory open positions indexed by pair. Every price
+# update is checked against take-profit, stop-loss and
+# trailing-stop levels in O(1) per position; disk writes
+# and Telegram messages only happen when a position is
+# opened or closed.
+# ======================================================
+
+import itertools
+import json
+import os
+import threading
+from collections import namedtuple
+from datetime import datetime
+
+from core import midas_durable
+from core.midas_logger import log_trade
+from core.midas_metrics import count, stage
+from core.midas_notifier import notify
+
+POSITIONS_FILE = os.path.join(os.path.dirname(__file__), "open_positions.json")
+
+# reason: "take_profit", "stop_loss", "trailing_stop" or "manual"; pnl_pct in percent,
+# profit in quote currency net of entry fees
+ExitEvent = namedtuple("ExitEvent", ["id", "pair", "side", "entry_price", "exit_price", "size",
+                                     "reason", "pnl_pct", "profit"])
+
+
+class Position:
+    __slots__ = ("id", "pair", "side", "entry_price", "size", "take_profit", "stop_loss",
+                 "trailing_pct", "extreme", "trailing_active", "opened_at", "fees")
+
+    def __init__(self, id, pair, side, entry_price, size, take_profit=None, stop_loss=None,
+                 trailing_pct=None, extreme=None, trailing_active=False, opened_at=None, fees=0.0):
+        self.id = id
+        self.pair = pair
+        self.side = side.lower()
+        self.entry_price = float(entry_price)
+        self.size = float(size)
+        self.take_profit = take_profit
+        self.stop_loss = stop_loss
+        self.trailing_pct = trailing_pct
+        self.extreme = float(extreme if extreme is not None else entry_price)  # best price seen
+        self.trailing_active = trailing_active  # stop has been moved by the trail
+        self.opened_at = opened_at or datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        self.fees = float(fees)  # entry fees already paid, in quote currency
+
+    @property
+    def is_long(self):
+        return self.side == "buy"
+
+    def pnl_pct(self, price):
+        move = (price - self.entry_price) / self.entry_price * 100
+        return move if self.is_long else -move
+
+    def check(self, price):
+        """Updates the trailing stop and returns the exit reason hit at this price (or None)."""
+        if self.is_long:
+            if self.trailing_pct and price > self.extreme:
+                self.extreme = price
+                trail = price * (1 - self.trailing_pct)
+                if self.stop_loss is None or trail > self.stop_loss:
+                    self.stop_loss = trail
+                    self.trailing_active = True
+            if self.stop_loss is not None and price <= self.stop_loss:
+                return "trailing_stop" if self.trailing_active else "stop_loss"
+            if self.take_profit is not None and price >= self.take_profit:
+                return "take_profit"
+        else:
+            if self.trailing_pct and price < self.extreme:
+                self.extreme = price
+                trail = price * (1 + self.trailing_pct)
+                if self.stop_loss is None or trail < self.stop_loss:
+                    self.stop_loss = trail
+                    self.trailing_active = True
+            if self.stop_loss is not None and price >= self.stop_loss:
+                return "trailing_stop" if self.trailing_active else "stop_loss"
+            if self.take_profit is not None and price <= self.take_profit:
+                return "take_profit"
+        return None
+
+    def to_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+def trade_levels(side, entry_price, take_profit_pct=None, stop_loss_pct=None):
+    """Absolute (take_profit, stop_loss) prices for a long ("buy") or short ("sell") entry."""
+    sign = 1 if side.lower() == "buy" else -1
+    take_profit = entry_price * (1 + sign * take_profit_pct) if take_profit_pct else None
+    stop_loss = entry_price * (1 - sign * stop_loss_pct) if stop_loss_pct else None
+    return take_profit, stop_loss
+
+
+# ======================================================
+# 📒 POSITION BOOK
+# ======================================================
+class PositionBook:
+    """
+    Open positions by pair ({pair: {id: Position}}), so a price update only
+    touches that pair's positions. Persisted to a JSON snapshot on open/close;
+    trailing-stop progress is saved by flush().
+    """
+
+    def __init__(self, path=POSITIONS_FILE, notify_changes=True):
+        self.path = path
+        self.notify_changes = notify_changes
+        self._lock = threading.RLock()
+        self._by_pair = {}
+        self._ids = itertools.count(1)
+        self._dirty = False  # a trailing stop moved since the last save
+        self.opened = 0
+        self.closed = 0
+        self.load()
+
+    def __len__(self):
+        return sum(len(positions) for positions in self._by_pair.values())
+
+    def positions(self, pair=None):
+        with self._lock:
+            if pair is not None:
+                return list(self._by_pair.get(pair, {}).values())
+            return [p for positions in self._by_pair.values() for p in positions.values()]
+
+    def has_position(self, pair):
+        return bool(self._by_pair.get(pair))
+
+    # ==================================================
+    # 💾 PERSISTENCE
+    # ==================================================
+    def load(self):
+        if self.path is None or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                records = json.load(f)
+        except json.JSONDecodeError:
+            print("⚠️ Corrupted positions file detected. Starting with no open positions.")
+            return
+        last_id = 0
+        for record in records:
+            position = Position(**record)
+            self._by_pair.setdefault(position.pair, {})[position.id] = position
+            last_id = max(last_id, position.id)
+        self._ids = itertools.count(last_id + 1)
+        if records:
+            print(f"📂 Restored {len(records)} open position(s).")
+
+    def save(self):
+        """Writes all open positions (through the durable-state WAL)."""
+        if self.path is None:
+            return
+        with self._lock:
+            records = [p.to_dict() for p in self.positions()]
+            self._dirty = False
+        with stage("positions_save"):
+            midas_durable.write_json(self.path, records)
+
+    def flush(self):
+        """Saves trailing-stop progress made since the last save (joins the current durable cycle, if any)."""
+        if self._dirty:
+            self.save()
+
+    # ==================================================
+    # 🔓 OPEN / CLOSE
+    # ==================================================
+    def open(self, pair, side, price, size, take_profit_pct=None, stop_loss_pct=None, trailing_stop_pct=None,
+             fees=0.0):
+        take_profit, stop_loss = trade_levels(side, price, take_profit_pct, stop_loss_pct)
+        with self._lock:
+            position = Position(next(self._ids), pair, side, price, size, take_profit, stop_loss,
+                                trailing_stop_pct or None, fees=fees)
+            self._by_pair.setdefault(pair, {})[position.id] = position
+            self.opened += 1
+        self.save()
+
+        log_trade(position.opened_at, pair, side, price, size, result="open")
+        if self.notify_changes:
+            levels = []
+            if take_profit is not None:
+                levels.append(f"TP: {take_profit:.4f}")
+            if stop_loss is not None:
+                levels.append(f"SL: {stop_loss:.4f}")
+            if trailing_stop_pct:
+                levels.append(f"Trail: {trailing_stop_pct*100:.2f}%")
+            notify(f"📥 Opened {side.upper()} {pair} @ {price:.4f} ({size:.4f})\n{' | '.join(levels)}")
+        return position
+
+    def _exit_event(self, position, price, reason):
+        pnl_pct = position.pnl_pct(price)
+        profit = position.entry_price * position.size * pnl_pct / 100 - position.fees
+        return ExitEvent(position.id, position.pair, position.side, position.entry_price, price,
+                         position.size, reason, pnl_pct, profit)
+
+    def _record_exits(self, exits):
+        self.closed += len(exits)
+        for event in exits:
+            count("midas_position_exits_total", help="Positions closed, by exit reason", reason=event.reason)
+        self.save()
+        timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        for event in exits:
+            result = "win" if event.profit > 0 else "loss" if event.profit < 0 else "breakeven"
+            exit_side = "sell" if event.side == "buy" else "buy"
+            log_trade(timestamp, event.pair, exit_side, event.exit_price, event.size, result=result, profit=event.profit)
+            if self.notify_changes:
+                icon = "🏆" if event.profit > 0 else "⚠️" if event.profit < 0 else "⚖️"
+                notify(f"{icon} Closed {event.pair} ({event.reason.replace('_', ' ')}) @ {event.exit_price:.4f} "
+                       f"— {event.pnl_pct:+.2f}% ({event.profit:+.2f})")
+
+    def on_price(self, pair, price, execute=None):
+        """
+        Checks every open position of `pair` against this price. Returns the ExitEvents closed.
+        - execute: optional callback sending the exit order for an ExitEvent; returns the realized
+          profit, or None if the order failed — that position stays open and is retried on the
+          next price. Positions are only saved / journaled as closed once their exit is filled.
+        """
+        positions = self._by_pair.get(pair)
+        if not positions:
+            return []
+        triggered = []
+        with self._lock:
+            for position in list(positions.values()):
+                extreme = position.extreme
+                reason = position.check(price)
+                if reason is not None:
+                    del positions[position.id]
+                    triggered.append((position, self._exit_event(position, price, reason)))
+                elif position.extreme != extreme:
+                    self._dirty = True
+
+        exits, failed = [], []
+        for position, event in triggered:
+            profit = execute(event) if execute is not None else event.profit
+            if profit is None:
+                failed.append(position)
+            else:
+                exits.append(event._replace(profit=profit))
+        if failed:
+            with self._lock:
+                for position in failed:
+                    self._by_pair.setdefault(pair, {})[position.id] = position
+        if exits:
+            self._record_exits(exits)
+        return exits
+
+    def close(self, pair, price, reason="manual"):
+        """Closes every open position of `pair` at `price`."""
+        with self._lock:
+            positions = self._by_pair.pop(pair, {})
+            exits = [self._exit_event(p, price, reason) for p in positions.values()]
+        if exits:
+            self._record_exits(exits)
+        return exits
+
+
+_book = None
+_book_lock = threading.Lock()
+
+
+def get_position_book():
+    """Returns the process-wide position book, restored from disk once."""
+    global _book
+    with _book_lock:
+        if _book is None:
+            _book = PositionBook()
+    return _book
@@ -0,0 +1,179 @@
+# ======================================================
+# ⏱️ MIDAS EVENT SCHEDULER
+# Monotonic-clock job scheduler for the trading loop:
+#   • fixed-rate jobs (per-pair polling cadences) whose
+#     deadlines never drift with how long a run takes
+#   • exact wall-clock one-shots (daily reset / summary)
+#     that fire even if the loop was busy at that minute
+#   • per-job lag / overrun metrics
+# ======================================================
+
+import heapq
+import itertools
+import time
+from datetime import datetime, timedelta, timezone
+
+
+class Job:
+    __slots__ = ("name", "callback", "interval", "deadline", "daily", "target", "runs", "overruns",
+                 "skipped", "max_lag", "last_lag", "last_duration", "errors", "cancelled")
+
+    def __init__(self, name, callback, interval=None, deadline=0.0, daily=None):
+        self.name = name
+        self.callback = callback
+        self.interval = interval  # seconds for fixed-rate jobs, None for one-shots
+        self.deadline = deadline  # monotonic time of the next run
+        self.daily = daily  # (hour, minute, tz offset) for daily wall-clock jobs
+        self.target = None  # wall-clock UTC datetime the daily deadline stands for
+        self.runs = 0
+        self.overruns = 0  # runs that finished after the next deadline
+        self.skipped = 0  # whole intervals skipped to catch up
+        self.max_lag = 0.0
+        self.last_lag = 0.0
+        self.last_duration = 0.0
+        self.errors = 0
+        self.cancelled = False
+
+    def stats(self):
+        return {
+            "runs": self.runs,
+            "overruns": self.overruns,
+            "skipped": self.skipped,
+            "errors": self.errors,
+            "max_lag": round(self.max_lag, 4),
+            "last_lag": round(self.last_lag, 4),
+            "last_duration": round(self.last_duration, 4),
+        }
+
+
+def next_daily_time(hour, minute=0, tz_offset=timedelta(0), now=None):
+    """Next wall-clock occurrence (UTC datetime) of hour:minute in the given UTC offset."""
+    now = now or datetime.now(timezone.utc)
+    local = now + tz_offset
+    target = local.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= local:
+        target += timedelta(days=1)
+    return target - tz_offset
+
+
+class Scheduler:
+    """
+    Heap of jobs ordered by monotonic deadline. run_pending() runs everything
+    that is due and returns the seconds until the next deadline, so the caller
+    can block on its own event source (e.g. the market feed) for exactly that long.
+    """
+
+    def __init__(self, clock=time.monotonic, wall_clock=None):
+        self.clock = clock
+        self.wall_clock = wall_clock or (lambda: datetime.now(timezone.utc))
+        self.jobs = {}
+        self._heap = []
+        self._seq = itertools.count()
+
+    def _push(self, job):
+        heapq.heappush(self._heap, (job.deadline, next(self._seq), job))
+
+    def _add(self, job):
+        if job.name in self.jobs:
+            self.jobs[job.name].cancelled = True
+        self.jobs[job.name] = job
+        self._push(job)
+        return job
+
+    # ==================================================
+    # 📅 REGISTRATION
+    # ==================================================
+    def every(self, name, interval, callback, first_delay=0.0):
+        """Fixed-rate job: deadlines advance by `interval` from the previous deadline, not from run end."""
+        return self._add(Job(name, callback, interval=float(interval), deadline=self.clock() + first_delay))
+
+    def after(self, name, delay, callback):
+        """One-shot job `delay` seconds from now."""
+        return self._add(Job(name, callback, deadline=self.clock() + delay))
+
+    def at(self, name, when, callback):
+        """One-shot job at a wall-clock UTC datetime."""
+        delay = (when - self.wall_clock()).total_seconds()
+        return self._add(Job(name, callback, deadline=self.clock() + max(0.0, delay)))
+
+    def daily(self, name, hour, callback, minute=0, tz_offset=timedelta(0)):
+        """Runs exactly once per day at hour:minute (local to tz_offset), rescheduled after each run."""
+        job = Job(name, callback, daily=(hour, minute, tz_offset))
+        job.deadline = self._daily_deadline(job)
+        return self._add(job)
+
+    def _daily_deadline(self, job):
+        hour, minute, tz_offset = job.daily
+        now = self.wall_clock()
+        # Counted from the previous target, not just the wall clock: a monotonic deadline
+        # reached a little before the wall-clock time must not land on the same day again
+        after = now if job.target is None else max(now, job.target)
+        job.target = next_daily_time(hour, minute, tz_offset, now=after)
+        return self.clock() + (job.target - now).total_seconds()
+
+    def cancel(self, name):
+        job = self.jobs.pop(name, None)
+        if job is not None:
+            job.cancelled = True
+
+    # ==================================================
+    # ▶️ EXECUTION
+    # ==================================================
+    def time_until_next(self):
+        while self._heap and self._heap[0][2].cancelled:
+            heapq.heappop(self._heap)
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - self.clock())
+
+    def run_pending(self):
+        """Runs every due job once. Returns seconds until the next deadline (None if no jobs)."""
+        now = self.clock()
+        while self._heap and self._heap[0][0] <= now:
+            _, _, job = heapq.heappop(self._heap)
+            if job.cancelled:
+                continue
+            self._run_job(job, now)
+            now = self.clock()
+        return self.time_until_next()
+
+    def _run_job(self, job, now):
+        job.last_lag = now - job.deadline
+        job.max_lag = max(job.max_lag, job.last_lag)
+        started = self.clock()
+        try:
+            job.callback()
+        except Exception as e:
+            job.errors += 1
+            print(f"⚠️ Scheduled job '{job.name}' failed: {e}")
+        finished = self.clock()
+        job.last_duration = finished - started
+        job.runs += 1
+
+        if job.interval is not None:
+            job.deadline += job.interval
+            if finished > job.deadline:
+                # Run took longer than its cadence: skip the missed slots instead of bursting
+                job.overruns += 1
+                missed = int((finished - job.deadline) // job.interval) + 1
+                job.skipped += missed
+                job.deadline += missed * job.interval
+            self._push(job)
+        elif job.daily is not None:
+            job.deadline = self._daily_deadline(job)
+            self._push(job)
+        elif self.jobs.get(job.name) is job:
+            del self.jobs[job.name]
+
+    def run(self, wait, stop=lambda: False, max_wait=1.0):
+        """
+        Drives the scheduler until stop() is true. Between deadlines it calls
+        wait(timeout) — the caller's event pump — instead of sleeping.
+        """
+        while not stop():
+            until_next = self.run_pending()
+            timeout = max_wait if until_next is None else min(until_next, max_wait)
+            wait(timeout)
+
+    def stats(self):
+        return {name: job.stats() for name, job in self.jobs.items()}
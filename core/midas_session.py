@@ -0,0 +1,250 @@
+# ======================================================
+# 🎯 MIDAS TRADING SESSION
+# The per-price trading cycle — paper fills, position
+# exits, streaming signals, entries, capital and daily
+# risk — as one object, so the live loop, tests and
+# benchmarks all drive exactly the same code.
+# ======================================================
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from core import midas_durable
+from core.midas_capital_tracker import flush_capital, load_capital, record_trade_profit, reset_daily_capital
+from core.midas_daily_summary import (build_daily_summary, flush_daily_aggregates, log_daily_summary,
+                                      record_trade_close)
+from core.midas_indicators import PairStrategy, load_strategy_config, warm_start_from_exchange
+from core.midas_metrics import count, stage
+from core.midas_notifier import notify
+from core.midas_paper_exchange import get_paper_exchange
+from core.midas_positions import get_position_book
+from core.midas_smart_order import execute_trade, execute_exit
+
+RISK_PER_TRADE = 0.015  # 1.5% of capital per trade
+STOP_LOSS_PCT = 0.01  # 1% stop loss
+TAKE_PROFIT_PCT = 0.02  # 2% take profit per trade
+TRAILING_STOP_PCT = 0.02  # optional trailing stop
+DAILY_MAX_LOSS = 0.015  # 1.5% daily max loss
+TIMEZONE_OFFSET = timedelta(hours=1)  # UTC+1 for Nigeria
+
+
+class TradingSession:
+    """
+    Trading state for one process: capital snapshot, daily loss, halt flag,
+    per-pair strategies, the position book and (in PAPER mode) the paper exchange.
+    With a shared `risk` ledger (sharded workers), capital, daily loss, the halt
+    flag and open exposure live in the ledger instead, so limits hold across processes.
+    """
+
+    def __init__(self, exchange, pairs, mode="PAPER", strategy_config=None, positions=None, paper=None,
+                 risk_per_trade=RISK_PER_TRADE, take_profit_pct=TAKE_PROFIT_PCT, stop_loss_pct=STOP_LOSS_PCT,
+                 trailing_stop_pct=TRAILING_STOP_PCT, daily_max_loss=DAILY_MAX_LOSS, tz_offset=TIMEZONE_OFFSET,
+                 verbose=True, risk=None):
+        self.exchange = exchange
+        self.pairs = list(pairs)
+        self.mode = mode.upper()
+        self.risk_per_trade = risk_per_trade
+        self.take_profit_pct = take_profit_pct
+        self.stop_loss_pct = stop_loss_pct
+        self.trailing_stop_pct = trailing_stop_pct
+        self.daily_max_loss = daily_max_loss
+        self.tz_offset = tz_offset
+        self.verbose = verbose
+        self.risk = risk
+
+        self.capital = risk.capital() if risk is not None else load_capital()
+        self._daily_loss = 0.0
+        self._halted = False
+
+        # 📂 Open positions (restored from disk) — exits are checked on every price
+        self.positions = positions if positions is not None else get_position_book()
+        # 🧾 PAPER mode fills on a simulated exchange fed by the same price stream
+        self.paper = None if self.mode == "LIVE" else (paper or get_paper_exchange())
+        # 📈 Per-pair streaming indicators
+        config = strategy_config or load_strategy_config()
+        self.strategies = {pair: PairStrategy(config) for pair in self.pairs}
+        if risk is not None:
+            # Positions restored from disk count against the shared exposure limit again
+            for position in self.positions.positions():
+                risk.reserve(position.entry_price * position.size, force=True)
+
+    @property
+    def daily_loss(self):
+        return self.risk.daily_loss if self.risk is not None else self._daily_loss
+
+    @daily_loss.setter
+    def daily_loss(self, value):
+        self._daily_loss = value
+
+    @property
+    def halted(self):
+        return self.risk.halted if self.risk is not None else self._halted
+
+    @halted.setter
+    def halted(self, value):
+        if self.risk is not None:
+            self.risk.set_halted(value)
+        else:
+            self._halted = value
+
+    def warm_start(self, parallel=False):
+        """Warms every pair's indicators up on recent exchange candles (one thread per pair if parallel)."""
+        if not parallel:
+            for pair, strategy in self.strategies.items():
+                warm_start_from_exchange(strategy, self.exchange, pair)
+            return
+        with ThreadPoolExecutor(max_workers=len(self.strategies) or 1, thread_name_prefix="midas-warmup") as pool:
+            for pair, strategy in self.strategies.items():
+                pool.submit(warm_start_from_exchange, strategy, self.exchange, pair)
+
+    # ==================================================
+    # 📊 HELPERS
+    # ==================================================
+    def analyze_signal(self, pair, price, timestamp):
+        """
+        Tuned RSI/ADX/EMA crossover (midas_best_config.json), updated in O(1) per tick.
+        Signals are only evaluated when a 5m candle closes, like in the backtest.
+        """
+        side = self.strategies[pair].on_price(price, timestamp)
+        return {"side": side} if side else None
+
+    def within_trading_hours(self):
+        """Always true for now — can add custom hours if needed."""
+        return True
+
+    def trading_day(self, offset=timedelta(0)):
+        """Local (UTC+1) trading date, optionally shifted by `offset`."""
+        return (datetime.utcnow() + self.tz_offset + offset).strftime("%Y-%m-%d")
+
+    # ==================================================
+    # 🎯 PER-PRICE CYCLE
+    # ==================================================
+    def handle_exits(self, pair, price):
+        """Applies TP / SL / trailing exits triggered by this price to the capital ledger."""
+        venue = self.paper or self.exchange
+        exits = self.positions.on_price(pair, price,
+                                        execute=lambda event: execute_exit(event, exchange=venue, mode=self.mode))
+        for event in exits:
+            profit = event.profit  # realized at the exit fill
+            if self.risk is not None:
+                # The supervisor persists capital and the daily aggregates for every worker
+                self.capital = self.risk.record_close(pair, profit, self.trading_day(),
+                                                      event.entry_price * event.size)
+                continue
+            self.capital = record_trade_profit(profit)
+            record_trade_close(pair, profit, self.trading_day())
+            if profit < 0:
+                self.daily_loss += abs(profit)
+            print(f"✅ {pair}: {event.reason} — {event.pnl_pct:+.2f}% ({profit:+.2f})")
+
+    def handle_price(self, pair, price, timestamp, ticker=None):
+        """
+        Runs exits → signal → order for one price update.
+        Every state write of the cycle — including the capital ledger and daily
+        aggregates it changed — is made durable by one group commit at its end.
+        Returns True if the daily max loss was reached.
+        """
+        with stage("cycle"), midas_durable.cycle():
+            try:
+                return self._handle_price(pair, price, timestamp, ticker)
+            finally:
+                self.positions.flush()
+                if self.risk is None:  # under a supervisor, the parent owns both
+                    flush_capital()
+                    flush_daily_aggregates()
+
+    def _handle_price(self, pair, price, timestamp, ticker):
+        count("midas_price_updates_total", help="Price updates handled")
+        if self.paper is not None:
+            # Full tickers carry bid/ask; bare prices get the paper exchange's synthetic spread
+            with stage("paper_match"):
+                self.paper.on_ticker(pair, ticker if ticker and ticker.get("last") is not None else price)
+        with stage("exits"):
+            self.handle_exits(pair, price)
+
+        # Indicators must see every tick, even while halted or already in a position
+        with stage("signal"):
+            signal = self.analyze_signal(pair, price, timestamp)
+        if signal:
+            count("midas_signals_total", help="Strategy signals, by side", side=signal["side"])
+        if signal and not self.halted and self.within_trading_hours() and not self.positions.has_position(pair):
+            side = signal["side"]
+            if self.risk is not None:
+                self.capital = self.risk.capital()
+            trade_size = self.capital["current_balance"] * self.risk_per_trade / price
+            if self.risk is not None and not self.risk.reserve(trade_size * price):
+                count("midas_entries_blocked_total", help="Entries blocked by the shared exposure limit")
+                return self._max_loss_reached()
+            if self.verbose:
+                print(f"📊 {pair} price: {price}")
+                print(f"💰 Trade size: {trade_size:.3f}")
+            result = None
+            try:
+                with stage("execute_trade"):
+                    result = execute_trade(
+                        exchange=self.paper or self.exchange,
+                        pair=pair,
+                        side=side,
+                        price=price,
+                        size=trade_size,
+                        mode=self.mode,
+                        take_profit_pct=self.take_profit_pct,
+                        stop_loss_pct=self.stop_loss_pct,
+                        trailing_stop_pct=self.trailing_stop_pct,
+                        book=self.positions
+                    )
+            except Exception as e:
+                notify(f"⚠️ Trade execution error: {e}")
+                print(f"⚠️ Trade execution error: {e}")
+            if self.risk is not None:
+                # Swap the reservation for the actual fill (or release it if nothing filled)
+                filled = result["price"] * result["size"] if result else 0.0
+                self.risk.reserve(filled - trade_size * price, force=True)
+
+        return self._max_loss_reached()
+
+    def _max_loss_reached(self):
+        # 🚫 Stop trading if daily max loss reached
+        return self.daily_loss / self.capital["current_balance"] >= self.daily_max_loss
+
+    def process_event(self, event):
+        """Handles one FeedEvent and halts new entries once the daily max loss is hit."""
+        ticker = event.data if event.kind == "ticker" else None
+        if self.handle_price(event.pair, event.price, event.timestamp, ticker) and not self.halted:
+            self.halted = True
+            notify("🛑 Daily max loss reached. Trading halted until reset.")
+            print("🛑 Daily max loss reached. Trading halted until reset.")
+
+    # ==================================================
+    # 📅 DAILY ROLLOVER
+    # ==================================================
+    def send_daily_summary(self, day=None):
+        """Reports one day's performance (default: today)."""
+        send_daily_summary(day or self.trading_day())
+
+    def daily_rollover(self):
+        """Runs exactly once at the daily reset hour: report the day, then reset."""
+        # Runs at local midnight; looking 12h back names the day just ended even if the job ran late
+        self.send_daily_summary(self.trading_day(-timedelta(hours=12)))
+        self.capital = reset_daily_capital()
+        self.daily_loss = 0.0
+        if self.halted:
+            print("▶️ Trading resumed after daily reset.")
+        self.halted = False
+        notify("🔄 Daily reset complete. Starting new trading cycle.")
+
+
+def send_daily_summary(day):
+    """Summarize and report one day's performance from the running aggregates (O(1))."""
+    summary = build_daily_summary(day)
+    capital = load_capital()
+    start_balance = capital["current_balance"] - summary["pnl"]
+    log_daily_summary(
+        trades_today=summary["trades"],
+        profit_loss=summary["pnl"] / start_balance * 100 if start_balance else 0.0,
+        capital=capital["current_balance"],
+        win_rate=summary["win_rate"],
+        date=summary["date"],
+        max_drawdown=summary["max_drawdown"],
+        pairs=summary["pairs"]
+    )
@@ -4,46 +4,102 @@
 # and paper/live trade execution routing.
 # ======================================================
 
-import time
-from datetime import datetime
-from core.midas_logger import log_trade
-from core.midas_telegram import send_telegram_message
+from core.midas_markets import OrderSizeError, find_markets
+from core.midas_metrics import count, stage
+from core.midas_notifier import notify
+from core.midas_positions import Position, get_position_book
+from core.midas_paper_exchange import get_paper_exchange
 
 # ======================================================
 # ⚙️ ORDER EXECUTION (SIMULATED / LIVE)
 # ======================================================
 
-def execute_trade(exchange, pair, side, price, size, mode="PAPER"):
+def execute_trade(exchange=None, pair=None, side=None, price=None, size=None, mode="PAPER",
+                  take_profit_pct=None, stop_loss_pct=None, trailing_stop_pct=None, book=None):
     """
-    Executes a simulated or live trade.
-    - exchange: ccxt exchange object (only required for live mode)
+    Executes a simulated or live entry and opens a managed position for it.
+    - exchange: ccxt exchange object for live mode; PAPER fills on the paper exchange
+      (spread, slippage and fees) unless a PaperExchange is passed explicitly
     - pair: trading pair (e.g., BTC/USDT)
     - side: 'buy' or 'sell'
     - price: entry price
-    - size: trade size
+    - size: trade size (floored to the market's amount step; orders below the
+      exchange minimum amount / notional are skipped)
     - mode: 'PAPER' or 'LIVE'
+    - take_profit_pct / stop_loss_pct / trailing_stop_pct: exit levels as fractions (0.02 = 2%)
+    - book: PositionBook that manages the exit (default: the shared book)
+    Returns {"status", "pair", "side", "price", "size", "position", ...} or None if the order failed.
     """
+    side = side.lower()
+    book = book if book is not None else get_position_book()
+    live = mode.upper() == "LIVE"
+    venue = exchange if live else paper_venue(exchange)
+
+    # 📏 PAPER orders follow the same precision / minimum rules as the real exchange
+    markets = find_markets(exchange if live else None)
+    if markets is not None:
+        try:
+            size = markets.normalize_order(pair, size, price)
+        except OrderSizeError as e:
+            count("midas_orders_skipped_total", help="Orders below the exchange minimums", mode=mode.upper())
+            print(f"⚠️ Order skipped: {e}")
+            return None
     print(f"📈 Executing trade — {pair} {side.upper()} @ {price:.4f} (size: {size})")
 
-    # Send Telegram notification
-    send_telegram_message(f"🚀 Executing {side.upper()} {pair} @ {price:.4f} ({size})")
+    try:
+        with stage("create_order"):
+            order = venue.create_order(pair, "market", side, size, price)
+        count("midas_orders_total", help="Orders filled, by mode and side", mode=mode.upper(), side=side)
+    except Exception as e:
+        count("midas_order_failures_total", help="Orders rejected or failed", mode=mode.upper())
+        print(f"❌ {'Live' if live else 'Paper'} trade failed: {e}")
+        notify(f"⚠️ {'Live' if live else 'Paper'} trade failed for {pair}: {e}")
+        return None
+    if live:
+        print(f"✅ LIVE trade executed: {order}")
 
-    if mode.upper() == "LIVE":
-        try:
-            # Live order (for future activation)
-            order = exchange.create_order(pair, "market", side, size)
-            print(f"✅ LIVE trade executed: {order}")
-            send_telegram_message(f"✅ LIVE trade executed successfully: {pair}")
-            return order
-        except Exception as e:
-            print(f"❌ Live trade failed: {e}")
-            send_telegram_message(f"⚠️ Live trade failed for {pair}: {e}")
-            return None
-    else:
-        # PAPER MODE: Simulated trade
-        log_trade(datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S"), pair, side, price, size)
-        send_telegram_message(f"📊 Simulating {pair} {side.upper()}\nEntry: {price:.4f}")
-        return {"status": "simulated", "pair": pair, "side": side, "price": price, "size": size}
+    price = order.get("average") or order.get("price") or price
+    size = order.get("filled") or size
+    fees = (order.get("fee") or {}).get("cost") or 0.0
+    result = {"status": "live" if live else "simulated", "order": order}
+
+    # Opening the position journals the entry and sends the single "opened" notification
+    position = book.open(pair, side, price, size, take_profit_pct, stop_loss_pct, trailing_stop_pct, fees=fees)
+    result.update({"pair": pair, "side": side, "price": price, "size": size, "position": position})
+    return result
+
+
+def paper_venue(exchange=None):
+    """The exchange PAPER orders fill on: the given PaperExchange, else the shared one."""
+    return exchange if getattr(exchange, "id", None) == "paper" else get_paper_exchange()
+
+
+def execute_exit(event, exchange=None, mode="PAPER"):
+    """
+    Sends the closing market order for a position ExitEvent.
+    Returns the realized profit (net of entry and exit fees at the actual fill), or
+    None if the order could not be placed (the position must stay open).
+    """
+    live = mode.upper() == "LIVE"
+    venue = exchange if live else paper_venue(exchange)
+    exit_side = "sell" if event.side == "buy" else "buy"
+    markets = find_markets(exchange if live else None)
+    size = markets.amount_to_precision(event.pair, event.size) if markets is not None else event.size
+    try:
+        with stage("create_order"):
+            order = venue.create_order(event.pair, "market", exit_side, size, event.exit_price)
+        count("midas_orders_total", help="Orders filled, by mode and side", mode=mode.upper(), side=exit_side)
+    except Exception as e:
+        count("midas_order_failures_total", help="Orders rejected or failed", mode=mode.upper())
+        print(f"❌ Exit order failed for {event.pair}: {e}")
+        notify(f"⚠️ Exit order failed for {event.pair}: {e}")
+        return None
+
+    fill = order.get("average") or event.exit_price
+    exit_fee = (order.get("fee") or {}).get("cost") or 0.0
+    direction = 1 if event.side == "buy" else -1
+    entry_fees = event.entry_price * event.size * event.pnl_pct / 100 - event.profit
+    return direction * (fill - event.entry_price) * event.size - entry_fees - exit_fee
 
 
 # ======================================================
@@ -64,43 +120,31 @@ def calculate_trade_levels(entry_price, take_profit_pct=0.02, stop_loss_pct=0.01
 # 📊 TRAILING STOP SIMULATION (FOR PAPER TESTING)
 # ======================================================
 
-def simulate_trailing_stop(pair, side, entry_price, trailing_stop_pct=0.02):
+def simulate_trailing_stop(pair, side, entry_price, trailing_stop_pct=0.02, steps=10, step_pct=0.005):
     """
     Simulates trailing stop behavior for paper trading.
-    Adjusts stop level dynamically as price rises.
+    Adjusts stop level dynamically as price rises, using the same
+    Position logic as the live position book (no file writes or messages per step).
     """
     print("🔧 Running trailing stop test simulation...\n")
 
-    # Initialize prices
-    highest_price = entry_price
-    trailing_stop = entry_price * (1 - trailing_stop_pct)
-
-    send_telegram_message(f"🔄 Trailing stop initialized at {trailing_stop:.4f}")
+    position = Position(0, pair, side, entry_price, 1.0, trailing_pct=trailing_stop_pct,
+                        stop_loss=entry_price * (1 - trailing_stop_pct))
+    print(f"🔄 Trailing stop initialized at {position.stop_loss:.4f}")
 
-    # Simulate 10 progressive steps in price
-    for step in range(1, 11):
+    # Simulate progressive steps in price
+    price = entry_price
+    for step in range(1, steps + 1):
         # Increase price slightly to simulate bullish movement
-        price = highest_price * (1 + 0.005 * step)
-
-        if price > highest_price:
-            highest_price = price
-            trailing_stop = highest_price * (1 - trailing_stop_pct)
-
-        # Log trade update event
-        timestamp = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
-        log_trade(timestamp, pair, side, float(price), size=1.0)
-
-        print(f"Step {step}: Price={price:.4f}, TrailingStop={trailing_stop:.4f}")
-
-        send_telegram_message(
-            f"📈 Trailing Stop Update — {pair}\n"
-            f"Price: {price:.4f}\nStop: {trailing_stop:.4f}"
-        )
-
-        time.sleep(1)
+        price = entry_price * (1 + step_pct * step)
+        reason = position.check(price)
+        print(f"Step {step}: Price={price:.4f}, TrailingStop={position.stop_loss:.4f}")
+        if reason:
+            break
 
     print("\n✅ Trailing stop simulation complete.")
-    send_telegram_message("✅ Trailing stop simulation complete.")
+    notify(f"✅ Trailing stop simulation complete — {pair}\nLast price: {price:.4f}\nStop: {position.stop_loss:.4f}")
+    return position.stop_loss
 
 
 # ======================================================
@@ -0,0 +1,366 @@
+# ======================================================
+# 🗄️ MIDAS SQLITE STORAGE
+# Optional embedded backend (MIDAS_STORAGE=sqlite) behind
+# the logger, capital tracker and daily summary APIs:
+#   • trades        — batched inserts, indexed by (pair, timestamp)
+#   • capital       — one row, written by the capital ledger flush
+#   • daily_summary — one row per logged summary, indexed by date
+# WAL journal mode keeps readers (reports) from blocking the
+# live loop. Existing JSON history is imported once on first open.
+# ======================================================
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+BASE_DIR = os.path.dirname(__file__)
+
+STORAGE_BACKEND = os.getenv("MIDAS_STORAGE", "json").lower()  # "json" or "sqlite"
+DB_FILE = os.getenv("MIDAS_DB_FILE", os.path.join(BASE_DIR, "midas.db"))
+TRADE_BATCH_SIZE = int(os.getenv("SQLITE_TRADE_BATCH", 500))  # buffered trades that force a write
+FLUSH_INTERVAL = float(os.getenv("SQLITE_FLUSH_INTERVAL", 1.0))  # seconds a buffered trade may wait
+CACHE_KB = int(os.getenv("SQLITE_CACHE_KB", 65536))  # page cache per connection
+
+SCHEMA_VERSION = 1
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    pair TEXT NOT NULL,
+    side TEXT,
+    price REAL,
+    size REAL,
+    result TEXT,
+    profit REAL
+);
+CREATE INDEX IF NOT EXISTS idx_trades_pair_timestamp ON trades (pair, timestamp);
+CREATE INDEX IF NOT EXISTS idx_trades_timestamp ON trades (timestamp);
+CREATE TABLE IF NOT EXISTS capital (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    data TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS daily_summary (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_daily_summary_date ON daily_summary (date);
+CREATE TABLE IF NOT EXISTS migrations (
+    name TEXT PRIMARY KEY,
+    applied_at TEXT NOT NULL
+);
+"""
+
+TRADE_COLUMNS = ("timestamp", "pair", "side", "price", "size", "result", "profit")
+
+# Statements are module constants so sqlite3's statement cache reuses them prepared
+INSERT_TRADE = "INSERT INTO trades (timestamp, pair, side, price, size, result, profit) VALUES (?, ?, ?, ?, ?, ?, ?)"
+SELECT_TRADES = "SELECT timestamp, pair, side, price, size, result, profit FROM trades"
+PAIR_PNL = """
+SELECT pair, COUNT(profit), SUM(profit > 0), SUM(profit < 0), COALESCE(SUM(profit), 0.0)
+FROM trades WHERE profit IS NOT NULL AND pair = ? AND timestamp >= ? AND timestamp < ?
+"""
+PNL_BY_PAIR = """
+SELECT pair, COUNT(profit), SUM(profit > 0), SUM(profit < 0), COALESCE(SUM(profit), 0.0)
+FROM trades WHERE profit IS NOT NULL AND timestamp >= ? AND timestamp < ?
+GROUP BY pair ORDER BY pair
+"""
+UPSERT_CAPITAL = """
+INSERT INTO capital (id, data, updated_at) VALUES (1, ?, ?)
+ON CONFLICT (id) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at
+"""
+INSERT_SUMMARY = "INSERT INTO daily_summary (date, data) VALUES (?, ?)"
+SELECT_SUMMARIES = "SELECT data FROM daily_summary WHERE date >= ? AND date < ? ORDER BY date, id"
+
+# Bounds used when a query has no start / end (timestamps are "YYYY-MM-DD HH:MM:SS")
+MIN_TIMESTAMP = ""
+MAX_TIMESTAMP = "\uffff"
+
+
+def sqlite_enabled():
+    return STORAGE_BACKEND == "sqlite"
+
+
+def time_bound(value, default):
+    """Accepts None, a datetime or a "YYYY-MM-DD[ HH:MM:SS]" string."""
+    if value is None:
+        return default
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    return str(value)
+
+
+def _trade_row(entry):
+    profit = entry.get("profit")
+    return (entry.get("timestamp") or "", entry.get("pair") or "", entry.get("side"), entry.get("price"),
+            entry.get("size"), entry.get("result"), None if profit is None else float(profit))
+
+
+def _trade_dict(row):
+    entry = dict(zip(TRADE_COLUMNS, row))
+    if entry["profit"] is None:
+        del entry["profit"]  # same shape as the JSON journal records
+    return entry
+
+
+def _pnl_dict(row):
+    pair, trades, wins, losses, pnl = row
+    return {"pair": pair, "trades": trades, "wins": wins or 0, "losses": losses or 0, "pnl": pnl}
+
+
+# ======================================================
+# 🗄️ STORE
+# ======================================================
+class SQLiteStore:
+    """
+    One SQLite database (WAL mode) for trades, capital and daily summaries.
+    Trades are buffered and inserted in batches (one transaction per batch);
+    every read flushes the buffer first, so queries always see every trade.
+    """
+
+    def __init__(self, path=DB_FILE, batch_size=TRADE_BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._lock = threading.RLock()  # guards the connection
+        self._pending_lock = threading.Lock()  # guards the buffer only, so logging never waits on a write
+        self._timer = None
+        self._pending = []
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=30.0, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")  # durable at checkpoints, no fsync per transaction
+        self.conn.execute(f"PRAGMA cache_size = -{CACHE_KB}")  # keeps the index pages hot as history grows
+        with self._lock, self.conn:
+            self.conn.executescript(SCHEMA)
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    # ======================================================
+    # 🧾 TRADES
+    # ======================================================
+    def add_trade(self, entry):
+        """Buffers one trade; written with the next batch (size or timer)."""
+        self.add_trades([entry])
+
+    def add_trades(self, entries):
+        rows = [_trade_row(entry) for entry in entries]
+        with self._pending_lock:
+            self._pending.extend(rows)
+            full = len(self._pending) >= self.batch_size or self.flush_interval <= 0
+            if not full and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Inserts buffered trades in one transaction. Returns the number written."""
+        with self._lock:
+            with self._pending_lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                rows, self._pending = self._pending, []
+            if rows:
+                with self.conn:
+                    self.conn.execute("BEGIN")
+                    self.conn.executemany(INSERT_TRADE, rows)
+        return len(rows)
+
+    def iter_trades(self, pair=None, start=None, end=None, limit=None, newest_first=False):
+        """Streams trades (optionally one pair, start <= timestamp < end), served by the indexes."""
+        sql, params = SELECT_TRADES, []
+        clauses = []
+        if pair is not None:
+            clauses.append("pair = ?")
+            params.append(pair)
+        if start is not None or end is not None:
+            clauses.append("timestamp >= ? AND timestamp < ?")
+            params += [time_bound(start, MIN_TIMESTAMP), time_bound(end, MAX_TIMESTAMP)]
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY timestamp DESC, id DESC" if newest_first else " ORDER BY timestamp, id"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        self.flush()
+        with self._lock:
+            cursor = self.conn.execute(sql, params)
+            rows = cursor.fetchmany(1000)
+        while rows:
+            for row in rows:
+                yield _trade_dict(row)
+            with self._lock:
+                rows = cursor.fetchmany(1000)
+
+    def trades(self, pair=None, start=None, end=None, limit=None):
+        return list(self.iter_trades(pair, start, end, limit))
+
+    def tail(self, count=10):
+        """Returns the last `count` trades, oldest first."""
+        return list(reversed(list(self.iter_trades(limit=count, newest_first=True))))
+
+    def trade_count(self):
+        self.flush()
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM trades").fetchone()[0]
+
+    def pair_pnl(self, pair, start=None, end=None):
+        """Closed-trade totals of one pair: {"pair", "trades", "wins", "losses", "pnl"}."""
+        self.flush()
+        with self._lock:
+            row = self.conn.execute(PAIR_PNL, (pair, time_bound(start, MIN_TIMESTAMP), time_bound(end, MAX_TIMESTAMP))).fetchone()
+        return _pnl_dict((pair,) + tuple(row[1:]))
+
+    def pnl_by_pair(self, start=None, end=None):
+        """Closed-trade totals per pair: {pair: {"pair", "trades", "wins", "losses", "pnl"}}."""
+        self.flush()
+        with self._lock:
+            rows = self.conn.execute(PNL_BY_PAIR, (time_bound(start, MIN_TIMESTAMP), time_bound(end, MAX_TIMESTAMP))).fetchall()
+        return {row[0]: _pnl_dict(row) for row in rows}
+
+    def reset_trades(self):
+        with self._lock:
+            with self._pending_lock:
+                self._pending = []
+            with self.conn:
+                self.conn.execute("DELETE FROM trades")
+
+    # ======================================================
+    # 💰 CAPITAL / 📅 DAILY SUMMARIES
+    # ======================================================
+    def load_capital(self):
+        """Returns the stored capital dict, or None if none was saved yet."""
+        with self._lock:
+            row = self.conn.execute("SELECT data FROM capital WHERE id = 1").fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save_capital(self, data):
+        with self._lock, self.conn:
+            self.conn.execute(UPSERT_CAPITAL, (json.dumps(data), datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")))
+
+    def add_summary(self, entry):
+        with self._lock, self.conn:
+            self.conn.execute(INSERT_SUMMARY, (str(entry.get("date", "")), json.dumps(entry)))
+
+    def summaries(self, start=None, end=None):
+        """Logged daily summaries with start <= date < end, oldest first."""
+        with self._lock:
+            rows = self.conn.execute(SELECT_SUMMARIES, (time_bound(start, MIN_TIMESTAMP), time_bound(end, MAX_TIMESTAMP))).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    # ======================================================
+    # 🚚 ONE-TIME JSON IMPORT
+    # ======================================================
+    def migrate_from_json(self, journal=None, capital_path=None, summary_path=None):
+        """
+        Imports the JSON journal, capital tracker and daily summary history once.
+        Each source is recorded in `migrations` in the same transaction as its rows, so later
+        opens skip it and a failed import is retried. Returns the rows imported.
+        """
+        imported = 0
+        if journal is not None:
+            imported += self._migrate("trade_journal", lambda: self._import_journal(journal))
+        if capital_path:
+            imported += self._migrate("capital_tracker", lambda: self._import_capital(capital_path))
+        if summary_path:
+            imported += self._migrate("daily_summary", lambda: self._import_summaries(summary_path))
+        if imported:
+            print(f"🚚 Imported {imported} JSON record(s) into {os.path.basename(self.path)}")
+        return imported
+
+    def _migrate(self, name, run):
+        """
+        Runs one import inside a transaction that also records it in `migrations`.
+        `run` returns the rows imported, or None when its source is missing (retried next open).
+        """
+        with self._lock, self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            if self.conn.execute("SELECT 1 FROM migrations WHERE name = ?", (name,)).fetchone():
+                return 0
+            imported = run()
+            if imported is None:
+                return 0
+            self.conn.execute("INSERT INTO migrations (name, applied_at) VALUES (?, ?)",
+                              (name, datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")))
+        return imported
+
+    # The _import_* helpers run inside _migrate's transaction: plain executes, no commits of their own
+    def _import_journal(self, journal):
+        imported, batch = 0, []
+        for entry in journal.iter_entries():
+            batch.append(_trade_row(entry))
+            if len(batch) >= 10000:
+                self.conn.executemany(INSERT_TRADE, batch)
+                imported += len(batch)
+                batch = []
+        self.conn.executemany(INSERT_TRADE, batch)
+        return imported + len(batch)
+
+    def _import_capital(self, capital_path):
+        data = _read_json(capital_path)
+        if not isinstance(data, dict):
+            return None
+        if self.conn.execute("SELECT 1 FROM capital WHERE id = 1").fetchone():
+            return 0
+        self.conn.execute(UPSERT_CAPITAL, (json.dumps(data), datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")))
+        return 1
+
+    def _import_summaries(self, summary_path):
+        data = _read_json(summary_path)
+        if data is None:
+            return None
+        entries = data if isinstance(data, list) else [data] if isinstance(data, dict) else []
+        self.conn.executemany(INSERT_SUMMARY, [(str(e.get("date", "")), json.dumps(e)) for e in entries])
+        return len(entries)
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self.conn.close()
+
+
+def _read_json(path):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except json.JSONDecodeError:
+        print(f"⚠️ Skipping unreadable {os.path.basename(path)} during import.")
+        return None
+
+
+# ======================================================
+# 🌐 SHARED STORE
+# ======================================================
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Returns the process-wide SQLite store, importing the JSON history on first open."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            from core.midas_capital_tracker import CAPITAL_FILE
+            from core.midas_daily_summary import SUMMARY_FILE
+            from core.midas_trade_journal import get_journal
+
+            _store = SQLiteStore()
+            _store.migrate_from_json(get_journal(), CAPITAL_FILE, SUMMARY_FILE)
+            atexit.register(_store.close)
+    return _store
+
+
+if __name__ == "__main__":
+    store = get_store()
+    print(f"🗄️ {store.path}: {store.trade_count()} trades")
+    for pair, stats in store.pnl_by_pair().items():
+        print(f"  {pair}: {stats['trades']} closed, {stats['wins']} wins, ${stats['pnl']:+.2f}")
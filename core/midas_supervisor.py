@@ -0,0 +1,412 @@
+# ======================================================
+# 🧭 MIDAS SUPERVISOR
+# Runs a large pair universe as sharded worker processes:
+#   • pairs are hashed into shards (stable across restarts),
+#     one exchange per shard
+#   • each worker owns its feed, indicators, positions and
+#     paper account, and runs the normal TradingSession
+#   • capital, daily loss, the halt flag and open exposure
+#     live in a shared-memory RiskLedger
+#   • closed trades and Telegram messages flow back over
+#     one queue, so the supervisor is the only writer of
+#     the capital ledger and the daily aggregates
+#   • crashed workers are restarted with a backoff
+#
+#   PAIR_UNIVERSE="mexc:XRP/USDT,BTC/USDT,binance:ETH/USDT" \
+#   SUPERVISOR_WORKERS=8 python -m core.midas_supervisor
+# ======================================================
+
+import json
+import multiprocessing
+import os
+import queue
+import time
+import zlib
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from core import midas_notifier, midas_trade_journal
+from core.midas_capital_tracker import flush_capital, load_capital, record_trade_profit
+from core.midas_daily_summary import record_trade_close
+from core.midas_notifier import notify
+from core.midas_scheduler import Scheduler
+
+SUPERVISOR_WORKERS = int(os.getenv("SUPERVISOR_WORKERS", os.cpu_count() or 1))
+SUPERVISOR_START_METHOD = os.getenv("SUPERVISOR_START_METHOD", "spawn")
+RESTART_BACKOFF = float(os.getenv("SUPERVISOR_RESTART_BACKOFF", 5.0))  # doubled per crash, capped
+MAX_RESTART_BACKOFF = float(os.getenv("SUPERVISOR_MAX_RESTART_BACKOFF", 300.0))
+HEALTHY_AFTER = float(os.getenv("SUPERVISOR_HEALTHY_AFTER", 600.0))  # uptime that resets the backoff
+MAX_EXPOSURE = float(os.getenv("RISK_MAX_EXPOSURE", 1.0))  # open notional as a fraction of capital
+PAIR_UNIVERSE = os.getenv("PAIR_UNIVERSE", "")  # "exchange:PAIR,..." or "@pairs.json"
+STATE_DIR = os.getenv("SUPERVISOR_STATE_DIR", os.path.dirname(__file__))
+
+Shard = namedtuple("Shard", ["name", "index", "exchange", "pairs"])
+
+
+# ======================================================
+# 🌐 PAIR UNIVERSE
+# ======================================================
+def parse_universe(spec, default_exchange="mexc"):
+    """
+    Pair universe as [(exchange, pair), ...] from
+    "mexc:XRP/USDT,BTC/USDT,binance:ETH/USDT" (the exchange prefix sticks until
+    the next one) or "@file.json" holding ["mexc:XRP/USDT", ...] or {"mexc": [...]}.
+    """
+    spec = spec.strip()
+    if spec.startswith("@"):
+        with open(spec[1:], "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            return [(exchange.lower(), pair) for exchange, pairs in data.items() for pair in pairs]
+        spec = ",".join(data)
+
+    universe, seen = [], set()
+    exchange = default_exchange.lower()
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        if ":" in item.split("/")[0]:
+            exchange, _, item = item.partition(":")
+            exchange = exchange.strip().lower()
+        key = (exchange, item.strip())
+        if key not in seen:
+            seen.add(key)
+            universe.append(key)
+    return universe
+
+
+def shard_universe(universe, workers):
+    """
+    Splits the universe into at most `workers` shards per exchange. A pair's shard
+    comes from a stable hash, so it keeps its positions file across restarts.
+    """
+    buckets = {}
+    for exchange, pair in universe:
+        index = zlib.crc32(f"{exchange}:{pair}".encode("utf-8")) % max(1, workers)
+        buckets.setdefault((exchange, index), []).append(pair)
+    return [Shard(f"{exchange}-{index}", index, exchange, pairs)
+            for (exchange, index), pairs in sorted(buckets.items())]
+
+
+# ======================================================
+# 🛡️ SHARED RISK LEDGER
+# ======================================================
+BALANCE, DAILY_LOSS, HALTED, TRADES = range(4)
+_FIXED_SLOTS = 4
+
+
+class RiskLedger:
+    """
+    Capital, daily loss, halt flag and per-worker open exposure in shared memory.
+    Passed to worker processes at start; bind(slot) gives a worker its exposure slot.
+    """
+
+    def __init__(self, balance, slots=1, max_exposure=MAX_EXPOSURE, context=None):
+        context = context or multiprocessing.get_context(SUPERVISOR_START_METHOD)
+        self.values = context.Array("d", _FIXED_SLOTS + slots)
+        self.values[BALANCE] = float(balance)
+        self.slots = slots
+        self.max_exposure = max_exposure
+        self.slot = 0
+        self.events = None  # worker → supervisor queue for closed trades
+
+    def bind(self, slot, events=None):
+        view = object.__new__(RiskLedger)
+        view.__dict__.update(self.__dict__, slot=slot, events=events)
+        return view
+
+    @property
+    def balance(self):
+        return self.values[BALANCE]
+
+    @property
+    def daily_loss(self):
+        return self.values[DAILY_LOSS]
+
+    @property
+    def halted(self):
+        return bool(self.values[HALTED])
+
+    @property
+    def exposure(self):
+        with self.values.get_lock():
+            return sum(self.values[_FIXED_SLOTS:])
+
+    def capital(self):
+        return {"current_balance": self.values[BALANCE], "total_trades": int(self.values[TRADES])}
+
+    def set_halted(self, halted):
+        self.values[HALTED] = 1.0 if halted else 0.0
+
+    def reserve(self, notional, force=False):
+        """Adds open notional to this worker's slot; refused if it would exceed the capital limit."""
+        with self.values.get_lock():
+            total = sum(self.values[_FIXED_SLOTS:])
+            if not force and notional > 0 and total + notional > self.values[BALANCE] * self.max_exposure:
+                return False
+            slot = _FIXED_SLOTS + self.slot
+            self.values[slot] = max(0.0, self.values[slot] + notional)
+        return True
+
+    def release_slot(self, slot):
+        """Forgets a dead worker's exposure (its restart re-reserves the positions it restores)."""
+        self.values[_FIXED_SLOTS + slot] = 0.0
+
+    def record_close(self, pair, profit, day, notional=0.0):
+        """Applies a closed trade to the shared totals and forwards it for persistence."""
+        with self.values.get_lock():
+            self.values[BALANCE] += profit
+            self.values[TRADES] += 1
+            if profit < 0:
+                self.values[DAILY_LOSS] += -profit
+            slot = _FIXED_SLOTS + self.slot
+            self.values[slot] = max(0.0, self.values[slot] - notional)
+        if self.events is not None:
+            self.events.put(("trade", pair, profit, day))
+        return self.capital()
+
+    def reset_daily(self):
+        """
+        Clears the daily loss and the halt flag. BALANCE is left alone: a close recorded
+        by a worker but not yet drained by the supervisor is already in it.
+        """
+        with self.values.get_lock():
+            self.values[DAILY_LOSS] = 0.0
+            self.values[HALTED] = 0.0
+
+
+# ======================================================
+# 👷 WORKER PROCESS
+# ======================================================
+class _QueueNotifier:
+    """Stands in for the Telegram dispatcher in workers: messages go to the supervisor."""
+
+    def __init__(self, events, prefix):
+        self.events = events
+        self.prefix = prefix
+
+    def notify(self, message):
+        self.events.put(("notify", f"[{self.prefix}] {message}"))
+        return True
+
+    def flush(self, timeout=None):
+        return True
+
+    def stop(self, timeout=None):
+        return True
+
+
+def worker_paths(state_dir, shard):
+    return {
+        "positions": os.path.join(state_dir, f"open_positions_{shard.name}.json"),
+        "paper_fills": os.path.join(state_dir, f"paper_fills_{shard.name}.jsonl"),
+        "paper_balances": os.path.join(state_dir, f"paper_balances_{shard.name}.json"),
+        # One journal per shard: appends from several processes to one file cannot be replayed safely
+        "journal": os.path.join(state_dir, f"trade_log_{shard.name}.jsonl"),
+    }
+
+
+def connect_shard_exchange(name):
+    from core.midas_live_trading import connect_exchange
+    return connect_exchange(name)
+
+
+def run_worker(shard, risk, events, stop, config):
+    """
+    Worker entry point: one TradingSession over the shard's pairs, fed by its own
+    feed, with positions, the trade journal and the paper account in per-shard files.
+    """
+    from core.midas_feed import FEED_POLL_INTERVAL, get_feed
+    from core.midas_live_trading import run_trading_loop
+    from core.midas_paper_exchange import PaperExchange
+    from core.midas_positions import PositionBook
+    from core.midas_session import TradingSession
+
+    midas_notifier._dispatcher = _QueueNotifier(events, shard.name)
+    paths = worker_paths(config.get("state_dir") or STATE_DIR, shard)
+    midas_trade_journal._journal = midas_trade_journal.TradeJournal(config.get("journal_path") or paths["journal"],
+                                                                    legacy_path=None)
+    mode = config.get("mode", "PAPER").upper()
+
+    exchange = config.get("exchange_factory", connect_shard_exchange)(shard.exchange)
+    paper = None
+    if mode != "LIVE":
+        paper = PaperExchange(fills_path=paths["paper_fills"], balances_path=paths["paper_balances"])
+    session = TradingSession(
+        exchange,
+        shard.pairs,
+        mode=mode,
+        positions=PositionBook(paths["positions"], notify_changes=config.get("notify_positions", False)),
+        paper=paper,
+        risk=risk,
+        verbose=False,
+        **config.get("session", {})
+    )
+    session.warm_start(parallel=True)
+
+    feed = get_feed(config.get("feed_mode", "polling"), exchange=exchange, pairs=shard.pairs,
+                    exchange_name=shard.exchange)
+    scheduler = Scheduler()
+    if feed.name == "polling":
+        # One batched fetch_tickers per cycle for the whole shard
+        scheduler.every("poll", config.get("poll_interval", FEED_POLL_INTERVAL), feed.poll_once)
+    else:
+        feed.start()
+    events.put(("ready", shard.name, os.getpid()))
+    try:
+        run_trading_loop(session, feed, scheduler, stop=stop.is_set)
+    finally:
+        feed.stop()
+        if paper is not None:
+            paper.close()
+        midas_trade_journal.get_journal().close()
+
+
+# ======================================================
+# 🧭 SUPERVISOR
+# ======================================================
+class Supervisor:
+    """
+    Starts one process per shard, persists the trades they report, runs the
+    daily rollover for all of them and restarts any worker that dies.
+    """
+
+    def __init__(self, universe, workers=SUPERVISOR_WORKERS, mode="PAPER", target=run_worker, config=None,
+                 restart_backoff=RESTART_BACKOFF, max_backoff=MAX_RESTART_BACKOFF, healthy_after=HEALTHY_AFTER,
+                 tz_offset=timedelta(hours=1), start_method=SUPERVISOR_START_METHOD):
+        self.context = multiprocessing.get_context(start_method)
+        self.shards = shard_universe(universe, workers)
+        self.mode = mode.upper()
+        self.target = target
+        self.config = dict(config or {}, mode=self.mode)
+        self.restart_backoff = restart_backoff
+        self.max_backoff = max_backoff
+        self.healthy_after = healthy_after
+        self.tz_offset = tz_offset
+
+        self.risk = RiskLedger(load_capital()["current_balance"], slots=len(self.shards), context=self.context)
+        self.events = self.context.Queue()
+        self.stop_event = self.context.Event()
+        self.processes = {}  # shard name → Process
+        self.started_at = {}
+        self.restart_at = {}  # shard name → monotonic time of the pending restart
+        self.restarts = {shard.name: 0 for shard in self.shards}
+        self.ready = set()
+        self.trades = 0
+
+    # ==================================================
+    # 👷 WORKERS
+    # ==================================================
+    def _spawn(self, slot, shard):
+        self.risk.release_slot(slot)
+        process = self.context.Process(
+            target=self.target, name=f"midas-{shard.name}", daemon=True,
+            args=(shard, self.risk.bind(slot, self.events), self.events, self.stop_event, self.config))
+        process.start()
+        self.processes[shard.name] = process
+        self.started_at[shard.name] = time.monotonic()
+
+    def start(self):
+        for slot, shard in enumerate(self.shards):
+            self._spawn(slot, shard)
+        pairs = sum(len(shard.pairs) for shard in self.shards)
+        print(f"🧭 Supervisor started {len(self.shards)} worker(s) for {pairs} pair(s) in {self.mode} mode.")
+        return self
+
+    def check_workers(self):
+        """Schedules a restart for every dead worker and performs the ones that are due."""
+        now = time.monotonic()
+        for slot, shard in enumerate(self.shards):
+            process = self.processes[shard.name]
+            if process.is_alive() or self.stop_event.is_set():
+                continue
+            if shard.name not in self.restart_at:
+                uptime = now - self.started_at[shard.name]
+                if uptime >= self.healthy_after:
+                    self.restarts[shard.name] = 0
+                delay = min(self.max_backoff, self.restart_backoff * 2 ** self.restarts[shard.name])
+                self.restart_at[shard.name] = now + delay
+                self.ready.discard(shard.name)
+                print(f"💥 Worker {shard.name} exited ({process.exitcode}) — restarting in {delay:.1f}s")
+                notify(f"💥 Worker {shard.name} crashed (exit {process.exitcode}). Restarting in {delay:.0f}s.")
+            elif now >= self.restart_at[shard.name]:
+                del self.restart_at[shard.name]
+                self.restarts[shard.name] += 1
+                self._spawn(slot, shard)
+
+    # ==================================================
+    # 📥 WORKER EVENTS
+    # ==================================================
+    def handle_event(self, event):
+        kind = event[0]
+        if kind == "trade":
+            _, pair, profit, day = event
+            record_trade_profit(profit)
+            record_trade_close(pair, profit, day)
+            self.trades += 1
+        elif kind == "notify":
+            notify(event[1])
+        elif kind == "ready":
+            self.ready.add(event[1])
+
+    def drain(self, timeout=0.0):
+        """Handles queued worker events, waiting up to `timeout` for the first one."""
+        handled = 0
+        try:
+            event = self.events.get(timeout=timeout) if timeout > 0 else self.events.get_nowait()
+            while True:
+                self.handle_event(event)
+                handled += 1
+                event = self.events.get_nowait()
+        except queue.Empty:
+            return handled
+
+    # ==================================================
+    # 📅 DAILY ROLLOVER
+    # ==================================================
+    def daily_rollover(self):
+        from core.midas_session import send_daily_summary
+        self.drain()
+        day = (datetime.utcnow() + self.tz_offset - timedelta(hours=12)).strftime("%Y-%m-%d")
+        send_daily_summary(day)
+        self.risk.reset_daily()
+        notify("🔄 Daily reset complete. Starting new trading cycle.")
+
+    # ==================================================
+    # 🔁 LOOP
+    # ==================================================
+    def run(self, stop=lambda: False, check_interval=1.0, daily_reset_hour=0):
+        scheduler = Scheduler()
+        scheduler.every("check_workers", check_interval, self.check_workers)
+        scheduler.daily("daily_rollover", daily_reset_hour, self.daily_rollover, tz_offset=self.tz_offset)
+        try:
+            scheduler.run(self.drain, stop=lambda: stop() or self.stop_event.is_set())
+        finally:
+            self.shutdown()
+
+    def shutdown(self, timeout=10.0):
+        self.stop_event.set()
+        deadline = time.monotonic() + timeout
+        for process in self.processes.values():
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.terminate()
+                process.join(1.0)
+        self.drain()
+        flush_capital()
+
+
+def main():
+    from core.data_safety_check import run_data_safety_check
+    from core.midas_live_trading import EXCHANGE_NAME, MODE, PAIR_LIST
+
+    run_data_safety_check()
+    universe = parse_universe(PAIR_UNIVERSE or ",".join(PAIR_LIST), default_exchange=EXCHANGE_NAME)
+    supervisor = Supervisor(universe, mode=MODE).start()
+    notify(f"🚀 MIDAS Supervisor started in {MODE} mode — {len(universe)} pairs on {len(supervisor.shards)} workers")
+    try:
+        supervisor.run()
+    except KeyboardInterrupt:
+        print("🛑 Supervisor stopping...")
+
+
+if __name__ == "__main__":
+    main()
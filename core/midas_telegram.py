@@ -3,6 +3,8 @@ import time
 import requests
 from dotenv import load_dotenv
 
+from core.midas_metrics import count, stage
+
 # ======================================================
 # 🌍 LOAD ENVIRONMENT VARIABLES
 # ======================================================
@@ -12,15 +14,20 @@ load_dotenv(env_path)
 BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 CHAT_ID = os.getenv("TELEGRAM_CHAT_ID")
 ENABLE_UPDATES = os.getenv("ENABLE_TELEGRAM_UPDATES", "False").lower() == "true"
+# Overridable so tests and benchmarks can point at a local stub server
+TELEGRAM_API_BASE = os.getenv("TELEGRAM_API_BASE", "https://api.telegram.org").rstrip("/")
 
 # ======================================================
 # 🧩 BUILD TELEGRAM API ENDPOINT
 # ======================================================
 if BOT_TOKEN:
-    TELEGRAM_API_URL = f"https://api.telegram.org/bot{BOT_TOKEN}/sendMessage"
+    TELEGRAM_API_URL = f"{TELEGRAM_API_BASE}/bot{BOT_TOKEN}/sendMessage"
 else:
     TELEGRAM_API_URL = None
 
+# One keep-alive session shared by every send (avoids a TLS handshake per message)
+_session = requests.Session()
+
 
 # ======================================================
 # 📨 SEND TELEGRAM MESSAGE (With Auto-Retry)
@@ -38,17 +45,32 @@ def send_telegram_message(message: str, retry_attempts: int = 3, timeout: int =
     }
 
     for attempt in range(retry_attempts):
+        if attempt:
+            count("midas_telegram_retries_total", help="Telegram send retries")
         try:
-            response = requests.post(TELEGRAM_API_URL, data=payload, timeout=timeout)
+            with stage("telegram_send"):
+                response = _session.post(TELEGRAM_API_URL, data=payload, timeout=timeout)
             if response.status_code == 200:
+                count("midas_telegram_sent_total", help="Telegram messages delivered")
                 print("✅ Telegram message sent successfully.")
                 return True
+            elif response.status_code == 429:
+                # Rate limited — Telegram tells us how long to back off
+                count("midas_telegram_rate_limited_total", help="Telegram 429 responses")
+                try:
+                    retry_after = response.json().get("parameters", {}).get("retry_after", 2)
+                except (ValueError, AttributeError):
+                    retry_after = 2  # body was not the usual JSON error (e.g. a proxy's HTML page)
+                print(f"⚠️ Telegram rate limit hit — retrying in {retry_after}s")
+                time.sleep(retry_after)
+                continue
             else:
                 print(f"⚠️ Telegram send failed: {response.text}")
         except requests.RequestException as e:
             print(f"⚠️ Network error on attempt {attempt + 1}: {e}")
         time.sleep(2)
 
+    count("midas_telegram_failures_total", help="Telegram messages dropped after all retries")
     print("❌ Telegram communication test failed after multiple attempts.")
     return False
 
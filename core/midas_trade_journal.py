@@ -0,0 +1,275 @@
+# ======================================================
+# 📒 MIDAS TRADE JOURNAL
+# Append-only, line-delimited trade log with optional
+# segment rotation, a reader API, one-time migration from
+# the legacy trade_log.json array and torn-tail recovery.
+# ======================================================
+
+import json
+import os
+import re
+import threading
+from collections import deque
+
+from core import midas_durable
+from core.midas_metrics import stage
+
+BASE_DIR = os.path.dirname(__file__)
+
+# Active journal file and the legacy JSON array it replaces
+JOURNAL_FILE = os.path.join(BASE_DIR, "trade_log.jsonl")
+LEGACY_FILE = os.path.join(BASE_DIR, "trade_log.json")
+
+# Rotate the active file into a numbered segment once it grows past this size (0 = never)
+SEGMENT_MAX_BYTES = int(os.getenv("TRADE_LOG_SEGMENT_BYTES", 0))
+
+# How far back from the end of a file we look when repairing a torn tail
+TAIL_SCAN_BYTES = 64 * 1024
+
+
+class TradeJournal:
+    """
+    Append-only trade journal (one JSON record per line).
+    Each append is O(1): the record is written to the end of the
+    active file, nothing already on disk is read or rewritten.
+    """
+
+    def __init__(self, path=JOURNAL_FILE, legacy_path=LEGACY_FILE, segment_max_bytes=SEGMENT_MAX_BYTES):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.segment_max_bytes = int(segment_max_bytes or 0)
+        self._lock = threading.Lock()
+        self._handle = None
+        self._opened = False
+
+    # ======================================================
+    # 📂 SEGMENTS
+    # ======================================================
+    def _segment_pattern(self):
+        root, ext = os.path.splitext(os.path.basename(self.path))
+        return re.compile(rf"^{re.escape(root)}\.(\d+){re.escape(ext)}$")
+
+    def segments(self):
+        """Returns sealed segment paths (oldest first) followed by the active file."""
+        directory = os.path.dirname(self.path) or "."
+        pattern = self._segment_pattern()
+        numbered = []
+        if os.path.isdir(directory):
+            for name in os.listdir(directory):
+                match = pattern.match(name)
+                if match:
+                    numbered.append((int(match.group(1)), os.path.join(directory, name)))
+        paths = [path for _, path in sorted(numbered)]
+        if os.path.exists(self.path):
+            paths.append(self.path)
+        return paths
+
+    def _next_segment_path(self):
+        root, ext = os.path.splitext(self.path)
+        sealed = self.segments()[:-1] if os.path.exists(self.path) else self.segments()
+        number = 1
+        if sealed:
+            number = int(self._segment_pattern().match(os.path.basename(sealed[-1])).group(1)) + 1
+        return f"{root}.{number:06d}{ext}"
+
+    def _rotate(self):
+        """Seals the active file as the next numbered segment."""
+        self._handle.close()
+        self._handle = None
+        os.replace(self.path, self._next_segment_path())
+        self._handle = open(self.path, "a", encoding="utf-8")
+
+    # ======================================================
+    # 🩹 OPEN / RECOVERY / MIGRATION
+    # ======================================================
+    def _ensure_open(self):
+        if self._opened:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.recover()
+        self.migrate_legacy()
+        self._handle = open(self.path, "a", encoding="utf-8")
+        self._opened = True
+
+    def recover(self):
+        """
+        Drops a torn or unparsable last line from the newest segment.
+        Everything before the last complete record is left untouched.
+        Returns the number of bytes removed.
+        """
+        segments = self.segments()
+        if not segments:
+            return 0
+
+        path = segments[-1]
+        size = os.path.getsize(path)
+        if size == 0:
+            return 0
+
+        with open(path, "rb+") as f:
+            start = max(0, size - TAIL_SCAN_BYTES)
+            f.seek(start)
+            tail = f.read()
+
+            keep = len(tail)
+            if not tail.endswith(b"\n"):
+                # Incomplete final write — cut back to the previous newline
+                keep = tail.rfind(b"\n") + 1
+            else:
+                # Final line is complete but may still be garbage
+                body = tail[:-1]
+                line_start = body.rfind(b"\n") + 1
+                try:
+                    json.loads(body[line_start:].decode("utf-8"))
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    keep = line_start
+
+            if keep == 0 and start > 0:
+                # No newline inside the scan window: nothing safe to cut to
+                return 0
+
+            dropped = len(tail) - keep
+            if dropped:
+                f.truncate(start + keep)
+                print(f"🩹 Trade journal tail repaired: dropped {dropped} bytes from {os.path.basename(path)}")
+            return dropped
+
+    def migrate_legacy(self):
+        """
+        One-time import of the legacy trade_log.json array.
+        The old file is renamed to *.migrated once its entries are in the journal.
+        """
+        if not self.legacy_path or not os.path.exists(self.legacy_path):
+            return 0
+
+        if any(os.path.getsize(path) for path in self.segments()):
+            print(f"⚠️ Journal already has data — skipping migration of {os.path.basename(self.legacy_path)}")
+            return 0
+
+        try:
+            with open(self.legacy_path, "r", encoding="utf-8") as f:
+                content = f.read().strip()
+            data = json.loads(content) if content else []
+        except json.JSONDecodeError:
+            # Keep the damaged file for manual inspection instead of wiping it
+            os.replace(self.legacy_path, self.legacy_path + ".corrupt")
+            print(f"⚠️ {os.path.basename(self.legacy_path)} was corrupted — kept as .corrupt, journal starts empty.")
+            return 0
+
+        if isinstance(data, dict):
+            data = [data]
+
+        with open(self.path, "a", encoding="utf-8") as f:
+            for entry in data:
+                f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(self.legacy_path, self.legacy_path + ".migrated")
+        print(f"📦 Migrated {len(data)} trades from {os.path.basename(self.legacy_path)} to the journal.")
+        return len(data)
+
+    # ======================================================
+    # ✍️ WRITE API
+    # ======================================================
+    def append(self, entry):
+        """Appends a single record to the end of the journal."""
+        return self.append_many([entry])[0]
+
+    def append_many(self, entries):
+        """
+        Appends several records with a single write. With durable state on, the write
+        goes through the WAL (and joins the current cycle's group commit).
+        """
+        entries = list(entries)
+        if not entries:
+            return entries
+
+        payload = "".join(json.dumps(entry) + "\n" for entry in entries)
+        with self._lock, stage("journal_write"):
+            self._ensure_open()
+            if midas_durable.DURABLE_STATE:
+                if self.segment_max_bytes and os.path.getsize(self.path) >= self.segment_max_bytes:
+                    self._rotate()
+                midas_durable.append_text(self.path, payload)
+                return entries
+            self._handle.write(payload)
+            self._handle.flush()
+            if self.segment_max_bytes and self._handle.tell() >= self.segment_max_bytes:
+                self._rotate()
+        return entries
+
+    def reset(self):
+        """Removes every segment and starts an empty journal."""
+        with self._lock:
+            self.close()
+            for path in self.segments():
+                os.remove(path)
+            open(self.path, "w", encoding="utf-8").close()
+
+    def close(self):
+        if self._handle:
+            self._handle.close()
+        self._handle = None
+        self._opened = False
+
+    # ======================================================
+    # 📖 READ API
+    # ======================================================
+    def iter_entries(self):
+        """Yields every record, oldest first, streaming one line at a time."""
+        with self._lock:
+            self._ensure_open()
+            self._handle.flush()
+            paths = self.segments()
+
+        for path in paths:
+            with open(path, "r", encoding="utf-8") as f:
+                for line_no, line in enumerate(f, 1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        print(f"⚠️ Skipping unreadable journal line {os.path.basename(path)}:{line_no}")
+
+    def read_all(self):
+        """Returns all records as a list."""
+        return list(self.iter_entries())
+
+    def tail(self, count=10):
+        """Returns the last `count` records."""
+        return list(deque(self.iter_entries(), maxlen=count))
+
+
+# ======================================================
+# 🌐 SHARED JOURNAL
+# ======================================================
+_journal = None
+
+
+def get_journal():
+    """Returns the process-wide trade journal."""
+    global _journal
+    if _journal is None:
+        _journal = TradeJournal()
+    return _journal
+
+
+def iter_trades():
+    """Streams all logged trades, oldest first."""
+    return get_journal().iter_entries()
+
+
+def read_trades():
+    """Returns all logged trades as a list."""
+    return get_journal().read_all()
+
+
+if __name__ == "__main__":
+    journal = get_journal()
+    print(f"📒 Journal segments: {journal.segments()}")
+    print(f"🧾 Last trades: {journal.tail(5)}")
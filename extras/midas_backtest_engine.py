@@ -0,0 +1,320 @@
+# =====================================================
+# MIDAS VECTORIZED BACKTEST ENGINE
+# RSI / ADX / EMA-crossover strategy on 5m candles with a
+# 15m trend filter. Indicators, entries and exits are all
+# computed with whole-array NumPy operations — there is no
+# per-bar Python loop.
+# =====================================================
+
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    from extras.midas_indicator_cache import get_indicator_cache
+    from extras.midas_candle_store import get_candle_store, normalize_columns
+except ImportError:  # running from inside extras/
+    from midas_indicator_cache import get_indicator_cache
+    from midas_candle_store import get_candle_store, normalize_columns
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.getenv("MIDAS_DATA_DIR", os.path.join(BASE_DIR, "..", "data", "candles"))
+
+COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+
+RSI_PERIOD = 14
+ADX_PERIOD = 14
+ATR_PERIOD = 14
+MAX_HOLD_BARS = 288  # close any trade still open after 24h of 5m bars
+FEE_PCT = 0.0  # round-trip fee in percent, deducted from every trade
+BAR_MS = 300_000  # 5m signal candles
+TREND_BAR_MS = 900_000  # 15m trend candles
+
+
+# =====================================================
+# DATA LOADING
+# =====================================================
+def load_csv(pair, timeframe, data_dir=DATA_DIR):
+    """
+    Loads <data_dir>/<PAIR>_<timeframe>.csv into a DataFrame with
+    timestamp (epoch ms), open, high, low, close, volume columns.
+    """
+    df = normalize_columns(pd.read_csv(csv_path(pair, timeframe, data_dir)))
+    return df.sort_values("timestamp").reset_index(drop=True)
+
+
+def csv_path(pair, timeframe, data_dir=DATA_DIR):
+    return os.path.join(data_dir, f"{pair.replace('/', '')}_{timeframe}.csv")
+
+
+def load_candles(pair, timeframe, start=None, end=None, store=None, data_dir=DATA_DIR):
+    """
+    Returns {column: ndarray} from the memory-mapped candle store, importing
+    <data_dir>/<PAIR>_<timeframe>.csv into the store on first use and again
+    whenever the CSV changes (size / mtime differ from meta.json).
+    start / end (epoch ms) select a date range without copying.
+    """
+    store = store or get_candle_store()
+    path = csv_path(pair, timeframe, data_dir)
+    if not store.has(pair, timeframe) or (os.path.exists(path) and not store.is_current(pair, timeframe, path)):
+        store.import_csv(pair, timeframe, path)
+    return store.load(pair, timeframe, start, end)
+
+
+def to_arrays(data):
+    """Returns {column: ndarray} for a DataFrame or an existing dict of arrays."""
+    if data is None:
+        return None
+    if isinstance(data, pd.DataFrame):
+        return {col: data[col].to_numpy() for col in COLUMNS if col in data.columns}
+    return data
+
+
+def slice_window(preloaded_data, fraction):
+    """
+    Returns preloaded data restricted to the most recent `fraction` of the 5m candles
+    (the 15m frame is cut at the same timestamp). Slices are views, not copies.
+    """
+    if fraction >= 1.0:
+        return preloaded_data
+    window = dict(preloaded_data)
+    c5 = to_arrays(preloaded_data["df5"])
+    start = len(c5["close"]) - max(2, int(len(c5["close"]) * fraction))
+    window["df5"] = {col: values[max(start, 0):] for col, values in c5.items()}
+
+    c15 = to_arrays(preloaded_data.get("df15"))
+    if len(c5["close"]) == 0:
+        return score_results(np.zeros(0))
+    if c15 is not None and "timestamp" in c15 and "timestamp" in c5:
+        first = np.searchsorted(c15["timestamp"], window["df5"]["timestamp"][0], side="left")
+        window["df15"] = {col: values[first:] for col, values in c15.items()}
+    return window
+
+
+# =====================================================
+# INDICATORS (vectorized)
+# =====================================================
+def ema(values, period):
+    """Exponential moving average (alpha = 2 / (period + 1)), seeded with the first value."""
+    return pd.Series(values).ewm(span=period, adjust=False).mean().to_numpy()
+
+
+def wilder(values, period):
+    """Wilder's smoothing (alpha = 1 / period), seeded with the first value."""
+    return pd.Series(values).ewm(alpha=1.0 / period, adjust=False).mean().to_numpy()
+
+
+def rsi(close, period=RSI_PERIOD):
+    delta = np.diff(close, prepend=close[0])
+    avg_gain = wilder(np.clip(delta, 0, None), period)
+    avg_loss = wilder(np.clip(-delta, 0, None), period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi_values = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    rsi_values = np.where(avg_loss == 0, np.where(avg_gain == 0, 50.0, 100.0), rsi_values)
+    return rsi_values
+
+
+def true_range(high, low, close):
+    prev_close = np.concatenate(([close[0]], close[:-1]))
+    return np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def atr(high, low, close, period=ATR_PERIOD):
+    return wilder(true_range(high, low, close), period)
+
+
+def adx(high, low, close, period=ADX_PERIOD):
+    up = np.diff(high, prepend=high[0])
+    down = -np.diff(low, prepend=low[0])
+    plus_dm = np.where((up > down) & (up > 0), up, 0.0)
+    minus_dm = np.where((down > up) & (down > 0), down, 0.0)
+
+    smoothed_tr = wilder(true_range(high, low, close), period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        plus_di = np.where(smoothed_tr > 0, 100.0 * wilder(plus_dm, period) / smoothed_tr, 0.0)
+        minus_di = np.where(smoothed_tr > 0, 100.0 * wilder(minus_dm, period) / smoothed_tr, 0.0)
+        di_sum = plus_di + minus_di
+        dx = np.where(di_sum > 0, 100.0 * np.abs(plus_di - minus_di) / di_sum, 0.0)
+    return wilder(dx, period)
+
+
+def compute_indicators(candles, ema_fast, ema_slow, cache=None, pair="", timeframe="5m"):
+    """
+    All indicator series the strategy needs for one candle set.
+    With a cache, each (pair, timeframe, indicator, period, data) series is computed once.
+    """
+    close, high, low = candles["close"], candles["high"], candles["low"]
+    if cache is None:
+        return {
+            "ema_fast": ema(close, ema_fast),
+            "ema_slow": ema(close, ema_slow),
+            "rsi": rsi(close),
+            "adx": adx(high, low, close),
+            "atr": atr(high, low, close),
+        }
+
+    def cached(indicator, period, compute):
+        return cache.get(pair, timeframe, indicator, period, candles, compute)
+
+    return {
+        "ema_fast": cached("ema", ema_fast, lambda: ema(close, ema_fast)),
+        "ema_slow": cached("ema", ema_slow, lambda: ema(close, ema_slow)),
+        "rsi": cached("rsi", RSI_PERIOD, lambda: rsi(close)),
+        "adx": cached("adx", ADX_PERIOD, lambda: adx(high, low, close)),
+        "atr": cached("atr", ATR_PERIOD, lambda: atr(high, low, close)),
+    }
+
+
+# =====================================================
+# SIGNALS & EXITS
+# =====================================================
+def _trend_filter(c5, c15, ema_fast, ema_slow, cache=None, pair=""):
+    """
+    Aligns each 5m bar with the last 15m bar closed by the time the 5m bar
+    closes (as the live strategy sees it) and returns (bullish, bearish) masks
+    from the 15m EMA trend. None if no 15m data.
+    """
+    if c15 is None or len(c15.get("close", [])) == 0 or "timestamp" not in c15 or "timestamp" not in c5:
+        return None
+    if cache is not None:
+        fast15 = cache.get(pair, "15m", "ema", ema_fast, c15, lambda: ema(c15["close"], ema_fast))
+        slow15 = cache.get(pair, "15m", "ema", ema_slow, c15, lambda: ema(c15["close"], ema_slow))
+    else:
+        fast15 = ema(c15["close"], ema_fast)
+        slow15 = ema(c15["close"], ema_slow)
+    # A 15m bar is usable once its close time is at or before the 5m bar's close time
+    idx = np.searchsorted(c15["timestamp"] + TREND_BAR_MS, c5["timestamp"] + BAR_MS, side="right") - 1
+    known = idx >= 0
+    idx = np.clip(idx, 0, None)
+    return known & (fast15[idx] > slow15[idx]), known & (fast15[idx] < slow15[idx])
+
+
+def find_entries(candles, ind, cfg, trend=None):
+    """Returns (entry indices, direction) where direction is +1 long / -1 short."""
+    if len(candles["close"]) == 0:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=int)
+    fast, slow = ind["ema_fast"], ind["ema_slow"]
+    above = fast > slow
+    prev_above = np.concatenate(([above[0]], above[:-1]))
+    cross_up = above & ~prev_above
+    cross_down = ~above & prev_above
+
+    strong = ind["adx"] > cfg["adx_min"]
+    longs = cross_up & strong & (ind["rsi"] > cfg["rsi_bullish"])
+    shorts = cross_down & strong & (ind["rsi"] < cfg["rsi_bearish"])
+    if trend is not None:
+        longs &= trend[0]
+        shorts &= trend[1]
+
+    # Skip the warm-up period where the slow EMA is still unreliable
+    warmup = int(max(cfg["ema_slow"], ADX_PERIOD * 2))
+    longs[:warmup] = False
+    shorts[:warmup] = False
+    # An entry on the last bar has nothing to exit on
+    longs[-1] = shorts[-1] = False
+
+    entries = np.flatnonzero(longs | shorts)
+    direction = np.where(longs[entries], 1, -1)
+    return entries, direction
+
+
+def resolve_exits(candles, entries, direction, atr_values, take_profit, stop_mult, max_hold=MAX_HOLD_BARS):
+    """
+    For every entry, finds the first bar where take-profit or stop-loss is hit
+    (stop-loss wins when both fall in the same bar). Trades that hit neither
+    close at the last bar of the holding window.
+    Returns (exit indices, returns in percent).
+    """
+    high, low, close = candles["high"], candles["low"], candles["close"]
+    n = len(close)
+    if len(entries) == 0:
+        return entries, np.zeros(0)
+
+    entry_price = close[entries]
+    tp_dist = entry_price * take_profit / 100.0
+    sl_dist = atr_values[entries] * stop_mult
+    take = entry_price + direction * tp_dist
+    stop = entry_price - direction * sl_dist
+
+    offsets = np.arange(1, max_hold + 1)
+    window = entries[:, None] + offsets[None, :]
+    valid = window < n
+    window = np.minimum(window, n - 1)
+    highs, lows = high[window], low[window]
+
+    is_long = (direction == 1)[:, None]
+    hit_tp = np.where(is_long, highs >= take[:, None], lows <= take[:, None]) & valid
+    hit_sl = np.where(is_long, lows <= stop[:, None], highs >= stop[:, None]) & valid
+
+    hit = hit_tp | hit_sl
+    any_hit = hit.any(axis=1)
+    first = np.where(any_hit, hit.argmax(axis=1), valid.sum(axis=1) - 1)
+    rows = np.arange(len(entries))
+    exit_idx = window[rows, first]
+
+    stopped = hit_sl[rows, first]
+    took = hit_tp[rows, first] & ~stopped
+    exit_price = np.where(stopped, stop, np.where(took, take, close[exit_idx]))
+
+    returns = direction * (exit_price - entry_price) / entry_price * 100.0 - FEE_PCT
+    return exit_idx, returns
+
+
+def _non_overlapping(entries, exit_idx):
+    """Keeps one position at a time: an entry is taken only after the previous trade closed."""
+    keep = np.zeros(len(entries), dtype=bool)
+    last_exit = -1
+    for i, (entry, exit_) in enumerate(zip(entries, exit_idx)):  # loops over trades, not bars
+        if entry > last_exit:
+            keep[i] = True
+            last_exit = exit_
+    return keep
+
+
+def score_results(returns):
+    """Summary stats in the format stored in midas_best_config.json."""
+    trades = int(len(returns))
+    if trades == 0:
+        return {"win_rate": 0.0, "profit": 0.0, "trades": 0, "score": 0.0}
+    win_rate = float((returns > 0).mean() * 100.0)
+    profit = float(returns.sum())
+    score = win_rate * profit / trades
+    return {
+        "win_rate": round(win_rate, 2),
+        "profit": round(profit, 2),
+        "trades": trades,
+        "score": round(score, 4),
+    }
+
+
+# =====================================================
+# PUBLIC ENTRY POINT
+# =====================================================
+def run_backtest_with_params(cfg, preloaded_data, cache=None):
+    """
+    Backtests one parameter set on preloaded candles.
+    cfg keys: rsi_bullish, rsi_bearish, adx_min, ema_fast, ema_slow, take_profit, stop_mult.
+    preloaded_data: {"df5": candles, "df15": candles, "pair": optional name} as DataFrames or dicts of arrays.
+    Indicator series come from the shared indicator cache unless another cache is given.
+    Returns {"win_rate", "profit", "trades", "score"}.
+    """
+    if not preloaded_data or preloaded_data.get("df5") is None:
+        raise ValueError("No market data loaded")
+
+    c5 = to_arrays(preloaded_data["df5"])
+    c15 = to_arrays(preloaded_data.get("df15"))
+    if len(c5["close"]) == 0:
+        return score_results(np.zeros(0))
+    ema_fast = max(1, int(round(cfg["ema_fast"])))
+    ema_slow = max(1, int(round(cfg["ema_slow"])))
+
+    cache = cache or get_indicator_cache()
+    pair = preloaded_data.get("pair", "")
+    ind = compute_indicators(c5, ema_fast, ema_slow, cache, pair, "5m")
+    trend = _trend_filter(c5, c15, ema_fast, ema_slow, cache, pair)
+    entries, direction = find_entries(c5, ind, cfg, trend)
+    exit_idx, returns = resolve_exits(c5, entries, direction, ind["atr"], cfg["take_profit"], cfg["stop_mult"])
+
+    keep = _non_overlapping(entries, exit_idx)
+    return score_results(returns[keep])
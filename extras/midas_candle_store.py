@@ -0,0 +1,187 @@
+# =====================================================
+# MIDAS COLUMNAR CANDLE STORE
+# One typed .npy file per column per (pair, timeframe):
+#   <store>/<PAIR>/<timeframe>/timestamp.npy   int64 (epoch ms)
+#   <store>/<PAIR>/<timeframe>/open.npy ...     float64
+# Files are opened memory-mapped, so loading is near-instant
+# and date-range slices (binary search on timestamp) are
+# zero-copy views — history never has to fit in RAM.
+# =====================================================
+
+import json
+import os
+import shutil
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_DIR = os.getenv("MIDAS_CANDLE_STORE", os.path.join(BASE_DIR, "..", "data", "candle_store"))
+
+COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+DTYPES = {"timestamp": np.int64, "open": np.float64, "high": np.float64,
+          "low": np.float64, "close": np.float64, "volume": np.float64}
+IMPORT_CHUNK_ROWS = 500_000
+
+
+def normalize_columns(df):
+    """
+    Brings a raw candle DataFrame to timestamp (epoch ms), open, high, low, close, volume.
+    Accepts common header variants (time/date/datetime/open_time) and date strings.
+    """
+    import pandas as pd
+
+    df.columns = [str(c).strip().lower() for c in df.columns]
+    if "timestamp" not in df.columns:
+        for alias in ("time", "date", "datetime", "open_time"):
+            if alias in df.columns:
+                df = df.rename(columns={alias: "timestamp"})
+                break
+    if not pd.api.types.is_numeric_dtype(df["timestamp"]):
+        df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True).astype("int64") // 10**6
+    df = df[COLUMNS].copy()
+    for column in COLUMNS:
+        df[column] = df[column].astype(DTYPES[column])
+    return df
+
+
+def source_stat(path):
+    """[size, mtime_ns] of a source file, recorded in meta.json to detect a refreshed CSV."""
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+class CandleStore:
+    """Memory-mapped columnar candle storage."""
+
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+
+    def _dir(self, pair, timeframe):
+        return os.path.join(self.root, pair.replace("/", ""), timeframe)
+
+    def has(self, pair, timeframe):
+        return os.path.exists(os.path.join(self._dir(pair, timeframe), "meta.json"))
+
+    def meta(self, pair, timeframe):
+        with open(os.path.join(self._dir(pair, timeframe), "meta.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def is_current(self, pair, timeframe, csv_path):
+        """True if the stored candles were imported from csv_path as it is now (same size and mtime)."""
+        if not self.has(pair, timeframe):
+            return False
+        meta = self.meta(pair, timeframe)
+        return meta.get("source") == os.path.basename(csv_path) and meta.get("source_stat") == source_stat(csv_path)
+
+    # =================================================
+    # WRITE
+    # =================================================
+    def _publish(self, tmp_dir, pair, timeframe, rows, source, stat=None):
+        """Writes meta.json and swaps the finished directory into place."""
+        timestamps = np.load(os.path.join(tmp_dir, "timestamp.npy"), mmap_mode="r")
+        meta = {
+            "pair": pair,
+            "timeframe": timeframe,
+            "rows": int(rows),
+            "first_timestamp": int(timestamps[0]) if rows else None,
+            "last_timestamp": int(timestamps[-1]) if rows else None,
+            "source": source,
+        }
+        if stat is not None:
+            meta["source_stat"] = stat
+        del timestamps
+        with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=4)
+
+        target = self._dir(pair, timeframe)
+        if os.path.exists(target):
+            shutil.rmtree(target)
+        os.replace(tmp_dir, target)
+        return meta
+
+    def _tmp_dir(self, pair, timeframe):
+        tmp_dir = self._dir(pair, timeframe) + ".tmp"
+        if os.path.exists(tmp_dir):
+            shutil.rmtree(tmp_dir)
+        os.makedirs(tmp_dir)
+        return tmp_dir
+
+    def write(self, pair, timeframe, candles, source="arrays"):
+        """Stores a full candle set ({column: array}), sorted by timestamp."""
+        order = np.argsort(np.asarray(candles["timestamp"]), kind="stable")
+        tmp_dir = self._tmp_dir(pair, timeframe)
+        for column in COLUMNS:
+            values = np.asarray(candles[column], dtype=DTYPES[column])[order]
+            np.save(os.path.join(tmp_dir, f"{column}.npy"), values)
+        return self._publish(tmp_dir, pair, timeframe, len(order), source)
+
+    def import_csv(self, pair, timeframe, csv_path, chunk_rows=IMPORT_CHUNK_ROWS):
+        """
+        Converts a candle CSV into the store in chunks, so files larger
+        than memory can be imported. Rows are sorted by timestamp if needed.
+        """
+        import pandas as pd
+
+        stat = source_stat(csv_path)  # taken first, so a rewrite during the import is picked up next time
+        with open(csv_path, "r", encoding="utf-8") as f:
+            rows = max(0, sum(1 for _ in f) - 1)  # minus header
+
+        tmp_dir = self._tmp_dir(pair, timeframe)
+        columns = {
+            column: np.lib.format.open_memmap(os.path.join(tmp_dir, f"{column}.npy"), mode="w+",
+                                              dtype=DTYPES[column], shape=(rows,))
+            for column in COLUMNS
+        }
+
+        filled = 0
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_rows):
+            chunk = normalize_columns(chunk)
+            n = len(chunk)
+            for column in COLUMNS:
+                columns[column][filled:filled + n] = chunk[column].to_numpy()
+            filled += n
+
+        timestamps = columns["timestamp"][:filled]
+        if filled > 1 and np.any(timestamps[1:] < timestamps[:-1]):
+            order = np.argsort(timestamps, kind="stable")
+            for column in COLUMNS:
+                columns[column][:filled] = columns[column][:filled][order]
+
+        for array in columns.values():
+            array.flush()
+        del columns, timestamps
+
+        if filled != rows:  # blank trailing lines etc. — trim to what was read
+            for column in COLUMNS:
+                path = os.path.join(tmp_dir, f"{column}.npy")
+                np.save(path + ".trim.npy", np.load(path, mmap_mode="r")[:filled])
+                os.replace(path + ".trim.npy", path)
+
+        meta = self._publish(tmp_dir, pair, timeframe, filled, os.path.basename(csv_path), stat)
+        print(f"📦 Imported {filled} {pair} {timeframe} candles into the candle store.")
+        return meta
+
+    # =================================================
+    # READ
+    # =================================================
+    def load(self, pair, timeframe, start=None, end=None):
+        """
+        Returns {column: read-only memmap view} for candles with start <= timestamp < end
+        (epoch ms, either bound optional). No data is copied.
+        """
+        directory = self._dir(pair, timeframe)
+        columns = {column: np.load(os.path.join(directory, f"{column}.npy"), mmap_mode="r") for column in COLUMNS}
+        timestamps = columns["timestamp"]
+        lo = 0 if start is None else int(np.searchsorted(timestamps, start, side="left"))
+        hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, side="left"))
+        return {column: values[lo:hi] for column, values in columns.items()}
+
+
+_store = None
+
+
+def get_candle_store():
+    global _store
+    if _store is None:
+        _store = CandleStore()
+    return _store
@@ -0,0 +1,97 @@
+# =====================================================
+# MIDAS INDICATOR CACHE
+# Memoizes indicator series across optimizer configs.
+# Keyed by (pair, timeframe, indicator, period, data
+# fingerprint) with bounded LRU eviction, so every distinct
+# series is computed once per run instead of per config.
+# =====================================================
+
+import hashlib
+import os
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+CACHE_MAX_ENTRIES = int(os.getenv("INDICATOR_CACHE_SIZE", 256))
+
+
+def fingerprint(candles):
+    """
+    Content hash of a candle set (close/high/low columns).
+    Computed once per array object and remembered while the array is alive.
+    """
+    close = candles["close"]
+    key = id(close)
+    cached = _fingerprints.get(key)
+    if cached is not None and cached[0]() is close:
+        return cached[1]
+
+    digest = hashlib.blake2b(digest_size=16)
+    for column in ("close", "high", "low"):
+        values = candles.get(column)
+        if values is not None:
+            digest.update(np.ascontiguousarray(values).tobytes())
+    value = digest.hexdigest()
+
+    try:
+        ref = weakref.ref(close, lambda _, k=key: _fingerprints.pop(k, None))
+        _fingerprints[key] = (ref, value)
+    except TypeError:
+        pass  # not weak-referenceable (e.g. a list) — just don't memoize
+    return value
+
+
+_fingerprints = {}
+
+
+class IndicatorCache:
+    """Bounded LRU cache of computed indicator arrays."""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, pair, timeframe, indicator, period, candles, compute):
+        """Returns the cached series, calling compute() only on a miss."""
+        key = (pair, timeframe, indicator, period, fingerprint(candles))
+        with self._lock:
+            values = self._entries.get(key)
+            if values is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return values
+
+        values = np.asarray(compute())
+        values.flags.writeable = False  # shared between configs — must never be mutated
+
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = values
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return values
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+_cache = None
+
+
+def get_indicator_cache():
+    """Process-wide cache (each optimizer worker process gets its own)."""
+    global _cache
+    if _cache is None:
+        _cache = IndicatorCache()
+    return _cache
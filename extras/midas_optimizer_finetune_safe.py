@@ -2,177 +2,221 @@ import itertools
 import json
 import os
 from datetime import datetime
-import pandas as pd
-import importlib.util
 from tqdm import tqdm
 import time
 
+try:
+    from extras import midas_backtest_engine as bot
+    from extras.midas_parallel import evaluate_parallel, evaluate_serial, default_workers, make_evaluator
+    from extras.midas_result_store import ResultStore
+    from extras.midas_search import build_search_space, get_strategy, run_search
+except ImportError:  # running from inside extras/
+    import midas_backtest_engine as bot
+    from midas_parallel import evaluate_parallel, evaluate_serial, default_workers, make_evaluator
+    from midas_result_store import ResultStore
+    from midas_search import build_search_space, get_strategy, run_search
+
 # =====================================================
 # CONFIGURATION
 # =====================================================
 PAIR = "BTCUSDT"
-BOT_FILE = "midas_multiframe_backtest_v2.py"
 BEST_FILE = "../midas_best_config.json"
-PROGRESS_FILE = "optimizer_progress_finetune_safe.csv"
+PROGRESS_FILE = "optimizer_progress_finetune_safe.csv"  # legacy progress, imported once into the store
+STORE_FILE = "optimizer_results_finetune_safe.jsonl"
 RESULTS_FILE = "midas_finetune_light_results.xlsx"
 
-SAVE_INTERVAL = 20  # autosave after every N configurations
-
-
-# =====================================================
-# LOAD BACKTEST ENGINE
-# =====================================================
-def load_bot_module(filepath):
-    """Dynamically load midas_multiframe_backtest_v2.py as a module."""
-    spec = importlib.util.spec_from_file_location("midas_engine", filepath)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)
-    return module
-
-
-bot = load_bot_module(BOT_FILE)
+SAVE_INTERVAL = 20  # progress message after every N configurations (each result is stored as it finishes)
+WORKERS = default_workers()  # OPTIMIZER_WORKERS=1 forces the serial loop
+SEARCH_STRATEGY = os.getenv("SEARCH_STRATEGY", "grid").lower()  # grid / random / lhs / halving / tpe
 
 
 # =====================================================
 # LOAD BASE CONFIG
 # =====================================================
-if not os.path.exists(BEST_FILE):
-    print(f"⚠️ No {BEST_FILE} found. Using default base config.")
-    base_config = {
-        "rsi_bullish": 50,
-        "rsi_bearish": 46,
-        "adx_min": 16,
-        "ema_fast": 8,
-        "ema_slow": 40,
-        "take_profit": 1.6,
-        "stop_mult": 1.3,
-        "win_rate": 0,
-        "profit": 0,
-        "trades": 0,
-        "score": 0
-    }
-else:
-    with open(BEST_FILE, "r") as f:
-        base_config = json.load(f)
-
-print("✨ Loaded previous best config:")
-print(json.dumps(base_config, indent=4))
+def load_base_config():
+    if not os.path.exists(BEST_FILE):
+        print(f"⚠️ No {BEST_FILE} found. Using default base config.")
+        base_config = {
+            "rsi_bullish": 50,
+            "rsi_bearish": 46,
+            "adx_min": 16,
+            "ema_fast": 8,
+            "ema_slow": 40,
+            "take_profit": 1.6,
+            "stop_mult": 1.3,
+            "win_rate": 0,
+            "profit": 0,
+            "trades": 0,
+            "score": 0
+        }
+    else:
+        with open(BEST_FILE, "r") as f:
+            base_config = json.load(f)
+
+    print("✨ Loaded previous best config:")
+    print(json.dumps(base_config, indent=4))
+    return base_config
 
 
 # =====================================================
 # CREATE PARAMETER GRID (NARROW RANGE AROUND BEST CONFIG)
 # =====================================================
-param_grid = {
-    "rsi_bullish": [base_config["rsi_bullish"] - 2, base_config["rsi_bullish"], base_config["rsi_bullish"] + 2],
-    "rsi_bearish": [base_config["rsi_bearish"] - 2, base_config["rsi_bearish"], base_config["rsi_bearish"] + 2],
-    "adx_min": [base_config["adx_min"] - 2, base_config["adx_min"], base_config["adx_min"] + 2],
-    "ema_fast": [base_config["ema_fast"] - 2, base_config["ema_fast"], base_config["ema_fast"] + 2],
-    "ema_slow": [base_config["ema_slow"] - 10, base_config["ema_slow"], base_config["ema_slow"] + 10],
-    "take_profit": [base_config["take_profit"] - 0.2, base_config["take_profit"], base_config["take_profit"] + 0.2],
-    "stop_mult": [base_config["stop_mult"] - 0.2, base_config["stop_mult"], base_config["stop_mult"] + 0.2],
-}
+def build_configs(base_config):
+    param_grid = {
+        "rsi_bullish": [base_config["rsi_bullish"] - 2, base_config["rsi_bullish"], base_config["rsi_bullish"] + 2],
+        "rsi_bearish": [base_config["rsi_bearish"] - 2, base_config["rsi_bearish"], base_config["rsi_bearish"] + 2],
+        "adx_min": [base_config["adx_min"] - 2, base_config["adx_min"], base_config["adx_min"] + 2],
+        "ema_fast": [base_config["ema_fast"] - 2, base_config["ema_fast"], base_config["ema_fast"] + 2],
+        "ema_slow": [base_config["ema_slow"] - 10, base_config["ema_slow"], base_config["ema_slow"] + 10],
+        "take_profit": [base_config["take_profit"] - 0.2, base_config["take_profit"], base_config["take_profit"] + 0.2],
+        "stop_mult": [base_config["stop_mult"] - 0.2, base_config["stop_mult"], base_config["stop_mult"] + 0.2],
+    }
 
-configs = []
-for combo in itertools.product(*param_grid.values()):
-    cfg = dict(zip(param_grid.keys(), combo))
-    configs.append(cfg)
+    configs = []
+    for combo in itertools.product(*param_grid.values()):
+        cfg = dict(zip(param_grid.keys(), combo))
+        configs.append(cfg)
 
-print(f"\n🧮 Total fine-tune configurations: {len(configs)}")
+    print(f"\n🧮 Total fine-tune configurations: {len(configs)}")
+    return configs
 
 
 # =====================================================
 # LOAD MARKET DATA ONCE
 # =====================================================
-print("\n🧠 Loading market data (5m + 15m only for speed)...")
-try:
-    df5 = bot.load_csv(PAIR, "5m")
-    df15 = bot.load_csv(PAIR, "15m")
-    preloaded_data = {"df5": df5, "df15": df15, "df30": df5.head(10), "df1h": df5.head(10)}  # lightweight placeholders
-except Exception as e:
-    print(f"❌ Failed to load data: {e}")
-    preloaded_data = None
+def load_market_data():
+    print("\n🧠 Loading market data (5m + 15m only for speed)...")
+    try:
+        # Memory-mapped columns from the candle store (CSV is imported once on first use)
+        df5 = bot.load_candles(PAIR, "5m")
+        df15 = bot.load_candles(PAIR, "15m")
+        return {"df5": df5, "df15": df15, "pair": PAIR}
+    except Exception as e:
+        print(f"❌ Failed to load data: {e}")
+        return None
 
 
 # =====================================================
 # LOAD PROGRESS (RESUME SUPPORT)
 # =====================================================
-if os.path.exists(PROGRESS_FILE):
-    try:
-        df_progress = pd.read_csv(PROGRESS_FILE)
-        tested = len(df_progress)
-        print(f"🔁 Resuming from {PROGRESS_FILE} ({tested} completed configs).")
-        completed_configs = df_progress.to_dict("records")
-    except Exception:
-        print("⚠️ Progress file corrupted. Starting fresh.")
-        df_progress = pd.DataFrame()
-        completed_configs = []
-else:
-    print("🆕 Starting fresh optimization run.")
-    df_progress = pd.DataFrame()
-    completed_configs = []
+def load_progress():
+    """Opens the result store; a legacy progress CSV is imported the first time."""
+    store = ResultStore(STORE_FILE)
+    if not len(store) and os.path.exists(PROGRESS_FILE):
+        store.import_csv(PROGRESS_FILE)
+    if len(store):
+        print(f"🔁 Resuming from {STORE_FILE} ({len(store)} completed evaluations).")
+    else:
+        print("🆕 Starting fresh optimization run.")
+    return store
 
-# Skip configs already tested
-completed_set = {tuple(sorted(cfg.items())) for cfg in completed_configs}
-remaining_configs = [cfg for cfg in configs if tuple(sorted(cfg.items())) not in completed_set]
+
+def remaining_after(configs, store):
+    """Skip configs already tested (O(1) hash lookup per config)."""
+    return store.remaining(configs)
 
 
 # =====================================================
 # MAIN FINE-TUNING LOOP
 # =====================================================
-print("🚀 Running safe fine-tuning loop...")
+def run_fine_tuning(remaining_configs, preloaded_data, store, total, workers=WORKERS):
+    if workers > 1 and preloaded_data:
+        print(f"🚀 Running safe fine-tuning loop on {workers} worker processes...")
+        outcomes = evaluate_parallel(remaining_configs, preloaded_data, workers=workers)
+    else:
+        print("🚀 Running safe fine-tuning loop...")
+        outcomes = evaluate_serial(remaining_configs, preloaded_data)
 
-results = []
-counter = 0
-start_time = time.time()
+    counter = 0
 
-for cfg in tqdm(remaining_configs, desc="⚙️ Safe Fine-Tuning", ncols=80):
-    try:
-        result = bot.run_backtest_with_params(cfg, preloaded_data)
-        result.update(cfg)
-        results.append(result)
-    except Exception as e:
-        print(f"⚠️ Error in config {cfg}: {e}")
-        continue
+    # Results arrive in completion order; each one is appended to the store as it finishes
+    for cfg, result, error in tqdm(outcomes, total=len(remaining_configs), desc="⚙️ Safe Fine-Tuning", ncols=80):
+        if error is not None:
+            print(f"⚠️ Error in config {cfg}: {error}")
+            continue
+        store.add(cfg, result)
+
+        counter += 1
+        if counter % SAVE_INTERVAL == 0:
+            print(f"💾 Progress stored ({len(store)}/{total})")
+    return store
+
+
+# =====================================================
+# ADAPTIVE SEARCH (random / lhs / halving / tpe)
+# =====================================================
+def run_adaptive_search(base_config, preloaded_data, store, strategy_name=SEARCH_STRATEGY, workers=WORKERS):
+    """
+    Searches a wider range around the base config with an adaptive strategy.
+    Every evaluation is appended to the result store with its data "budget"
+    (share of history used); on resume those rows are replayed, not re-run.
+    """
+    space = build_search_space(base_config)
+    strategy = get_strategy(strategy_name, space)
+    print(f"🧭 Running {strategy.name} search (budget {strategy.budget} evaluations, patience {strategy.patience})...")
 
-    counter += 1
+    completed = store.completed()
 
-    # Autosave progress every N runs
-    if counter % SAVE_INTERVAL == 0:
-        df_progress = pd.concat([df_progress, pd.DataFrame(results)], ignore_index=True)
-        df_progress.to_csv(PROGRESS_FILE, index=False)
-        results = []
-        print(f"💾 Progress autosaved ({counter}/{len(configs)})")
+    counter = 0
+    with make_evaluator(preloaded_data, workers) as evaluator:
+        progress = tqdm(desc=f"⚙️ {strategy.name} search", ncols=80)
+        for cfg, fraction, result in run_search(strategy, evaluator, completed):
+            store.add(cfg, result, fraction)
+            counter += 1
+            progress.update(1)
+            if counter % SAVE_INTERVAL == 0:
+                print(f"💾 Progress stored ({counter} evaluations)")
+        progress.close()
+    return store
 
-# Final save after loop
-if results:
-    df_progress = pd.concat([df_progress, pd.DataFrame(results)], ignore_index=True)
-df_progress.to_csv(PROGRESS_FILE, index=False)
 
 # =====================================================
 # ANALYZE & SAVE RESULTS
 # =====================================================
-if "score" in df_progress.columns and not df_progress["score"].isna().all():
-    best = df_progress.sort_values("score", ascending=False).iloc[0].to_dict()
+def save_results(store):
+    # Only full-history evaluations can become the best config
+    best = store.best("score")
+    if best is not None:
+        print("\n🏆 Best Fine-Tuned Parameters Found:")
+        for k, v in best.items():
+            print(f"   {k}: {v}")
+
+        # Update best config file
+        with open(BEST_FILE, "w") as f:
+            json.dump(best, f, indent=4)
 
-    print("\n🏆 Best Fine-Tuned Parameters Found:")
-    for k, v in best.items():
-        print(f"   {k}: {v}")
+    else:
+        print("⚠️ No valid 'score' column found — skipping sort.")
 
-    # Update best config file
-    with open(BEST_FILE, "w") as f:
-        json.dump(best, f, indent=4)
+    # Save to Excel once, streaming rows from the store
+    try:
+        store.export_excel(RESULTS_FILE)
+        print(f"📁 Results saved to: {RESULTS_FILE}")
+    except PermissionError:
+        alt_name = f"midas_finetune_light_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+        store.export_excel(alt_name)
+        print(f"⚠️ Excel open — saved to {alt_name} instead.")
 
-else:
-    print("⚠️ No valid 'score' column found — skipping sort.")
 
-# Save to Excel
-try:
-    df_progress.to_excel(RESULTS_FILE, index=False)
-    print(f"📁 Results saved to: {RESULTS_FILE}")
-except PermissionError:
-    alt_name = f"midas_finetune_light_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-    df_progress.to_excel(alt_name, index=False)
-    print(f"⚠️ Excel open — saved to {alt_name} instead.")
+def main():
+    start_time = time.time()
+
+    base_config = load_base_config()
+    preloaded_data = load_market_data()
+    store = load_progress()
+
+    if SEARCH_STRATEGY == "grid":
+        configs = build_configs(base_config)
+        remaining_configs = remaining_after(configs, store)
+        run_fine_tuning(remaining_configs, preloaded_data, store, len(configs))
+    else:
+        run_adaptive_search(base_config, preloaded_data, store)
+    save_results(store)
+    store.close()
+
+    print(f"\n🏁 Fine-tuning completed safely and saved successfully ({time.time() - start_time:.1f}s).")
 
-print("\n🏁 Fine-tuning completed safely and saved successfully.")
 
+# Guarded so worker processes (spawn start method) can import this file safely
+if __name__ == "__main__":
+    main()
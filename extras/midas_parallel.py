@@ -0,0 +1,203 @@
+# =====================================================
+# MIDAS PARALLEL CONFIG EVALUATION
+# Spreads backtest configs across a process pool. Candle
+# arrays are copied into shared memory once; workers map
+# them read-only instead of receiving a pickled copy per task.
+# =====================================================
+
+import os
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+try:
+    from extras import midas_backtest_engine as bot
+except ImportError:  # running from inside extras/
+    import midas_backtest_engine as bot
+
+# Configs handed to a worker per round trip (amortizes IPC for fast backtests)
+CHUNK_SIZE = int(os.getenv("OPTIMIZER_CHUNK_SIZE", 4))
+
+
+def default_workers():
+    return int(os.getenv("OPTIMIZER_WORKERS", os.cpu_count() or 1))
+
+
+# =====================================================
+# SHARED MEMORY CANDLES
+# =====================================================
+class SharedCandles:
+    """
+    Owns the shared-memory copies of preloaded candle arrays.
+    `spec` is the small picklable description workers use to attach;
+    non-candle entries (e.g. "pair") travel in it as plain values.
+    """
+
+    def __init__(self, preloaded_data):
+        self._blocks = []
+        self.spec = {"frames": {}, "values": {}}
+        for frame, candles in preloaded_data.items():
+            candles = bot.to_arrays(candles)
+            if not isinstance(candles, dict):
+                self.spec["values"][frame] = candles
+                continue
+            self.spec["frames"][frame] = {}
+            for column, values in candles.items():
+                values = np.ascontiguousarray(values)
+                block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+                np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)[...] = values
+                self._blocks.append(block)
+                self.spec["frames"][frame][column] = (block.name, values.dtype.str, values.shape)
+
+    def close(self):
+        """Releases and unlinks every block (call once all workers are done)."""
+        for block in self._blocks:
+            block.close()
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def attach_candles(spec):
+    """Maps shared blocks back into {frame: {column: ndarray}} without copying."""
+    blocks = []
+    data = dict(spec["values"])
+    for frame, columns in spec["frames"].items():
+        data[frame] = {}
+        for column, (name, dtype, shape) in columns.items():
+            block = shared_memory.SharedMemory(name=name)
+            blocks.append(block)
+            array = np.ndarray(shape, dtype=np.dtype(dtype), buffer=block.buf)
+            array.flags.writeable = False
+            data[frame][column] = array
+    return data, blocks
+
+
+# =====================================================
+# WORKER SIDE
+# =====================================================
+_worker_data = None
+_worker_blocks = None
+_worker_windows = {}
+
+
+def _init_worker(spec):
+    global _worker_data, _worker_blocks
+    _worker_data, _worker_blocks = attach_candles(spec)
+    _worker_windows.clear()
+
+
+def _window(data, fraction, windows):
+    """Data for the most recent `fraction` of history, built once per fraction."""
+    if fraction >= 1.0:
+        return data
+    if fraction not in windows:
+        windows[fraction] = bot.slice_window(data, fraction)
+    return windows[fraction]
+
+
+def _evaluate_task(task):
+    """Runs one (cfg, fraction) task in a worker. Returns (cfg, fraction, result, error message)."""
+    cfg, fraction = task
+    try:
+        data = _window(_worker_data, fraction, _worker_windows)
+        return cfg, fraction, bot.run_backtest_with_params(cfg, data), None
+    except Exception as e:
+        return cfg, fraction, None, str(e)
+
+
+# =====================================================
+# PARENT SIDE
+# =====================================================
+class SerialEvaluator:
+    """Evaluates (cfg, fraction) tasks on the current process."""
+
+    def __init__(self, preloaded_data):
+        self.preloaded_data = preloaded_data
+        self._windows = {}
+
+    def __call__(self, tasks):
+        for cfg, fraction in tasks:
+            try:
+                data = _window(self.preloaded_data, fraction, self._windows)
+                yield cfg, fraction, bot.run_backtest_with_params(cfg, data), None
+            except Exception as e:
+                yield cfg, fraction, None, str(e)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._windows.clear()
+
+
+class ParallelEvaluator:
+    """
+    Keeps one process pool and one shared-memory copy of the candles alive
+    across batches. Calling it with (cfg, fraction) tasks yields
+    (cfg, fraction, result, error) in completion order.
+    """
+
+    def __init__(self, preloaded_data, workers=None, chunk_size=CHUNK_SIZE):
+        self.workers = workers or default_workers()
+        self.chunk_size = max(1, chunk_size)
+        self._shared = SharedCandles(preloaded_data)
+        self._pool = mp.get_context().Pool(processes=self.workers, initializer=_init_worker,
+                                           initargs=(self._shared.spec,))
+
+    def __call__(self, tasks):
+        tasks = list(tasks)
+        # Small batches: spread them one task per worker instead of chunking
+        chunk = self.chunk_size if len(tasks) >= self.workers * self.chunk_size * 2 else 1
+        yield from self._pool.imap_unordered(_evaluate_task, tasks, chunksize=chunk)
+
+    def close(self):
+        self._pool.terminate()
+        self._pool.join()
+        self._shared.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def make_evaluator(preloaded_data, workers=None):
+    """Parallel evaluator for workers > 1 (and data available), serial otherwise."""
+    workers = workers or default_workers()
+    if workers > 1 and preloaded_data:
+        return ParallelEvaluator(preloaded_data, workers=workers)
+    return SerialEvaluator(preloaded_data)
+
+
+def evaluate_serial(configs, preloaded_data):
+    """Same contract as evaluate_parallel, on the current process."""
+    with SerialEvaluator(preloaded_data) as evaluator:
+        for cfg, _, result, error in evaluator((cfg, 1.0) for cfg in configs):
+            yield cfg, result, error
+
+
+def evaluate_parallel(configs, preloaded_data, workers=None, chunk_size=CHUNK_SIZE):
+    """
+    Evaluates configs across a process pool and yields (cfg, result, error)
+    in completion order, so the caller can autosave as results arrive.
+    """
+    workers = workers or default_workers()
+    configs = list(configs)
+    if workers <= 1 or len(configs) <= 1:
+        yield from evaluate_serial(configs, preloaded_data)
+        return
+
+    with ParallelEvaluator(preloaded_data, workers=workers, chunk_size=chunk_size) as evaluator:
+        for cfg, _, result, error in evaluator((cfg, 1.0) for cfg in configs):
+            yield cfg, result, error
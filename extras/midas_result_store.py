@@ -0,0 +1,205 @@
+# =====================================================
+# MIDAS OPTIMIZER RESULT STORE
+# Append-only JSONL file of optimizer evaluations:
+#   • each result is appended the moment it finishes
+#     (no periodic rewrite of the whole progress file)
+#   • configs are keyed by a canonical hash of their
+#     quantized parameters, so 1.6 - 0.2 and 1.4 match
+#   • resume checks are O(1) set lookups
+#   • exports stream rows from disk (Excel written once
+#     at the end with a write-only workbook)
+# =====================================================
+
+import csv
+import hashlib
+import json
+import math
+import os
+
+try:
+    from extras.midas_search import PARAM_KEYS
+except ImportError:  # running from inside extras/
+    from midas_search import PARAM_KEYS
+
+DECIMALS = 6  # parameter values are compared after rounding to this many decimals
+
+
+def quantize(value):
+    """Rounds numbers onto a fixed grid (ints and integral floats collapse to int); other values pass through."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return value
+    value = round(float(value), DECIMALS)
+    if value.is_integer():
+        return int(value)
+    return value
+
+
+def canonical_config(cfg, keys=PARAM_KEYS):
+    """{param: quantized value} for the parameters that identify a config."""
+    return {key: quantize(cfg[key]) for key in keys}
+
+
+def config_hash(cfg, fraction=1.0, keys=PARAM_KEYS):
+    """Stable hex key of a (config, data fraction) evaluation."""
+    canonical = canonical_config(cfg, keys)
+    canonical["budget"] = quantize(fraction)
+    payload = json.dumps(canonical, sort_keys=True, separators=(",", ":"))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _number(text):
+    """CSV cell → int / float / None / str."""
+    if text is None or text == "":
+        return None
+    try:
+        value = float(text)
+    except ValueError:
+        return text
+    return quantize(value) if math.isfinite(value) else value
+
+
+class ResultStore:
+    """
+    Optimizer results as one JSON line per evaluation: {"key", "budget", "config", "result"}.
+    The set of keys is built once when the store opens; add() is an O(1) append.
+    """
+
+    def __init__(self, path, keys=PARAM_KEYS):
+        self.path = path
+        self.keys = list(keys)
+        self._keys = set()
+        self._handle = None
+        self._index()
+
+    def _index(self):
+        if not os.path.exists(self.path):
+            return
+        valid_bytes = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn last line of a crashed run
+                try:
+                    self._keys.add(json.loads(line)["key"])
+                except (json.JSONDecodeError, KeyError, UnicodeDecodeError):
+                    print(f"⚠️ Skipping unreadable result line in {os.path.basename(self.path)}")
+                valid_bytes += len(line)
+        if valid_bytes < os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(valid_bytes)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def has(self, cfg, fraction=1.0):
+        return config_hash(cfg, fraction, self.keys) in self._keys
+
+    def remaining(self, configs, fraction=1.0):
+        """Configs not evaluated yet at this data fraction."""
+        return [cfg for cfg in configs if not self.has(cfg, fraction)]
+
+    # =====================================================
+    # ✍️ APPEND
+    # =====================================================
+    def add(self, cfg, result, fraction=1.0):
+        """Appends one finished evaluation (flushed immediately). Returns False if it was already stored."""
+        key = config_hash(cfg, fraction, self.keys)
+        if key in self._keys:
+            return False
+        record = {"key": key, "budget": quantize(fraction), "config": canonical_config(cfg, self.keys),
+                  "result": {k: v for k, v in result.items() if k not in self.keys and k != "budget"}}
+        if self._handle is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._handle = open(self.path, "a", encoding="utf-8")
+        self._handle.write(json.dumps(record) + "\n")
+        self._handle.flush()
+        self._keys.add(key)
+        return True
+
+    def import_csv(self, csv_path):
+        """One-time import of a legacy progress CSV (rows of result + config columns). Returns rows added."""
+        if not os.path.exists(csv_path):
+            return 0
+        added = 0
+        with open(csv_path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.DictReader(f):
+                row = {k: _number(v) for k, v in row.items()}
+                if any(row.get(key) is None for key in self.keys):
+                    continue
+                budget = row.pop("budget", None)
+                added += self.add(row, row, 1.0 if budget is None else budget)
+        print(f"📥 Imported {added} result(s) from {os.path.basename(csv_path)}")
+        return added
+
+    def close(self):
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    # =====================================================
+    # 📖 STREAMING READS
+    # =====================================================
+    def iter_records(self):
+        if self._handle is not None:
+            self._handle.flush()
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    def iter_rows(self):
+        """Flat rows (result columns, then config, then budget), one evaluation at a time."""
+        for record in self.iter_records():
+            row = dict(record["result"])
+            row.update(record["config"])
+            row["budget"] = record["budget"]
+            yield row
+
+    def completed(self):
+        """{search.config_key: row} of every stored evaluation, for replaying an adaptive search."""
+        try:
+            from extras.midas_search import config_key
+        except ImportError:
+            from midas_search import config_key
+        return {config_key(row, row["budget"]): row for row in self.iter_rows()}
+
+    def best(self, score_key="score", min_budget=1.0):
+        """Highest-scoring full-history row (without its budget), or None."""
+        best, best_score = None, None
+        for row in self.iter_rows():
+            score = row.get(score_key)
+            if row["budget"] < min_budget or not isinstance(score, (int, float)) or math.isnan(score):
+                continue
+            if best_score is None or score > best_score:
+                best, best_score = row, score
+        if best is not None:
+            best.pop("budget")
+        return best
+
+    def columns(self):
+        """Column order of iter_rows() across all stored rows (first-seen order)."""
+        columns = {}
+        for row in self.iter_rows():
+            columns.update(dict.fromkeys(row))
+        return list(columns)
+
+    def export_excel(self, path):
+        """Writes every row to an .xlsx file with a write-only (streaming) workbook. Returns rows written."""
+        from openpyxl import Workbook
+
+        columns = self.columns()
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("results")
+        sheet.append(columns)
+        written = 0
+        for row in self.iter_rows():
+            sheet.append([row.get(column) for column in columns])
+            written += 1
+        workbook.save(path)
+        return written
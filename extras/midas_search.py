@@ -0,0 +1,299 @@
+# =====================================================
+# MIDAS ADAPTIVE SEARCH STRATEGIES
+# Alternatives to the exhaustive fine-tune grid:
+#   • random / lhs — random or Latin-hypercube sampling
+#   • halving      — successive halving on growing data windows
+#   • tpe          — Tree-structured Parzen Estimator style sampler
+# All strategies share an ask/tell interface, stop early once
+# the best full-data score plateaus, and are deterministic for a
+# given seed so a run can be resumed from the progress file.
+# =====================================================
+
+import math
+import os
+import random
+
+PARAM_KEYS = ["rsi_bullish", "rsi_bearish", "adx_min", "ema_fast", "ema_slow", "take_profit", "stop_mult"]
+
+# (half-width around the base value, step, lower bound) per parameter
+SEARCH_WIDTH = {
+    "rsi_bullish": (8, 1, 1),
+    "rsi_bearish": (8, 1, 1),
+    "adx_min": (8, 1, 1),
+    "ema_fast": (5, 1, 2),
+    "ema_slow": (30, 5, 5),
+    "take_profit": (0.8, 0.1, 0.1),
+    "stop_mult": (0.8, 0.1, 0.1),
+}
+
+SEARCH_BUDGET = int(os.getenv("SEARCH_BUDGET", 300))  # full-data evaluations (or equivalent)
+SEARCH_PATIENCE = int(os.getenv("SEARCH_PATIENCE", 60))  # evaluations without improvement before stopping
+SEARCH_SEED = int(os.getenv("SEARCH_SEED", 42))
+
+
+# =====================================================
+# SEARCH SPACE
+# =====================================================
+def build_search_space(base_config, widths=None):
+    """{param: (low, high, step)} centred on the base config."""
+    space = {}
+    for key, (width, step, floor) in (widths or SEARCH_WIDTH).items():
+        centre = float(base_config[key])
+        space[key] = (max(floor, centre - width), centre + width, step)
+    return space
+
+
+def snap(value, low, high, step):
+    """Clamps a value into [low, high] and rounds it onto the step grid."""
+    value = min(max(value, low), high)
+    snapped = low + round((value - low) / step) * step
+    return round(min(snapped, high), 6)
+
+
+def config_key(cfg, fraction=1.0):
+    """Hashable identity of a (config, data fraction) evaluation."""
+    return tuple(round(float(cfg[k]), 6) for k in PARAM_KEYS) + (round(float(fraction), 6),)
+
+
+class SearchStrategy:
+    """
+    Base ask/tell strategy.
+    ask() returns a list of (cfg, fraction) to evaluate ([] when finished);
+    tell() reports each result back. fraction = share of the candle history used.
+    """
+
+    name = "base"
+
+    def __init__(self, space, budget=SEARCH_BUDGET, patience=SEARCH_PATIENCE, min_delta=1e-6, seed=SEARCH_SEED):
+        self.space = space
+        self.budget = budget
+        self.patience = patience
+        self.min_delta = min_delta
+        self.rng = random.Random(seed)
+        self.spent = 0.0  # budget used, in full-data evaluation units
+        self.best_score = -math.inf
+        self.best_cfg = None
+        self._since_improvement = 0
+        self.history = []  # (cfg, fraction, score)
+
+    # -------------------------------------------------
+    def ask(self):
+        raise NotImplementedError
+
+    def tell(self, cfg, result, fraction=1.0):
+        score = float(result.get("score", -math.inf)) if result else -math.inf
+        if math.isnan(score):
+            score = -math.inf
+        self.spent += fraction
+        self.history.append((cfg, fraction, score))
+        if fraction >= 1.0:
+            if score > self.best_score + self.min_delta:
+                self.best_score = score
+                self.best_cfg = cfg
+                self._since_improvement = 0
+            else:
+                self._since_improvement += 1
+
+    @property
+    def exhausted(self):
+        return self.spent >= self.budget
+
+    @property
+    def plateaued(self):
+        return self.patience and self._since_improvement >= self.patience
+
+    @property
+    def done(self):
+        return self.exhausted or self.plateaued
+
+    # -------------------------------------------------
+    def sample_random(self):
+        cfg = {}
+        for key, (low, high, step) in self.space.items():
+            cfg[key] = snap(self.rng.uniform(low, high), low, high, step)
+        return cfg
+
+    def sample_lhs(self, n):
+        """Latin hypercube: every parameter range is split into n strata, each used once."""
+        columns = {}
+        for key, (low, high, step) in self.space.items():
+            strata = [(i + self.rng.random()) / n for i in range(n)]
+            self.rng.shuffle(strata)
+            columns[key] = [snap(low + u * (high - low), low, high, step) for u in strata]
+        return [{key: columns[key][i] for key in self.space} for i in range(n)]
+
+
+# =====================================================
+# RANDOM / LATIN HYPERCUBE
+# =====================================================
+class RandomSearch(SearchStrategy):
+    """Independent samples in batches; lhs=True spreads each batch as a Latin hypercube."""
+
+    def __init__(self, space, batch_size=32, lhs=False, **kwargs):
+        super().__init__(space, **kwargs)
+        self.batch_size = batch_size
+        self.lhs = lhs
+        self.name = "lhs" if lhs else "random"
+
+    def ask(self):
+        if self.done:
+            return []
+        n = int(min(self.batch_size, math.ceil(self.budget - self.spent)))
+        configs = self.sample_lhs(n) if self.lhs else [self.sample_random() for _ in range(n)]
+        return [(cfg, 1.0) for cfg in configs]
+
+
+# =====================================================
+# SUCCESSIVE HALVING
+# =====================================================
+class SuccessiveHalving(SearchStrategy):
+    """
+    Starts many configs on a small recent window of data, keeps the best 1/eta,
+    and grows the window by eta each rung until survivors run on the full history.
+    Brackets repeat (with fresh samples) until the budget or patience runs out.
+    """
+
+    name = "halving"
+
+    def __init__(self, space, eta=3, min_fraction=1 / 9, **kwargs):
+        super().__init__(space, **kwargs)
+        self.eta = eta
+        self.rungs = max(1, int(round(math.log(1 / min_fraction, eta))) + 1)
+        self.min_fraction = 1 / eta ** (self.rungs - 1)
+        self.n_initial = eta ** (self.rungs - 1) * eta
+        self._bracket = None
+        self._rung = 0
+        self._scores = {}
+
+    def _fraction(self):
+        return min(1.0, self.min_fraction * self.eta ** self._rung)
+
+    def ask(self):
+        if self.done:
+            return []
+        if self._bracket is None:
+            self._bracket = self.sample_lhs(self.n_initial)
+            self._rung = 0
+            self._scores = {}
+        else:
+            ranked = sorted(self._bracket, key=lambda c: self._scores.get(config_key(c), -math.inf), reverse=True)
+            if self._fraction() >= 1.0 or len(ranked) <= 1:
+                self._bracket = None  # bracket finished — start a new one next ask()
+                return self.ask()
+            self._bracket = ranked[:max(1, len(ranked) // self.eta)]
+            self._rung += 1
+            self._scores = {}
+        fraction = self._fraction()
+        return [(cfg, fraction) for cfg in self._bracket]
+
+    def tell(self, cfg, result, fraction=1.0):
+        super().tell(cfg, result, fraction)
+        self._scores[config_key(cfg)] = self.history[-1][2]
+
+
+# =====================================================
+# TPE-STYLE BAYESIAN SAMPLER
+# =====================================================
+class TPESearch(SearchStrategy):
+    """
+    After a random start-up phase, splits observations into a "good" top-gamma
+    set and the rest, and proposes the candidate maximizing l(x) / g(x)
+    (Parzen densities of good vs bad observations, per parameter).
+    """
+
+    name = "tpe"
+
+    def __init__(self, space, n_startup=24, gamma=0.2, n_candidates=48, batch_size=8, **kwargs):
+        super().__init__(space, **kwargs)
+        self.n_startup = n_startup
+        self.gamma = gamma
+        self.n_candidates = n_candidates
+        self.batch_size = batch_size
+
+    def _density(self, key, value, points):
+        low, high, step = self.space[key]
+        bandwidth = max(step, (high - low) / max(1.0, math.sqrt(len(points))))
+        total = sum(math.exp(-0.5 * ((value - p) / bandwidth) ** 2) for p in points)
+        prior = 1.0 / max(high - low, step)  # keeps every region reachable
+        return (total / bandwidth + prior) / (len(points) + 1)
+
+    def _propose(self, good, bad):
+        best, best_ratio = None, -math.inf
+        for _ in range(self.n_candidates):
+            anchor = self.rng.choice(good)
+            cfg, ratio = {}, 0.0
+            for key, (low, high, step) in self.space.items():
+                spread = max(step, (high - low) / max(1.0, math.sqrt(len(good))))
+                value = snap(self.rng.gauss(anchor[key], spread), low, high, step)
+                cfg[key] = value
+                l_x = self._density(key, value, [g[key] for g in good])
+                g_x = self._density(key, value, [b[key] for b in bad])
+                ratio += math.log(l_x) - math.log(g_x)
+            if ratio > best_ratio:
+                best, best_ratio = cfg, ratio
+        return best
+
+    def ask(self):
+        if self.done:
+            return []
+        observed = [(cfg, score) for cfg, fraction, score in self.history if fraction >= 1.0]
+        if len(observed) < self.n_startup:
+            return [(cfg, 1.0) for cfg in self.sample_lhs(self.n_startup - len(observed))]
+
+        observed.sort(key=lambda item: item[1], reverse=True)
+        n_good = max(1, int(math.ceil(self.gamma * len(observed))))
+        good = [cfg for cfg, _ in observed[:n_good]]
+        bad = [cfg for cfg, _ in observed[n_good:]] or good
+        return [(self._propose(good, bad), 1.0) for _ in range(self.batch_size)]
+
+
+STRATEGIES = {
+    "random": lambda space, **kw: RandomSearch(space, lhs=False, **kw),
+    "lhs": lambda space, **kw: RandomSearch(space, lhs=True, **kw),
+    "halving": SuccessiveHalving,
+    "tpe": TPESearch,
+}
+
+
+def get_strategy(name, space, **kwargs):
+    try:
+        return STRATEGIES[name.lower()](space, **kwargs)
+    except KeyError:
+        raise ValueError(f"❌ Unknown search strategy: {name} (choose from {', '.join(STRATEGIES)})")
+
+
+# =====================================================
+# DRIVER
+# =====================================================
+def run_search(strategy, evaluate, completed=None):
+    """
+    Drives a strategy to completion.
+    - evaluate(list of (cfg, fraction)) yields (cfg, fraction, result, error) as results finish
+    - completed: {config_key: result} from the progress file; those are replayed, not re-run
+    Yields (cfg, fraction, result) for every new evaluation so the caller can autosave.
+    """
+    completed = completed or {}
+    while True:
+        batch = strategy.ask()
+        if not batch:
+            break
+
+        todo = []
+        for cfg, fraction in batch:
+            cached = completed.get(config_key(cfg, fraction))
+            if cached is not None:
+                strategy.tell(cfg, cached, fraction)
+            else:
+                todo.append((cfg, fraction))
+
+        for cfg, fraction, result, error in evaluate(todo):
+            if error is not None:
+                print(f"⚠️ Error in config {cfg}: {error}")
+            strategy.tell(cfg, result, fraction)
+            if result is not None:
+                completed[config_key(cfg, fraction)] = result
+                yield cfg, fraction, result
+
+    reason = "score plateaued" if strategy.plateaued else "budget used"
+    print(f"🧭 {strategy.name} search finished ({reason}, {strategy.spent:.1f} evaluation units). "
+          f"Best score: {strategy.best_score:.4f}")
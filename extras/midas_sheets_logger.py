@@ -1,50 +1,246 @@
-import os
-import gspread
+import atexit
 import json
-from google.oauth2.service_account import Credentials
+import os
+import threading
+import time
 from datetime import datetime
 
 # =====================================================
 # GOOGLE SHEETS LOGGER FOR MIDAS BOT
+# Trades are queued in a local spool file and exported
+# with one append_rows call per batch, through a client
+# and worksheet handle authorized once per process.
+# Quota errors back off exponentially; unsent rows stay
+# in the spool and survive a restart.
 # =====================================================
 
-def log_trade_to_sheets(trade_data):
+SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive"
+]
+COLUMNS = ["time", "pair", "signal", "entry", "exit", "profit", "balance"]
+
+SHEET_NAME = os.getenv("GOOGLE_SHEET_NAME", "MIDAS_Trade_Log")
+SPOOL_FILE = os.getenv("SHEETS_SPOOL_FILE", os.path.join(os.path.dirname(__file__), "sheets_spool.jsonl"))
+BATCH_SIZE = int(os.getenv("SHEETS_BATCH_SIZE", 500))  # rows per append_rows call
+FLUSH_INTERVAL = float(os.getenv("SHEETS_FLUSH_INTERVAL", 10.0))  # seconds a queued row may wait
+RETRY_BACKOFF = float(os.getenv("SHEETS_RETRY_BACKOFF", 5.0))  # first delay after a failed export
+MAX_BACKOFF = float(os.getenv("SHEETS_MAX_BACKOFF", 300.0))
+
+
+def open_worksheet(sheet_name=SHEET_NAME):
     """
-    Logs trade details to Google Sheets.
-    Loads Google credentials from the Render environment variable
-    GOOGLE_APPLICATION_CREDENTIALS_JSON (not from a file).
+    Authorizes with the service account in GOOGLE_APPLICATION_CREDENTIALS_JSON
+    (an environment variable on Render, not a file) and opens the sheet's first tab.
     """
+    import gspread
+    from google.oauth2.service_account import Credentials
+
+    creds_json = os.getenv("GOOGLE_APPLICATION_CREDENTIALS_JSON")
+    if not creds_json:
+        raise ValueError("Missing GOOGLE_APPLICATION_CREDENTIALS_JSON in environment variables")
+
+    creds = Credentials.from_service_account_info(json.loads(creds_json), scopes=SCOPES)
+    client = gspread.authorize(creds)
+    return client.open(sheet_name).sheet1
 
-    try:
-        # Define Google Sheets API scope
-        SCOPES = [
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive"
-        ]
 
-        # Load credentials from environment (Render)
-        creds_json = os.getenv("GOOGLE_APPLICATION_CREDENTIALS_JSON")
-        if not creds_json:
-            raise ValueError("Missing GOOGLE_APPLICATION_CREDENTIALS_JSON in environment variables")
+def trade_row(trade_data):
+    """Sheet row for one trade, in COLUMNS order (a missing time is stamped now)."""
+    if "time" not in trade_data:
+        trade_data = dict(trade_data, time=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    return [trade_data.get(k, "") for k in COLUMNS]
 
-        creds_dict = json.loads(creds_json)
-        creds = Credentials.from_service_account_info(creds_dict, scopes=SCOPES)
-        client = gspread.authorize(creds)
 
-        # Open your Google Sheet (edit name to match your sheet)
-        sheet_name = os.getenv("GOOGLE_SHEET_NAME", "MIDAS_Trade_Log")
-        sheet = client.open(sheet_name).sheet1
+def is_quota_error(exc):
+    """True for Sheets API rate-limit errors (HTTP 429 / RESOURCE_EXHAUSTED)."""
+    response = getattr(exc, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    text = str(exc)
+    return "429" in text or "RESOURCE_EXHAUSTED" in text or "Quota exceeded" in text
 
-        # Add timestamp if not included
-        if "time" not in trade_data:
-            trade_data["time"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
-        # Convert dict values to a list (ensures order)
-        row = [trade_data.get(k, "") for k in ["time", "pair", "signal", "entry", "exit", "profit", "balance"]]
+# =====================================================
+# 🧪 FAKE WORKSHEET (tests / dry runs)
+# =====================================================
+class FakeWorksheet:
+    """In-memory stand-in for a gspread worksheet. `failures` are raised by the next append_rows calls."""
+
+    def __init__(self, failures=None):
+        self.rows = []
+        self.calls = 0
+        self.failures = list(failures or [])
+        self.value_input_option = None
+
+    def append_rows(self, values, value_input_option="RAW"):
+        self.calls += 1
+        self.value_input_option = value_input_option
+        if self.failures:
+            raise self.failures.pop(0)
+        self.rows.extend(list(row) for row in values)
+        return {"updates": {"updatedRows": len(values)}}
+
+
+# =====================================================
+# 📤 BATCHED EXPORTER
+# =====================================================
+class SheetsExporter:
+    """
+    Long-lived trade exporter. log() only appends to the spool; the timer thread
+    sends the queue in batches of up to BATCH_SIZE rows via append_rows.
+    - worksheet: an open worksheet (or FakeWorksheet); opened lazily with open_worksheet() if None
+    """
 
-        # Append to the sheet
-        sheet.append_row(row)
-        print(f"✅ Trade logged to Google Sheets: {trade_data}")
+    def __init__(self, worksheet=None, spool_path=SPOOL_FILE, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL,
+                 retry_backoff=RETRY_BACKOFF, max_backoff=MAX_BACKOFF, opener=open_worksheet, clock=time.monotonic):
+        self._worksheet = worksheet
+        self._owns_worksheet = worksheet is None  # reopened after an error only if we opened it
+        self.opener = opener
+        self.spool_path = spool_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._timer = None
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        self.exported = 0
+        self.failures = 0
+        self.queue = self._load_spool()
+        if self.queue:
+            print(f"📤 {len(self.queue)} unsent Sheets row(s) restored from the spool.")
 
+    # ==================================================
+    # 💾 SPOOL
+    # ==================================================
+    def _load_spool(self):
+        rows = []
+        if self.spool_path and os.path.exists(self.spool_path):
+            with open(self.spool_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rows.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        pass  # torn last line of a crashed write
+        return rows
+
+    def _rewrite_spool(self, rows):
+        tmp_path = f"{self.spool_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(row) + "\n" for row in rows)
+        os.replace(tmp_path, self.spool_path)
+
+    # ==================================================
+    # ✍️ QUEUE
+    # ==================================================
+    @property
+    def worksheet(self):
+        """The cached worksheet handle (authorized once, reopened only after an error)."""
+        if self._worksheet is None:
+            self._worksheet = self.opener()
+        return self._worksheet
+
+    def log(self, trade_data):
+        """Queues one trade for export. Returns its row."""
+        row = trade_row(trade_data)
+        with self._lock:
+            if self.spool_path:
+                with open(self.spool_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(row) + "\n")
+            self.queue.append(row)
+        # Never exports inline: the caller is the trading thread, the timer thread does the network I/O
+        self._schedule(max(self.flush_interval, self._retry_at - self.clock()))
+        return row
+
+    def _schedule(self, delay):
+        with self._lock:
+            if self._timer is not None or not self.queue:
+                return
+            self._timer = threading.Timer(delay, self._timed_flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _timed_flush(self):
+        with self._lock:
+            self._timer = None
+        self.flush()
+        self._schedule(max(self.flush_interval, self._retry_at - self.clock()))
+
+    # ==================================================
+    # 📤 EXPORT
+    # ==================================================
+    def flush(self):
+        """
+        Exports queued rows in batches of `batch_size`. Stops at the first error and backs
+        off (doubling up to max_backoff) before the next attempt. Returns rows exported.
+        """
+        exported = 0
+        with self._flush_lock:
+            while True:
+                if self.clock() < self._retry_at:
+                    break
+                with self._lock:
+                    batch = self.queue[:self.batch_size]
+                if not batch:
+                    break
+                try:
+                    self.worksheet.append_rows(batch, value_input_option="RAW")
+                except Exception as e:
+                    self.failures += 1
+                    self._backoff = min(self.max_backoff, self._backoff * 2 or self.retry_backoff)
+                    self._retry_at = self.clock() + self._backoff
+                    if is_quota_error(e):
+                        print(f"⏳ Sheets quota reached — retrying {len(self.queue)} row(s) in {self._backoff:.0f}s")
+                    else:
+                        if self._owns_worksheet:
+                            self._worksheet = None  # re-authorize on the next attempt
+                        print(f"⚠️ Could not log to Google Sheets: {e}")
+                    break
+
+                self._backoff = 0.0
+                with self._lock:
+                    del self.queue[:len(batch)]
+                    if self.spool_path:
+                        self._rewrite_spool(self.queue)
+                exported += len(batch)
+        self.exported += exported
+        return exported
+
+    def close(self):
+        """Cancels the timer and makes a last export attempt (unsent rows stay spooled)."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        self._retry_at = 0.0
+        return self.flush()
+
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+def get_exporter():
+    """Returns the process-wide Sheets exporter."""
+    global _exporter
+    with _exporter_lock:
+        if _exporter is None:
+            _exporter = SheetsExporter()
+            atexit.register(_exporter.close)
+    return _exporter
+
+
+def log_trade_to_sheets(trade_data):
+    """
+    Logs trade details to Google Sheets.
+    The row is queued locally and exported with the next batch.
+    """
+    try:
+        row = get_exporter().log(trade_data)
+        print(f"✅ Trade queued for Google Sheets: {dict(zip(COLUMNS, row))}")
     except Exception as e:
-        print(f"⚠️ Could not log to Google Sheets: {e}")
\ No newline at end of file
+        print(f"⚠️ Could not log to Google Sheets: {e}")
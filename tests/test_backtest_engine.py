@@ -0,0 +1,101 @@
+import numpy as np
+
+from extras.midas_backtest_engine import find_entries, resolve_exits, run_backtest_with_params
+
+CFG = {"rsi_bullish": 52, "rsi_bearish": 46, "adx_min": 14, "ema_fast": 8,
+       "ema_slow": 30, "take_profit": 1.8, "stop_mult": 1.1}
+
+
+def make_candles(n=3000, seed=7, step_ms=300_000):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    spread = np.abs(rng.normal(0, 0.003, n)) * close
+    return {
+        "timestamp": np.arange(n, dtype=np.int64) * step_ms,
+        "open": close,
+        "high": close + spread,
+        "low": close - spread,
+        "close": close,
+        "volume": np.ones(n),
+    }
+
+
+def naive_exit(c, entry, direction, atr_value, take_profit, stop_mult, max_hold):
+    price = c["close"][entry]
+    take = price + direction * price * take_profit / 100
+    stop = price - direction * atr_value * stop_mult
+    last = min(entry + max_hold, len(c["close"]) - 1)
+    for j in range(entry + 1, last + 1):
+        hi, lo = c["high"][j], c["low"][j]
+        sl = lo <= stop if direction == 1 else hi >= stop
+        tp = hi >= take if direction == 1 else lo <= take
+        if sl:
+            return j, direction * (stop - price) / price * 100
+        if tp:
+            return j, direction * (take - price) / price * 100
+    return last, direction * (c["close"][last] - price) / price * 100
+
+
+def test_vectorized_exits_match_bar_by_bar_reference():
+    c = make_candles()
+    rng = np.random.default_rng(1)
+    entries = np.sort(rng.choice(len(c["close"]) - 1, 200, replace=False))
+    direction = rng.choice([1, -1], len(entries))
+    atr_values = np.full(len(c["close"]), 0.5)
+
+    exit_idx, returns = resolve_exits(c, entries, direction, atr_values, 1.5, 1.2, max_hold=50)
+
+    for i, entry in enumerate(entries):
+        j, r = naive_exit(c, entry, direction[i], 0.5, 1.5, 1.2, 50)
+        assert exit_idx[i] == j
+        assert np.isclose(returns[i], r)
+
+
+def test_run_backtest_returns_optimizer_fields():
+    c5 = make_candles()
+    c15 = {k: v[::3] for k, v in c5.items()}
+
+    result = run_backtest_with_params(CFG, {"df5": c5, "df15": c15})
+
+    assert set(result) == {"win_rate", "profit", "trades", "score"}
+    assert result["trades"] > 0
+    assert 0 <= result["win_rate"] <= 100
+    assert np.isclose(result["score"], result["win_rate"] * result["profit"] / result["trades"], rtol=1e-3)
+
+
+
+def test_empty_candles_give_no_entries_and_no_trades():
+    empty = {k: v[:0] for k, v in make_candles(n=10).items()}
+    entries, direction = find_entries(empty, {k: np.zeros(0) for k in ("ema_fast", "ema_slow", "rsi", "adx")}, CFG)
+    assert len(entries) == 0 and len(direction) == 0
+
+    result = run_backtest_with_params(CFG, {"df5": empty, "df15": None})
+    assert result["trades"] == 0
+
+def test_indicator_cache_reuses_series_across_configs():
+    from extras.midas_indicator_cache import IndicatorCache
+
+    c5 = make_candles()
+    data = {"df5": c5, "df15": {k: v[::3] for k, v in c5.items()}, "pair": "BTCUSDT"}
+    cache = IndicatorCache(max_entries=64)
+    configs = [dict(CFG, rsi_bullish=r, adx_min=a) for r in (50, 52, 54) for a in (12, 14, 16)]
+
+    cached = [run_backtest_with_params(cfg, data, cache=cache) for cfg in configs]
+    fresh = [run_backtest_with_params(cfg, data, cache=IndicatorCache()) for cfg in configs]
+
+    assert cached == fresh
+    # 5 series on 5m + 2 EMAs on 15m, computed once for all 9 configs
+    assert cache.stats()["misses"] == 7
+    assert cache.stats()["hits"] == 7 * 8
+
+
+def test_indicator_cache_evicts_least_recently_used():
+    from extras.midas_indicator_cache import IndicatorCache
+
+    c = make_candles(200)
+    cache = IndicatorCache(max_entries=2)
+    for period in (5, 6, 7):
+        cache.get("X", "5m", "ema", period, c, lambda: np.zeros(3))
+    cache.get("X", "5m", "ema", 5, c, lambda: np.ones(3))
+
+    assert cache.stats() == {"entries": 2, "hits": 0, "misses": 4}
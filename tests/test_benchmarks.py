@@ -0,0 +1,18 @@
+import json
+
+from benchmarks.run_benchmarks import main
+
+
+def test_quick_benchmark_run_writes_comparable_json(tmp_path, capsys):
+    output = tmp_path / "bench.json"
+    report = main(["--quick", "--pairs", "3", "--output", str(output)])
+
+    saved = json.loads(output.read_text(encoding="utf-8"))
+    assert saved["results"].keys() == report["results"].keys()
+    for name in ("log_trade_history_1000", "log_trade_history_100000", "update_capital", "paper_market_order",
+                 "live_cycle_3_pairs"):
+        assert saved["results"][name]["mean_us"] > 0
+    assert saved["results"]["optimizer_config"]["warm"]["samples"] >= 3
+
+    main(["--quick", "--pairs", "3", "--output", str(tmp_path / "next.json"), "--compare", str(output)])
+    assert "Change vs baseline" in capsys.readouterr().out
@@ -0,0 +1,59 @@
+import numpy as np
+
+from extras.midas_backtest_engine import load_candles, load_csv
+from extras.midas_candle_store import CandleStore
+
+
+def write_csv(path, rows):
+    lines = ["Time,Open,High,Low,Close,Volume"]
+    lines += [f"{ts},{o},{o + 1},{o - 1},{o + 0.5},10" for ts, o in rows]
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_csv_import_and_zero_copy_range(tmp_path):
+    csv = tmp_path / "BTCUSDT_5m.csv"
+    write_csv(csv, [(i * 300_000, 100.0 + i) for i in range(1000)])
+    store = CandleStore(str(tmp_path / "store"))
+
+    meta = store.import_csv("BTCUSDT", "5m", str(csv), chunk_rows=128)
+    assert meta["rows"] == 1000 and meta["last_timestamp"] == 999 * 300_000
+
+    window = store.load("BTCUSDT", "5m", start=100 * 300_000, end=200 * 300_000)
+    assert len(window["close"]) == 100
+    assert window["timestamp"].dtype == np.int64 and window["close"].dtype == np.float64
+    assert window["close"][0] == 200.5
+    assert isinstance(window["close"].base, np.memmap) or isinstance(window["close"], np.memmap)
+
+
+def test_unsorted_rows_are_sorted_on_import(tmp_path):
+    csv = tmp_path / "XRPUSDT_15m.csv"
+    write_csv(csv, [(3, 3.0), (1, 1.0), (2, 2.0)])
+    store = CandleStore(str(tmp_path / "store"))
+    store.import_csv("XRP/USDT", "15m", str(csv))
+
+    assert list(store.load("XRP/USDT", "15m")["timestamp"]) == [1, 2, 3]
+
+
+def test_load_candles_imports_once_and_matches_csv(tmp_path):
+    write_csv(tmp_path / "SOLUSDT_5m.csv", [(i, float(i)) for i in range(50)])
+    store = CandleStore(str(tmp_path / "store"))
+
+    candles = load_candles("SOLUSDT", "5m", store=store, data_dir=str(tmp_path))
+    df = load_csv("SOLUSDT", "5m", data_dir=str(tmp_path))
+
+    assert store.has("SOLUSDT", "5m")
+    for column in df.columns:
+        assert np.array_equal(candles[column], df[column].to_numpy())
+
+
+def test_load_candles_reimports_a_refreshed_csv(tmp_path):
+    csv = tmp_path / "ETHUSDT_5m.csv"
+    write_csv(csv, [(i, float(i)) for i in range(10)])
+    store = CandleStore(str(tmp_path / "store"))
+    assert len(load_candles("ETHUSDT", "5m", store=store, data_dir=str(tmp_path))["close"]) == 10
+    assert store.is_current("ETHUSDT", "5m", str(csv))
+
+    write_csv(csv, [(i, float(i)) for i in range(25)])
+    assert not store.is_current("ETHUSDT", "5m", str(csv))
+    assert len(load_candles("ETHUSDT", "5m", store=store, data_dir=str(tmp_path))["close"]) == 25
+    assert store.meta("ETHUSDT", "5m")["rows"] == 25
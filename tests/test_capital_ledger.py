@@ -0,0 +1,77 @@
+import json
+import threading
+
+from core import midas_capital_tracker
+from core.midas_capital_tracker import CapitalLedger
+
+
+def test_legacy_file_is_loaded_and_upgraded(tmp_path):
+    path = tmp_path / "capital_tracker.json"
+    path.write_text(json.dumps({"capital": 102.0}))
+
+    ledger = CapitalLedger(path=str(path), flush_interval=0)
+    assert ledger.snapshot()["current_balance"] == 102.0
+
+    ledger.record(2.0, is_win=True)
+    saved = json.loads(path.read_text())
+    assert saved["capital"] == 104.0
+    assert saved["win_trades"] == 1 and saved["total_trades"] == 1
+
+
+def test_updates_stay_in_memory_until_flush(tmp_path):
+    path = tmp_path / "capital_tracker.json"
+    ledger = CapitalLedger(path=str(path), flush_interval=60)
+    before = path.read_text()
+
+    ledger.apply_result("WIN", 0.02)
+    ledger.apply_result("LOSS", 0.01)
+    ledger.record(1.0, is_win=False)
+    assert path.read_text() == before
+
+    ledger.close()
+    saved = json.loads(path.read_text())
+    assert saved["total_trades"] == 3
+    assert saved["win_trades"] == 1 and saved["loss_trades"] == 2
+    assert round(saved["current_balance"], 6) == round(100.0 * 1.02 * 0.99 - 1.0, 6)
+    assert not (tmp_path / "capital_tracker.json.tmp").exists()
+
+
+def test_corrupted_file_is_backed_up_before_reset(tmp_path):
+    path = tmp_path / "capital_tracker.json"
+    path.write_text("{not json")
+
+    ledger = CapitalLedger(path=str(path), flush_interval=60)
+    assert ledger.snapshot()["current_balance"] == 100.0
+    assert json.loads(path.read_text())["capital"] == 100.0
+    [backup] = tmp_path.glob("capital_tracker.json.corrupt-*")
+    assert backup.read_text() == "{not json"
+
+
+def test_zero_profit_is_breakeven(tmp_path):
+    ledger = CapitalLedger(path=str(tmp_path / "capital_tracker.json"), flush_interval=60)
+    ledger.record_profit(1.5)
+    ledger.record_profit(-0.5)
+    ledger.record_profit(0.0)
+
+    snap = ledger.snapshot()
+    assert snap["total_trades"] == 3
+    assert snap["win_trades"] == 1 and snap["loss_trades"] == 1
+    assert snap["current_balance"] == 101.0
+
+
+
+def test_flush_runs_without_holding_the_ledger_lock(tmp_path, monkeypatch):
+    # flush() takes _flush_lock then _lock; a write made while _lock is held could deadlock with it
+    ledger = CapitalLedger(path=str(tmp_path / "capital_tracker.json"), flush_interval=0)
+    reads = []
+
+    def write_json(path, data):
+        reader = threading.Thread(target=lambda: reads.append(ledger.snapshot()), daemon=True)
+        reader.start()
+        reader.join(2)
+
+    monkeypatch.setattr(midas_capital_tracker.midas_durable, "write_json", write_json)
+    ledger.record(1.0, is_win=True)
+    ledger.record_profit(0.0)
+    ledger.apply_result("WIN", 0.01)
+    assert len(reads) == 3
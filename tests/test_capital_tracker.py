@@ -1,20 +1,43 @@
-from core.midas_capital_tracker import load_capital, update_capital
-
-print("💰 Loading capital data...")
-capital = load_capital()
-print(f"Starting balance: ${capital['current_balance']:.2f}")
-
-# ✅ Simulate a winning trade (+2%)
-profit_win = capital['current_balance'] * 0.02
-capital = update_capital(profit_win, is_win=True)
-
-# ✅ Simulate a losing trade (-1%)
-loss_trade = -capital['current_balance'] * 0.01
-capital = update_capital(loss_trade, is_win=False)
-
-print("\n📊 Final Capital Summary:")
-print(f"Current Balance: ${capital['current_balance']:.2f}")
-print(f"Total Trades: {capital['total_trades']}")
-print(f"Wins: {capital['win_trades']} | Losses: {capital['loss_trades']}")
-print(f"Total Profit: ${capital['total_profit']:.2f}")
-print(f"Total Loss: ${capital['total_loss']:.2f}")
\ No newline at end of file
+import pytest
+
+from core import midas_capital_tracker, midas_durable, midas_trade_journal
+from core.midas_capital_tracker import CapitalLedger, load_capital, update_capital
+from core.midas_trade_journal import TradeJournal
+
+
+@pytest.fixture(autouse=True)
+def isolated_capital(tmp_path, monkeypatch):
+    """Keeps the ledger and journal in tmp_path so the suite never touches core/."""
+    ledger = CapitalLedger(str(tmp_path / "capital_tracker.json"), flush_interval=0)
+    journal = TradeJournal(str(tmp_path / "trade_log.jsonl"), legacy_path=None)
+    monkeypatch.setattr(midas_capital_tracker, "_ledger", ledger)
+    monkeypatch.setattr(midas_trade_journal, "_journal", journal)
+    yield
+    ledger.close()
+    journal.close()
+    midas_durable.close_store(str(tmp_path))
+
+
+def test_win_then_loss_updates_capital():
+    print("💰 Loading capital data...")
+    capital = load_capital()
+    print(f"Starting balance: ${capital['current_balance']:.2f}")
+
+    # ✅ Simulate a winning trade (+2%)
+    profit_win = capital['current_balance'] * 0.02
+    capital = update_capital(profit_win, is_win=True)
+
+    # ✅ Simulate a losing trade (-1%)
+    loss_trade = -capital['current_balance'] * 0.01
+    capital = update_capital(loss_trade, is_win=False)
+
+    print("\n📊 Final Capital Summary:")
+    print(f"Current Balance: ${capital['current_balance']:.2f}")
+    print(f"Total Trades: {capital['total_trades']}")
+    print(f"Wins: {capital['win_trades']} | Losses: {capital['loss_trades']}")
+    print(f"Total Profit: ${capital['total_profit']:.2f}")
+    print(f"Total Loss: ${capital['total_loss']:.2f}")
+
+    assert capital["total_trades"] == 2
+    assert capital["win_trades"] == 1 and capital["loss_trades"] == 1
+    assert capital["current_balance"] == pytest.approx(100.0 * 1.02 * 0.99)
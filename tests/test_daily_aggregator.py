@@ -0,0 +1,65 @@
+import threading
+
+import pytest
+
+from core import midas_daily_summary
+from core.midas_daily_summary import ALL_PAIRS, DailyAggregator
+
+
+def test_running_totals_per_day_and_pair(tmp_path):
+    agg = DailyAggregator(path=str(tmp_path / "agg.json"), flush_interval=0)
+    for pair, profit in [("BTC/USDT", 5.0), ("XRP/USDT", -2.0), ("BTC/USDT", -4.0), ("BTC/USDT", 3.0)]:
+        agg.record(pair, profit, day="2025-01-01")
+    agg.record("BTC/USDT", 1.0, day="2025-01-02")
+
+    summary = agg.summary("2025-01-01")
+    assert summary["trades"] == 4 and summary["wins"] == 2 and summary["losses"] == 2
+    assert summary["pnl"] == pytest.approx(2.0)
+    assert summary["max_drawdown"] == pytest.approx(6.0)  # peak 5 → low -1
+    assert summary["win_rate"] == 50.0
+    assert summary["pairs"]["BTC/USDT"]["count"] == 3
+    assert summary["pairs"]["BTC/USDT"]["max_drawdown"] == pytest.approx(4.0)
+    assert agg.summary("2025-01-02")["trades"] == 1
+    assert agg.summary("2024-12-31")["trades"] == 0
+
+
+def test_checkpoint_restores_state(tmp_path):
+    path = str(tmp_path / "agg.json")
+    agg = DailyAggregator(path=path, flush_interval=60)
+    agg.record("SOL/USDT", -1.5, day="2025-01-01")
+    agg.close()
+
+    restored = DailyAggregator(path=path)
+    assert restored.summary("2025-01-01") == agg.summary("2025-01-01")
+
+
+def test_old_days_are_pruned(tmp_path):
+    agg = DailyAggregator(path=None, retention_days=2)
+    for day in ("2025-01-01", "2025-01-02", "2025-01-03", "2025-01-04"):
+        agg.record("BTC/USDT", 1.0, day=day)
+    assert sorted(agg.days) == ["2025-01-02", "2025-01-03", "2025-01-04"]
+
+
+def test_concurrent_flushes_never_write_an_older_snapshot_last(tmp_path, monkeypatch):
+    agg = DailyAggregator(path=str(tmp_path / "agg.json"), flush_interval=60)
+    written, entered, release = [], threading.Event(), threading.Event()
+
+    def write_json(path, data):
+        if not entered.is_set():
+            entered.set()
+            release.wait(2)  # the first (older) snapshot is still being written...
+        written.append(data["2025-01-01"][ALL_PAIRS]["count"])
+
+    monkeypatch.setattr(midas_daily_summary.midas_durable, "write_json", write_json)
+    agg.record("BTC/USDT", 1.0, day="2025-01-01")
+    first = threading.Thread(target=agg.flush)
+    first.start()
+    entered.wait(2)
+    agg.record("BTC/USDT", 1.0, day="2025-01-01")
+    second = threading.Thread(target=agg.close)  # ...when a newer one is flushed
+    second.start()
+    second.join(0.2)
+    release.set()
+    first.join(2)
+    second.join(2)
+    assert written == [1, 2]
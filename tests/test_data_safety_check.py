@@ -0,0 +1,78 @@
+import json
+import os
+
+from core import data_safety_check
+from core.data_safety_check import run_data_safety_check
+
+
+def make_files(tmp_path, trades=1000):
+    files = {
+        "trade_log": str(tmp_path / "trade_log.jsonl"),
+        "capital_tracker": str(tmp_path / "capital_tracker.json"),
+        "daily_summary": str(tmp_path / "daily_summary.json"),
+    }
+    with open(files["trade_log"], "w", encoding="utf-8") as f:
+        f.writelines(json.dumps({"pair": "XRP/USDT", "i": i}) + "\n" for i in range(trades))
+    with open(files["capital_tracker"], "w", encoding="utf-8") as f:
+        json.dump({"capital": 120.5, "current_balance": 120.5}, f)
+    with open(files["daily_summary"], "w", encoding="utf-8") as f:
+        json.dump([{"date": "2025-01-01", "trades": 3}], f)
+    return files
+
+
+def check(tmp_path, files, **kwargs):
+    return run_data_safety_check(files, manifest_path=str(tmp_path / "manifest.json"),
+                                 legacy_path=str(tmp_path / "trade_log.json"), **kwargs)
+
+
+def test_healthy_files_are_never_rewritten_and_unchanged_files_not_read(tmp_path, monkeypatch):
+    files = make_files(tmp_path)
+    before = {name: os.stat(path).st_mtime_ns for name, path in files.items()}
+    check(tmp_path, files)
+    assert {name: os.stat(path).st_mtime_ns for name, path in files.items()} == before
+
+    scanned, ensured = [], []
+    monkeypatch.setattr(data_safety_check, "validate_lines", lambda *args: scanned.append(args) or 0)
+    monkeypatch.setattr(data_safety_check, "ensure_capital_tracker", ensured.append)
+    monkeypatch.setattr(data_safety_check, "ensure_json_list", ensured.append)
+    manifest_mtime = os.stat(tmp_path / "manifest.json").st_mtime_ns
+    check(tmp_path, files)
+    assert scanned == [] and ensured == []
+    assert os.stat(tmp_path / "manifest.json").st_mtime_ns == manifest_mtime
+
+
+def test_appended_journal_is_validated_from_the_previous_end(tmp_path, monkeypatch):
+    files = make_files(tmp_path)
+    check(tmp_path, files)
+    checked_size = os.path.getsize(files["trade_log"])
+    with open(files["trade_log"], "a", encoding="utf-8") as f:
+        f.write(json.dumps({"pair": "BTC/USDT"}) + "\n")
+        f.write("not json\n")
+        f.write('{"pair": "SOL/US')  # torn final write
+
+    scanned = []
+    original = data_safety_check.validate_lines
+    monkeypatch.setattr(data_safety_check, "validate_lines",
+                        lambda path, start, end: scanned.append((start, end)) or original(path, start, end))
+    check(tmp_path, files)
+
+    size = os.path.getsize(files["trade_log"])
+    assert scanned == [(checked_size, size)]
+    with open(files["trade_log"], "rb") as f:
+        assert f.read().endswith(b'"BTC/USDT"}\nnot json\n')  # torn tail dropped, nothing else rewritten
+
+
+def test_changed_or_rewritten_files_get_a_full_check(tmp_path):
+    files = make_files(tmp_path)
+    check(tmp_path, files)
+    with open(files["capital_tracker"], "w", encoding="utf-8") as f:
+        f.write("{broken")
+    with open(files["daily_summary"], "w", encoding="utf-8") as f:
+        json.dump({"date": "2025-01-02"}, f)
+    with open(files["trade_log"], "w", encoding="utf-8") as f:  # prefix rewritten, not appended
+        f.writelines(json.dumps({"pair": "ETH/USDT", "i": i}) + "\n" for i in range(2000))
+
+    manifest = check(tmp_path, files)
+    assert json.loads(open(files["capital_tracker"]).read()) == {"capital": 100.0}
+    assert json.loads(open(files["daily_summary"]).read()) == [{"date": "2025-01-02"}]
+    assert manifest[files["trade_log"]]["size"] == os.path.getsize(files["trade_log"])
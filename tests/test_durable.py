@@ -0,0 +1,133 @@
+import json
+import os
+
+from core import midas_durable
+from core.data_safety_check import run_data_safety_check
+from core.midas_durable import DurableStore, read_wal, recover_directory, wal_path
+
+
+def crash(store):
+    """Simulates a crash: the WAL is left behind under a dead process's name."""
+    store._wal.close()
+    os.replace(store.path, wal_path(store.directory, pid=999999999))
+
+
+def test_cycle_groups_every_write_into_one_fsync(tmp_path, monkeypatch):
+    fsyncs = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(os, "fsync", lambda fd: fsyncs.append(fd) or real_fsync(fd))
+    monkeypatch.setattr(midas_durable, "_stores", {})
+    try:
+        with midas_durable.cycle():
+            midas_durable.write_json(str(tmp_path / "capital.json"), {"capital": 101.0})
+            midas_durable.write_json(str(tmp_path / "positions.json"), [{"pair": "XRP/USDT"}])
+            for i in range(3):
+                midas_durable.append_text(str(tmp_path / "trade_log.jsonl"), json.dumps({"i": i}) + "\n")
+            assert not (tmp_path / "capital.json").exists()  # nothing applied before the commit
+
+        assert len(fsyncs) == 1
+        assert json.loads((tmp_path / "capital.json").read_text()) == {"capital": 101.0}
+        assert (tmp_path / "trade_log.jsonl").read_text().count("\n") == 3
+    finally:
+        midas_durable.close_store(str(tmp_path))
+    assert not list(tmp_path.glob("*.wal"))
+
+
+def test_torn_wal_record_is_ignored_and_complete_ones_replayed(tmp_path):
+    store = DurableStore(str(tmp_path))
+    store.put(str(tmp_path / "capital.json"), {"capital": 120.0})
+    store.append(str(tmp_path / "trade_log.jsonl"), '{"pair": "XRP/USDT"}\n')
+    store.commit()
+    store.put(str(tmp_path / "capital.json"), {"capital": 90.0})
+    store.commit()
+    crash(store)
+
+    # The second record is torn; the first was applied, then the files were lost
+    path = wal_path(str(tmp_path), pid=999999999)
+    data = open(path, "rb").read()
+    open(path, "wb").write(data[:-10])
+    (tmp_path / "capital.json").write_text('{"capi')
+    with open(tmp_path / "trade_log.jsonl", "w") as f:
+        f.write('{"pair": "XR')
+
+    assert len(read_wal(path)) == 1
+    assert recover_directory(str(tmp_path)) == 1
+    assert json.loads((tmp_path / "capital.json").read_text()) == {"capital": 120.0}
+    assert (tmp_path / "trade_log.jsonl").read_text() == '{"pair": "XRP/USDT"}\n'
+    assert not os.path.exists(path)
+    assert recover_directory(str(tmp_path)) == 0  # replay is idempotent and the WAL is gone
+
+
+def test_wal_left_under_a_reused_pid_is_replayed(tmp_path):
+    store = DurableStore(str(tmp_path))
+    store.put(str(tmp_path / "capital.json"), {"capital": 130.0})
+    store.commit()
+    store._wal.close()  # crash; the restarted process gets the same PID (PID 1 in a container)
+    (tmp_path / "capital.json").write_text('{"capi')
+
+    restarted = DurableStore(str(tmp_path))
+    assert restarted.path == store.path
+    assert json.loads((tmp_path / "capital.json").read_text()) == {"capital": 130.0}
+    restarted.close()
+    assert not list(tmp_path.glob("*.wal"))
+
+
+class FakeMsvcrt:
+    """Windows byte-range locks for the test: one holder handle per file, released when it is closed."""
+    LK_NBLCK = 2
+
+    def __init__(self):
+        self.holders = {}
+
+    def locking(self, fd, mode, nbytes):
+        key = os.fstat(fd).st_ino
+        holder = self.holders.get(key)
+        if holder is not None and holder != fd:
+            try:
+                alive = os.fstat(holder).st_ino == key
+            except OSError:
+                alive = False
+            if alive:
+                raise OSError("locked")
+        self.holders[key] = fd
+
+
+def test_without_fcntl_a_live_store_wal_is_not_replayed(tmp_path, monkeypatch):
+    monkeypatch.setattr(midas_durable, "fcntl", None)
+    monkeypatch.setattr(midas_durable, "msvcrt", FakeMsvcrt())
+    live = DurableStore(str(tmp_path))
+    live.put(str(tmp_path / "capital.json"), {"capital": 140.0})
+    live.commit()
+    (tmp_path / "capital.json").write_text('{"capital": 150.0}')  # newer state the WAL must not overwrite
+
+    assert recover_directory(str(tmp_path)) == 0
+    assert os.path.exists(live.path)
+    assert json.loads((tmp_path / "capital.json").read_text()) == {"capital": 150.0}
+
+    live._wal.close()  # crash
+    assert recover_directory(str(tmp_path)) == 1
+    assert not os.path.exists(live.path)
+
+
+def test_safety_check_restores_from_wal_and_backs_up_corruption(tmp_path):
+    files = {
+        "trade_log": str(tmp_path / "trade_log.jsonl"),
+        "capital_tracker": str(tmp_path / "capital_tracker.json"),
+        "daily_summary": str(tmp_path / "daily_summary.json"),
+    }
+    store = DurableStore(str(tmp_path))
+    store.put(files["capital_tracker"], {"capital": 250.0, "current_balance": 250.0})
+    store.commit()
+    crash(store)
+    with open(files["capital_tracker"], "w") as f:
+        f.write('{"capital": 2')  # crash mid-write
+    with open(files["daily_summary"], "w") as f:
+        f.write("[{broken")
+
+    run_data_safety_check(files, manifest_path=str(tmp_path / "manifest.json"),
+                          legacy_path=str(tmp_path / "trade_log.json"))
+
+    assert json.loads(open(files["capital_tracker"]).read())["capital"] == 250.0
+    assert json.loads(open(files["daily_summary"]).read()) == []
+    backups = list(tmp_path.glob("daily_summary.json.corrupt-*"))
+    assert len(backups) == 1 and backups[0].read_text() == "[{broken"
@@ -0,0 +1,52 @@
+import json
+import time
+
+from core.midas_fake_exchange import FakeExchange
+from core.midas_feed import PollingFeed, ReplayFeed, get_feed
+
+
+def write_replay(path, records):
+    path.write_text("".join(json.dumps(r) + "\n" for r in records))
+    return str(path)
+
+
+def test_replay_feed_pushes_events_in_order(tmp_path):
+    path = write_replay(tmp_path / "ticks.jsonl", [
+        {"timestamp": 1000, "pair": "XRP/USDT", "price": 0.50},
+        {"timestamp": 1001, "pair": "BTC/USDT", "price": 92000.0, "kind": "trade"},
+        {"timestamp": 1002, "pair": "XRP/USDT", "price": 0.51},
+    ])
+
+    feed = get_feed("replay", pairs=["XRP/USDT", "BTC/USDT"], path=path).start()
+    events = list(feed.events(timeout=0.1))
+
+    assert [(e.pair, e.price) for e in events] == [("XRP/USDT", 0.50), ("BTC/USDT", 92000.0), ("XRP/USDT", 0.51)]
+    assert events[1].kind == "trade"
+
+
+def test_replay_feed_filters_pairs_and_keeps_pacing(tmp_path):
+    path = write_replay(tmp_path / "ticks.jsonl", [
+        {"timestamp": 0, "pair": "XRP/USDT", "price": 0.50},
+        {"timestamp": 0, "pair": "SOL/USDT", "price": 130.0},
+        {"timestamp": 200, "pair": "XRP/USDT", "price": 0.51},
+    ])
+
+    start = time.monotonic()
+    feed = ReplayFeed(path, pairs=["XRP/USDT"], speed=1.0).start()
+    events = list(feed.events(timeout=0.05))
+
+    assert [e.price for e in events] == [0.50, 0.51]
+    assert time.monotonic() - start >= 0.2
+
+
+def test_polling_feed_publishes_only_changed_prices():
+    exchange = FakeExchange()
+    feed = PollingFeed(exchange, ["XRP/USDT", "BTC/USDT"])
+
+    feed.poll_once()
+    exchange.prices["XRP/USDT"] = 0.56
+    feed.poll_once()
+
+    events = [feed.get(timeout=0) for _ in range(3)]
+    assert [(e.pair, e.price) for e in events] == [("XRP/USDT", 0.55), ("BTC/USDT", 92500.0), ("XRP/USDT", 0.56)]
+    assert feed.get(timeout=0) is None
@@ -0,0 +1,36 @@
+import subprocess
+import sys
+
+from benchmarks.run_benchmarks import isolated_state, quiet, telegram_stub
+from core import midas_live_trading
+from core.midas_fake_exchange import FakeExchange
+from core.midas_feed import PollingFeed
+
+
+def test_import_has_no_side_effects():
+    code = ("import sys, core.midas_live_trading as m; "
+            "assert 'ccxt' not in sys.modules; assert callable(m.main)")
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert "Data Safety Check" not in result.stdout
+    assert "Bot started" not in result.stdout
+
+
+def test_startup_and_loop_run_offline(monkeypatch):
+    checks = []
+    monkeypatch.setattr(midas_live_trading, "run_data_safety_check", lambda: checks.append(True))
+    exchange = FakeExchange(seed=1)
+    pairs = list(exchange.prices)
+
+    with telegram_stub() as server, isolated_state(f"http://127.0.0.1:{server.server_port}"), quiet():
+        session, used = midas_live_trading.start_session(exchange=exchange, pairs=pairs)
+        feed = PollingFeed(exchange, pairs, publish_unchanged=True)
+        scheduler = midas_live_trading.build_scheduler(session, feed, {pair: 0.01 for pair in pairs})
+        handled = []
+        original = session.process_event
+        monkeypatch.setattr(session, "process_event", lambda event: handled.append(event) or original(event))
+        midas_live_trading.run_trading_loop(session, feed, scheduler, stop=lambda: len(handled) >= 6)
+
+    assert checks == [True] and used is exchange
+    assert {f"poll:{pair}" for pair in pairs} <= set(scheduler.stats())
+    assert {event.pair for event in handled} == set(pairs)
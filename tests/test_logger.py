@@ -1,21 +1,16 @@
+from datetime import datetime
+
+from core import midas_trade_journal
 from core.midas_logger import log_trade
-import json, os
+from core.midas_trade_journal import TradeJournal, get_journal
 
-log_trade("XRP/USDT", "buy", 0.5471, 25, result="open")
 
-log_path = os.path.join("data", "trade_log.json")
+def test_log_trade_appends_to_the_journal(tmp_path, monkeypatch):
+    monkeypatch.setattr(midas_trade_journal, "_journal",
+                        TradeJournal(str(tmp_path / "trade_log.jsonl"), legacy_path=str(tmp_path / "trade_log.json")))
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    entry = log_trade(timestamp, "XRP/USDT", "buy", 0.5471, 25, result="open")
 
-if os.path.exists(log_path):
-    with open(log_path, "r") as f:
-        content = f.read().strip()
-        if not content:
-            print("⚠️ trade_log.json is empty.")
-        else:
-            try:
-                data = json.loads(content)
-                print("✅ Trade successfully logged! Latest entry:")
-                print(data[-1])
-            except json.JSONDecodeError:
-                print("⚠️ trade_log.json is malformed. Check formatting.")
-else:
-    print("❌ trade_log.json not found.")
\ No newline at end of file
+    assert get_journal().tail(1) == [entry]
+    assert entry == {"timestamp": timestamp, "pair": "XRP/USDT", "side": "buy", "price": 0.5471,
+                     "size": 25.0, "result": "open"}
@@ -0,0 +1,68 @@
+import time
+
+from core import midas_market_data
+from core.midas_fake_exchange import FakeExchange
+from core.midas_market_data import fetch_prices
+
+PAIRS = ["XRP/USDT", "BTC/USDT", "SOL/USDT"]
+
+
+def test_batched_fetch_uses_single_request():
+    exchange = FakeExchange()
+    prices = fetch_prices(exchange, PAIRS)
+
+    assert prices == {pair: exchange.prices[pair] for pair in PAIRS}
+    assert exchange.calls == {"fetch_ticker": 0, "fetch_tickers": 1, "create_order": 0, "load_markets": 0}
+
+
+def test_concurrent_fetch_overlaps_round_trips():
+    prices = {f"C{i}/USDT": float(i + 1) for i in range(20)}
+    exchange = FakeExchange(prices=prices, latency=0.05, supports_batch=False)
+
+    start = time.monotonic()
+    result = fetch_prices(exchange, list(prices), max_workers=10)
+    elapsed = time.monotonic() - start
+
+    assert result == prices
+    assert exchange.calls["fetch_ticker"] == 20
+    assert elapsed < 20 * 0.05 / 2
+
+
+def test_slow_and_failing_pairs_do_not_stall_others():
+    exchange = FakeExchange(slow_pairs=["BTC/USDT"], slow_latency=2.0,
+                            fail_pairs=["SOL/USDT"], supports_batch=False)
+
+    start = time.monotonic()
+    result = fetch_prices(exchange, PAIRS, max_workers=3, timeout=0.2)
+
+    assert time.monotonic() - start < 1.0
+    assert result == {"XRP/USDT": exchange.prices["XRP/USDT"], "BTC/USDT": None, "SOL/USDT": None}
+
+
+def test_hung_requests_do_not_starve_later_cycles(monkeypatch):
+    monkeypatch.setattr(midas_market_data, "_executor", None)  # a fresh 3-thread pool
+    monkeypatch.setattr(midas_market_data, "_executor_workers", 0)
+    exchange = FakeExchange(slow_pairs=["BTC/USDT", "SOL/USDT"], slow_latency=1.0, supports_batch=False)
+    exchange.timeout = 10000  # ccxt's default HTTP timeout (ms)
+
+    for _ in range(3):
+        result = fetch_prices(exchange, ["BTC/USDT", "SOL/USDT", "XRP/USDT"], max_workers=3, timeout=0.1)
+        assert result["XRP/USDT"] == exchange.prices["XRP/USDT"]
+    assert exchange.timeout == 10000
+
+
+def test_fetch_timeout_is_capped_on_a_copy_not_the_shared_exchange():
+    seen = []
+
+    class TimedExchange(FakeExchange):
+        timeout = 10_000  # ccxt default, in ms
+
+        def fetch_tickers(self, symbols=None):
+            seen.append((self.timeout, shared.timeout))
+            return super().fetch_tickers(symbols)
+
+    shared = TimedExchange()
+    fetch_prices(shared, PAIRS, timeout=0.5)
+    fetch_prices(shared, PAIRS, timeout=0.5)
+    assert seen == [(500, 10_000), (500, 10_000)]
+    assert shared.calls["fetch_tickers"] == 2
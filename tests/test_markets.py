@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from core import midas_markets
+from core.midas_fake_exchange import FakeExchange
+from core.midas_markets import MarketsCache, OrderSizeError
+from core.midas_paper_exchange import PaperExchange
+from core.midas_positions import PositionBook
+from core.midas_smart_order import execute_trade
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_disk_cache_skips_download_until_stale(tmp_path):
+    clock = Clock()
+    path = str(tmp_path / "markets_fake.json")
+    first = FakeExchange()
+    MarketsCache(first, path=path, ttl=3600, clock=clock).ensure()
+    assert first.calls["load_markets"] == 1
+    assert "info" not in json.loads(open(path).read())["markets"]["BTC/USDT"]
+
+    restarted = FakeExchange()
+    cache = MarketsCache(restarted, path=path, ttl=3600, clock=clock)
+    cache.ensure()
+    assert restarted.calls["load_markets"] == 0
+    assert restarted.markets["BTC/USDT"]["precision"]["amount"] == 1e-06  # installed via set_markets
+
+    clock.now += 3600
+    stale = MarketsCache(FakeExchange(), path=path, ttl=3600, clock=clock)
+    stale.ensure()
+    stale.refresh_async().join(timeout=5)
+    assert stale.exchange.calls["load_markets"] == 1 and stale.refreshes == 1
+    assert not stale.stale
+
+
+def test_normalize_order_floors_to_step_and_enforces_minimums(tmp_path):
+    cache = MarketsCache(FakeExchange(), path=str(tmp_path / "m.json"))
+    cache.refresh()
+    assert cache.normalize_order("XRP/USDT", 12.3456789, 0.55) == 12.34
+    assert cache.normalize_order("BTC/USDT", 0.000123456, 92500.0) == 0.000123
+    assert cache.normalize_order("NEW/USDT", 1.23456, 1.0) == 1.23456  # unknown symbols pass through
+    with pytest.raises(OrderSizeError):
+        cache.normalize_order("XRP/USDT", 1.5, 0.55)  # 0.8 USDT notional < 1 USDT minimum
+    with pytest.raises(OrderSizeError):
+        cache.normalize_order("BTC/USDT", 0.0000004, 92500.0)
+
+
+def test_paper_orders_follow_cached_market_rules(tmp_path, monkeypatch):
+    cache = MarketsCache(FakeExchange(), path=str(tmp_path / "m.json"))
+    cache.refresh()
+    monkeypatch.setattr(midas_markets, "_default", cache)
+    monkeypatch.setattr("core.midas_positions.log_trade", lambda *a, **k: None)
+    paper = PaperExchange(balances={"USDT": 1000.0}, fills_path=None, balances_path=None)
+    book = PositionBook(path=None, notify_changes=False)
+
+    result = execute_trade(exchange=paper, pair="XRP/USDT", side="buy", price=0.55, size=20.987, book=book)
+    assert result["size"] == 20.98
+    assert execute_trade(exchange=paper, pair="XRP/USDT", side="buy", price=0.55, size=0.5, book=book) is None
+    assert paper.fills == 1
@@ -0,0 +1,67 @@
+import json
+import random
+
+import requests
+
+from core import midas_metrics
+from core.midas_metrics import LatencyHistogram, MetricsRegistry, bucket_index, bucket_lower_bound
+
+
+def test_histogram_percentiles_within_bucket_precision():
+    rng = random.Random(7)
+    samples = sorted(rng.uniform(0.0001, 0.5) for _ in range(20_000))
+    histogram = LatencyHistogram()
+    for seconds in samples:
+        histogram.record(seconds)
+
+    for q in (0.5, 0.9, 0.99):
+        exact = samples[int(q * len(samples)) - 1] * 1e6
+        assert abs(histogram.percentile(q) - exact) / exact < 0.02
+    assert histogram.count == len(samples)
+    assert bucket_lower_bound(bucket_index(123_456)) <= 123_456 < bucket_lower_bound(bucket_index(123_456) + 1)
+
+
+def test_stage_and_counters_export_as_prometheus_text(monkeypatch):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(midas_metrics, "registry", registry)
+    monkeypatch.setattr(midas_metrics, "_stages", {})
+
+    with midas_metrics.stage("fetch"):
+        pass
+
+    @midas_metrics.stage("execute_trade")
+    def trade():
+        return "filled"
+
+    assert trade() == "filled"
+    midas_metrics.count("midas_orders_total", mode="PAPER", side="buy")
+    midas_metrics.count("midas_orders_total", mode="PAPER", side="buy")
+
+    text = registry.prometheus()
+    assert '# TYPE midas_stage_latency_seconds summary' in text
+    assert 'midas_stage_latency_seconds_count{stage="fetch"} 1' in text
+    assert 'midas_stage_latency_seconds{stage="execute_trade",quantile="0.99"}' in text
+    assert 'midas_orders_total{mode="PAPER",side="buy"} 2' in text
+
+
+def test_http_endpoint_and_snapshot_file(monkeypatch, tmp_path):
+    registry = MetricsRegistry()
+    monkeypatch.setattr(midas_metrics, "registry", registry)
+    registry.counter("midas_price_updates_total").inc(50)
+    registry.histogram("midas_stage_latency_seconds", {"stage": "cycle"}).record(0.002)
+
+    server = midas_metrics.start_metrics_server(port=0, host="127.0.0.1")
+    try:
+        response = requests.get(f"http://127.0.0.1:{server.server_port}/metrics", timeout=5)
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert response.status_code == 200
+    assert "midas_price_updates_total 50" in response.text
+
+    path = tmp_path / "metrics_snapshot.json"
+    registry.write_snapshot(str(path))
+    snapshot = json.loads(path.read_text())
+    assert snapshot["counters"]["midas_price_updates_total"] == 50
+    assert snapshot["rates_per_sec"]["midas_price_updates_total"] > 0
+    assert snapshot["latency"]['midas_stage_latency_seconds{stage="cycle"}']["count"] == 1
@@ -0,0 +1,48 @@
+import threading
+import time
+
+from core.midas_notifier import TelegramDispatcher, build_digests
+
+
+def test_build_digests_respects_length_limit():
+    digests = build_digests(["a" * 30, "b" * 30, "c" * 30], max_length=70)
+    assert digests == ["a" * 30 + "\n\n" + "b" * 30, "c" * 30]
+    assert build_digests(["x" * 25], max_length=10) == ["x" * 10, "x" * 10, "x" * 5]
+
+
+def test_notify_is_non_blocking_and_bursts_are_merged():
+    sent = []
+    release = threading.Event()
+
+    def slow_sender(text):
+        release.wait(5)
+        sent.append(text)
+        return True
+
+    dispatcher = TelegramDispatcher(sender=slow_sender, min_interval=0, digest_window=0.05).start()
+
+    start = time.perf_counter()
+    for i in range(100):
+        dispatcher.notify(f"msg {i}")
+    assert time.perf_counter() - start < 0.05
+
+    release.set()
+    assert dispatcher.stop(timeout=5)
+    assert len(sent) < 100
+    assert "\n\n".join(sent).split("\n\n") == [f"msg {i}" for i in range(100)]
+
+
+def test_sender_failures_do_not_stop_the_dispatcher():
+    calls = []
+
+    def broken_sender(text):
+        calls.append(text)
+        raise ConnectionError("telegram down")
+
+    dispatcher = TelegramDispatcher(sender=broken_sender, min_interval=0, digest_window=0).start()
+    dispatcher.notify("first")
+    assert dispatcher.flush(timeout=2)
+    dispatcher.notify("second")
+    assert dispatcher.stop(timeout=2)
+    assert calls == ["first", "second"]
+    assert dispatcher.failed == 2
@@ -0,0 +1,82 @@
+import json
+
+import pytest
+
+from core.midas_paper_exchange import PaperExchange, PaperOrderError
+
+
+def make_exchange(tmp_path, **kwargs):
+    kwargs.setdefault("balances", {"USDT": 10_000.0})
+    return PaperExchange(fills_path=str(tmp_path / "fills.jsonl"), balances_path=str(tmp_path / "balances.json"),
+                         **kwargs)
+
+
+def test_market_order_pays_spread_slippage_and_fees(tmp_path):
+    paper = make_exchange(tmp_path, fee_pct=0.001, slippage_bps=10)
+    paper.on_ticker("BTC/USDT", {"bid": 99.0, "ask": 101.0, "last": 100.0})
+
+    order = paper.create_order("BTC/USDT", "market", "buy", 10)
+    assert order["average"] == pytest.approx(101.0 * 1.001)
+    assert order["fee"]["cost"] == pytest.approx(10 * 101.0 * 1.001 * 0.001)
+    assert paper.balances["BTC"] == 10
+    assert paper.balances["USDT"] == pytest.approx(10_000 - 10 * 101.0 * 1.001 * 1.001)
+
+    with pytest.raises(PaperOrderError):
+        paper.create_order("BTC/USDT", "market", "buy", 1_000)
+
+
+def test_limit_order_rests_until_the_ticker_crosses(tmp_path):
+    paper = make_exchange(tmp_path, maker_fee_pct=0.0)
+    paper.on_ticker("XRP/USDT", {"bid": 0.549, "ask": 0.551, "last": 0.55})
+    order = paper.create_order("XRP/USDT", "limit", "buy", 100, 0.54)
+    assert order["status"] == "open"
+    assert paper.fetch_open_orders("XRP/USDT") == [order]
+
+    assert paper.on_ticker("XRP/USDT", {"bid": 0.541, "ask": 0.545, "last": 0.543}) == []
+    [filled] = paper.on_ticker("XRP/USDT", {"bid": 0.538, "ask": 0.539, "last": 0.539})
+    assert filled["status"] == "closed" and filled["average"] == 0.54
+    assert paper.fetch_open_orders() == []
+
+
+def test_market_order_walks_the_order_book(tmp_path):
+    paper = make_exchange(tmp_path, fee_pct=0.0)
+    paper.on_order_book("SOL/USDT", {"bids": [[129.9, 5]], "asks": [[130.0, 1], [130.5, 2], [131.0, 10]]})
+    order = paper.create_order("SOL/USDT", "market", "buy", 3)
+    assert order["average"] == pytest.approx((130.0 + 2 * 130.5) / 3)
+
+
+
+def test_newer_ticker_replaces_a_stale_order_book(tmp_path):
+    paper = make_exchange(tmp_path, fee_pct=0.0, slippage_bps=0.0)
+    paper.on_order_book("SOL/USDT", {"bids": [[129.9, 5]], "asks": [[130.0, 10]], "timestamp": 1_000})
+    paper.on_ticker("SOL/USDT", {"bid": 139.9, "ask": 140.0, "last": 140.0, "timestamp": 2_000})
+    order = paper.create_order("SOL/USDT", "market", "buy", 1)
+    assert order["average"] == pytest.approx(140.0)
+
+def test_unfunded_resting_order_is_rejected_without_raising(tmp_path):
+    paper = make_exchange(tmp_path, balances={"USDT": 100.0}, maker_fee_pct=0.0)
+    paper.on_ticker("BTC/USDT", 100.0)
+    first = paper.create_order("BTC/USDT", "limit", "buy", 0.9, 95.0)
+    second = paper.create_order("BTC/USDT", "limit", "buy", 0.9, 95.0)
+
+    [filled] = paper.on_ticker("BTC/USDT", 94.0)
+    assert filled is first and first["status"] == "closed"
+    assert second["status"] == "rejected"
+    assert paper.fetch_open_orders() == []
+    assert paper.balances["USDT"] == pytest.approx(100.0 - 0.9 * 95.0)
+
+
+def test_fills_are_persisted_in_batches(tmp_path):
+    paper = make_exchange(tmp_path, balances={"USDT": 1e12}, flush_size=5000)
+    paper.on_ticker("BTC/USDT", 100.0)
+    fills_file = tmp_path / "fills.jsonl"
+
+    n = 20_000
+    for i in range(n):
+        paper.create_order("BTC/USDT", "market", "buy" if i % 2 == 0 else "sell", 0.01)
+
+    paper.close()
+    lines = fills_file.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == n
+    assert json.loads(lines[-1])["side"] == "sell"
+    assert json.loads((tmp_path / "balances.json").read_text())["BTC"] == pytest.approx(0.0, abs=1e-9)
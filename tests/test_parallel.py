@@ -0,0 +1,24 @@
+from extras.midas_parallel import SharedCandles, attach_candles, evaluate_parallel, evaluate_serial
+from tests.test_backtest_engine import CFG, make_candles
+
+
+def test_shared_candles_round_trip():
+    data = {"df5": make_candles(500)}
+    with SharedCandles(data) as shared:
+        attached, blocks = attach_candles(shared.spec)
+        for column, values in data["df5"].items():
+            assert (attached["df5"][column] == values).all()
+        del attached
+        for block in blocks:
+            block.close()
+
+
+def test_parallel_matches_serial():
+    c5 = make_candles(2000)
+    data = {"df5": c5, "df15": {k: v[::3] for k, v in c5.items()}, "pair": "TEST"}
+    configs = [dict(CFG, ema_fast=f, take_profit=tp) for f in (6, 8, 10) for tp in (1.6, 1.8)]
+
+    serial = {tuple(sorted(c.items())): r for c, r, _ in evaluate_serial(configs, data)}
+    parallel = {tuple(sorted(c.items())): r for c, r, _ in evaluate_parallel(configs, data, workers=2, chunk_size=1)}
+
+    assert parallel == serial
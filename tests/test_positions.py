@@ -0,0 +1,66 @@
+import pytest
+
+from core import midas_positions
+from core.midas_positions import PositionBook
+
+
+@pytest.fixture
+def book(tmp_path, monkeypatch):
+    journal = []
+    monkeypatch.setattr(midas_positions, "log_trade", lambda *args, **kwargs: journal.append((args, kwargs)))
+    book = PositionBook(path=str(tmp_path / "positions.json"), notify_changes=False)
+    book.journal = journal
+    return book
+
+
+def test_take_profit_and_stop_loss_exits(book):
+    book.open("BTC/USDT", "buy", 100.0, 1.0, take_profit_pct=0.02, stop_loss_pct=0.01)
+    book.open("XRP/USDT", "sell", 1.0, 100.0, take_profit_pct=0.02, stop_loss_pct=0.01)
+
+    assert book.on_price("BTC/USDT", 101.0) == []
+    [tp] = book.on_price("BTC/USDT", 102.5)
+    assert tp.reason == "take_profit" and tp.profit == pytest.approx(2.5)
+
+    [sl] = book.on_price("XRP/USDT", 1.02)
+    assert sl.reason == "stop_loss" and sl.profit == pytest.approx(-2.0)
+    assert len(book) == 0
+
+
+def test_trailing_stop_follows_the_best_price(book):
+    position = book.open("SOL/USDT", "buy", 100.0, 1.0, stop_loss_pct=0.05, trailing_stop_pct=0.02)
+    for price in (101, 104, 110, 109):
+        assert book.on_price("SOL/USDT", price) == []
+    assert position.stop_loss == pytest.approx(107.8)
+
+    [event] = book.on_price("SOL/USDT", 107.5)
+    assert event.reason == "trailing_stop" and event.profit > 0
+
+
+def test_disk_writes_only_on_state_changes_and_restore(book, tmp_path):
+    book.open("BTC/USDT", "buy", 100.0, 1.0, take_profit_pct=0.5, trailing_stop_pct=0.1)
+    path = tmp_path / "positions.json"
+    mtime = path.stat().st_mtime_ns
+    for i in range(500):
+        book.on_price("BTC/USDT", 100.0 + i * 0.01)
+    assert path.stat().st_mtime_ns == mtime
+    assert len(book.journal) == 1
+
+    book.flush()  # trailing-stop progress is saved once, by the cycle's flush
+    restored = PositionBook(path=str(path), notify_changes=False)
+    assert restored.has_position("BTC/USDT")
+    [position] = restored.positions("BTC/USDT")
+    assert position.extreme == pytest.approx(104.99) and position.trailing_active
+    assert restored.open("BTC/USDT", "buy", 100.0, 1.0).id == 2
+
+
+def test_failed_exit_order_keeps_the_position_open(book):
+    book.open("BTC/USDT", "buy", 100.0, 1.0, take_profit_pct=0.02)
+    journaled = len(book.journal)
+
+    assert book.on_price("BTC/USDT", 102.5, execute=lambda event: None) == []
+    assert book.has_position("BTC/USDT") and book.closed == 0
+    assert len(book.journal) == journaled
+
+    [event] = book.on_price("BTC/USDT", 102.6, execute=lambda event: 2.4)
+    assert event.profit == 2.4 and len(book) == 0
+    assert book.journal[-1][1]["profit"] == 2.4
@@ -0,0 +1,59 @@
+import csv
+
+import pytest
+
+from extras.midas_result_store import ResultStore, config_hash
+
+BASE = {"rsi_bullish": 50, "rsi_bearish": 46, "adx_min": 16, "ema_fast": 8, "ema_slow": 40,
+        "take_profit": 1.6, "stop_mult": 1.3}
+
+
+def test_quantized_keys_match_float_arithmetic():
+    drifted = dict(BASE, take_profit=1.6 - 0.2, stop_mult=1.1 + 0.2, rsi_bullish=50.0)
+    assert 1.6 - 0.2 != 1.4
+    assert config_hash(drifted) == config_hash(dict(BASE, take_profit=1.4, stop_mult=1.3))
+    assert config_hash(BASE, 1.0) != config_hash(BASE, 1 / 3)
+
+
+def test_results_append_as_they_finish_and_resume(tmp_path):
+    path = str(tmp_path / "results.jsonl")
+    store = ResultStore(path)
+    configs = [dict(BASE, take_profit=tp) for tp in (1.6 - 0.2, 1.6, 1.6 + 0.2)]
+    assert store.add(configs[0], {"score": 0.5, "trades": 10})
+    assert store.add(configs[1], {"score": 0.9, "trades": 12})
+    assert not store.add(dict(BASE, take_profit=1.4), {"score": 0.1})  # same config, already stored
+    store.add(configs[2], {"score": 2.0}, fraction=1 / 9)  # partial-data evaluation
+    store.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"key": "torn')
+
+    resumed = ResultStore(path)
+    assert len(resumed) == 3
+    assert resumed.remaining(configs) == [configs[2]]
+    best = resumed.best()
+    assert best["score"] == 0.9 and best["take_profit"] == 1.6 and "budget" not in best
+    assert len(resumed.completed()) == 3
+
+
+def test_legacy_progress_csv_is_imported(tmp_path):
+    legacy = tmp_path / "progress.csv"
+    with open(legacy, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["score", "trades", *BASE])
+        writer.writeheader()
+        writer.writerow({"score": 0.7, "trades": 5, **dict(BASE, take_profit=1.6 - 0.2)})
+        writer.writerow({"score": 0.8, "trades": 6, **BASE})
+
+    store = ResultStore(str(tmp_path / "results.jsonl"))
+    assert store.import_csv(str(legacy)) == 2
+    assert store.has(dict(BASE, take_profit=1.4)) and store.has(BASE)
+    assert next(store.iter_rows())["trades"] == 5
+
+
+def test_excel_export_streams_every_row(tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    store = ResultStore(str(tmp_path / "results.jsonl"))
+    for i in range(5):
+        store.add(dict(BASE, adx_min=10 + i), {"score": i / 10})
+    assert store.export_excel(str(tmp_path / "results.xlsx")) == 5
+    rows = list(openpyxl.load_workbook(tmp_path / "results.xlsx").active.values)
+    assert rows[0][0] == "score" and len(rows) == 6
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta, timezone
+
+from core.midas_scheduler import Scheduler, next_daily_time
+
+
+class FakeClock:
+    def __init__(self, start=datetime(2025, 1, 1, 22, 0, tzinfo=timezone.utc)):
+        self.mono = 1000.0
+        self.start = start
+
+    def monotonic(self):
+        return self.mono
+
+    def wall(self):
+        return self.start + timedelta(seconds=self.mono - 1000.0)
+
+
+def test_fixed_rate_jobs_do_not_drift_with_run_time():
+    clock = FakeClock()
+    scheduler = Scheduler(clock=clock.monotonic, wall_clock=clock.wall)
+    runs = []
+
+    def slow_job():
+        runs.append(clock.mono)
+        clock.mono += 0.5  # each run takes half of its 1s cadence
+
+    scheduler.every("poll", 1.0, slow_job)
+    for _ in range(10):
+        wait = scheduler.run_pending()
+        clock.mono += wait
+    assert runs == [1000.0 + i for i in range(10)]
+    assert scheduler.stats()["poll"]["overruns"] == 0
+
+
+def test_overrun_skips_missed_slots_and_is_counted():
+    clock = FakeClock()
+    scheduler = Scheduler(clock=clock.monotonic, wall_clock=clock.wall)
+    durations = iter([3.5, 0.0, 0.0])
+    runs = []
+
+    def job():
+        runs.append(clock.mono)
+        clock.mono += next(durations)
+
+    scheduler.every("poll", 1.0, job)
+    for _ in range(3):
+        wait = scheduler.run_pending()
+        clock.mono += wait
+    assert runs == [1000.0, 1004.0, 1005.0]
+    stats = scheduler.stats()["poll"]
+    assert stats["overruns"] == 1 and stats["skipped"] == 3
+
+
+def test_daily_job_fires_exactly_once_even_when_loop_is_late():
+    clock = FakeClock()  # 22:00 UTC = 23:00 at UTC+1
+    scheduler = Scheduler(clock=clock.monotonic, wall_clock=clock.wall)
+    fired = []
+    scheduler.daily("reset", 0, lambda: fired.append(clock.wall()), tz_offset=timedelta(hours=1))
+
+    assert scheduler.time_until_next() == 3600.0
+    clock.mono += 3600.0 + 420  # loop was busy for 7 minutes past midnight
+    scheduler.run_pending()
+    scheduler.run_pending()
+    assert len(fired) == 1
+    assert scheduler.stats()["reset"]["max_lag"] == 420.0
+    # next occurrence is the following midnight
+    assert scheduler.time_until_next() == 86400.0 - 420
+
+
+def test_daily_job_fires_once_per_day_when_clocks_drift():
+    clock = FakeClock()
+    clock.wall = lambda: clock.start + timedelta(seconds=(clock.mono - 1000.0) * (1 - 100e-6))  # wall 100 ppm slow
+    scheduler = Scheduler(clock=clock.monotonic, wall_clock=clock.wall)
+    fired = []
+    scheduler.daily("reset", 0, lambda: fired.append(clock.wall()), tz_offset=timedelta(hours=1))
+
+    while clock.mono < 1000.0 + 2 * 86400:
+        clock.mono += scheduler.run_pending()
+    assert len(fired) == 2
+    assert fired[1] - fired[0] > timedelta(hours=23)
+
+
+def test_next_daily_time_rolls_to_tomorrow():
+    now = datetime(2025, 1, 1, 23, 30, tzinfo=timezone.utc)
+    assert next_daily_time(0, now=now) == datetime(2025, 1, 2, 0, 0, tzinfo=timezone.utc)
+    assert next_daily_time(0, tz_offset=timedelta(hours=1), now=now) == datetime(2025, 1, 2, 23, 0, tzinfo=timezone.utc)
@@ -0,0 +1,64 @@
+import math
+
+from extras.midas_search import (SuccessiveHalving, build_search_space, config_key, get_strategy,
+                                 run_search, snap)
+
+BASE = {"rsi_bullish": 52, "rsi_bearish": 46, "adx_min": 14, "ema_fast": 8,
+        "ema_slow": 30, "take_profit": 1.8, "stop_mult": 1.1}
+TARGET = {"rsi_bullish": 55, "rsi_bearish": 43, "adx_min": 18, "ema_fast": 10,
+          "ema_slow": 40, "take_profit": 2.1, "stop_mult": 0.9}
+
+
+def toy_evaluate(tasks):
+    """Score peaks at TARGET; smaller data windows add a fixed penalty."""
+    for cfg, fraction in tasks:
+        distance = sum(((cfg[k] - TARGET[k]) / (TARGET[k] or 1)) ** 2 for k in TARGET)
+        yield cfg, fraction, {"score": 100 * math.exp(-distance) - (1 - fraction)}, None
+
+
+def test_snap_stays_on_grid():
+    assert snap(1.2345, 0.1, 2.0, 0.1) == 1.2
+    assert snap(99, 1, 60, 1) == 60
+    assert snap(-5, 2, 13, 1) == 2
+
+
+def test_strategies_improve_on_base_and_respect_budget():
+    space = build_search_space(BASE)
+    base_score = next(toy_evaluate([(BASE, 1.0)]))[2]["score"]
+    for name in ("random", "lhs", "halving", "tpe"):
+        strategy = get_strategy(name, space, budget=80, patience=0, seed=3)
+        list(run_search(strategy, toy_evaluate))
+        assert strategy.best_score > base_score, name
+        assert strategy.spent < 80 + 32, name
+
+
+def test_halving_grows_data_window_for_survivors():
+    strategy = SuccessiveHalving(build_search_space(BASE), eta=3, min_fraction=1 / 9, budget=9, patience=0)
+    fractions = [fraction for _, fraction, _ in run_search(strategy, toy_evaluate)]
+    assert fractions[:27] == [1 / 9] * 27
+    assert fractions[27:36] == [1 / 3] * 9
+    assert fractions[36:39] == [1.0] * 3
+
+
+def test_early_stop_when_score_plateaus():
+    flat = lambda tasks: ((cfg, f, {"score": 1.0}, None) for cfg, f in tasks)
+    strategy = get_strategy("random", build_search_space(BASE), budget=1000, patience=10, batch_size=4)
+    list(run_search(strategy, flat))
+    assert strategy.plateaued and strategy.spent < 20
+
+
+def test_resume_replays_completed_results():
+    space = build_search_space(BASE)
+    first = get_strategy("tpe", space, budget=40, patience=0, seed=5)
+    completed = {config_key(cfg, f): r for cfg, f, r in run_search(first, toy_evaluate)}
+
+    calls = []
+
+    def counting(tasks):
+        calls.extend(tasks)
+        return toy_evaluate(tasks)
+
+    second = get_strategy("tpe", space, budget=40, patience=0, seed=5)
+    list(run_search(second, counting, dict(completed)))
+    assert calls == []
+    assert second.best_score == first.best_score
@@ -0,0 +1,66 @@
+from extras.midas_sheets_logger import COLUMNS, FakeWorksheet, SheetsExporter
+
+
+class QuotaError(Exception):
+    def __init__(self):
+        super().__init__("APIError: [429]: Quota exceeded for quota metric 'Write requests'")
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def trade(i):
+    return {"time": f"2025-01-01 00:00:{i:02d}", "pair": "XRP/USDT", "signal": "buy", "profit": i}
+
+
+def test_rows_are_exported_in_batches_through_one_authorized_worksheet(tmp_path):
+    opened = []
+    sheet = FakeWorksheet()
+    exporter = SheetsExporter(spool_path=str(tmp_path / "spool.jsonl"), batch_size=4, flush_interval=60,
+                              opener=lambda: opened.append(1) or sheet)
+    for i in range(10):
+        exporter.log(trade(i))
+    assert opened == [] and sheet.calls == 0  # log() never exports on the caller's thread
+    exporter.close()
+
+    assert opened == [1]
+    assert sheet.calls == 3  # 4 + 4 + 2
+    assert sheet.value_input_option == "RAW"
+    assert [row[COLUMNS.index("profit")] for row in sheet.rows] == list(range(10))
+    assert (tmp_path / "spool.jsonl").read_text() == ""
+
+
+def test_quota_errors_back_off_and_keep_the_rows(tmp_path):
+    clock = Clock()
+    sheet = FakeWorksheet(failures=[QuotaError(), QuotaError()])
+    exporter = SheetsExporter(sheet, spool_path=str(tmp_path / "spool.jsonl"), flush_interval=60,
+                              retry_backoff=5.0, clock=clock)
+    exporter.log(trade(1))
+
+    assert exporter.flush() == 0 and exporter.flush() == 0  # second call is inside the backoff window
+    assert sheet.calls == 1
+    clock.now = 5.0
+    assert exporter.flush() == 0 and exporter._backoff == 10.0
+    clock.now = 15.0
+    assert exporter.flush() == 1
+    assert len(sheet.rows) == 1 and exporter.queue == [] and exporter._backoff == 0.0
+
+
+def test_unsent_rows_survive_a_restart(tmp_path):
+    spool = str(tmp_path / "spool.jsonl")
+    down = SheetsExporter(FakeWorksheet(failures=[ConnectionError("offline")]), spool_path=spool, flush_interval=60)
+    down.log(trade(1))
+    down.log(trade(2))
+    down.flush()
+    with open(spool, "a", encoding="utf-8") as f:
+        f.write('["2025-01-01 00:00:03", "XRP')  # torn write of a crashed process
+
+    sheet = FakeWorksheet()
+    restarted = SheetsExporter(sheet, spool_path=spool, flush_interval=60)
+    assert restarted.flush() == 2
+    assert [row[0] for row in sheet.rows] == ["2025-01-01 00:00:01", "2025-01-01 00:00:02"]
@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from core import midas_logger, midas_storage
+from core.midas_capital_tracker import CapitalLedger
+from core.midas_storage import SQLiteStore
+from core.midas_trade_journal import TradeJournal
+
+
+def trade(i, pair="XRP/USDT", profit=None):
+    entry = {"timestamp": f"2025-01-{1 + i % 28:02d} 12:00:00", "pair": pair, "side": "sell",
+             "price": 0.5, "size": 10.0, "result": "win" if profit and profit > 0 else "loss"}
+    if profit is not None:
+        entry["profit"] = profit
+    return entry
+
+
+def test_batched_trades_and_indexed_pair_queries(tmp_path):
+    store = SQLiteStore(str(tmp_path / "midas.db"), batch_size=100, flush_interval=60)
+    for i in range(280):
+        for pair in ("XRP/USDT", "BTC/USDT"):
+            store.add_trade(trade(i, pair, profit=1.0 if i % 3 else -2.0))
+    assert len(store._pending) == 60  # five batches written, the rest still buffered
+    assert store.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    week = store.pair_pnl("XRP/USDT", "2025-01-01", "2025-01-08")
+    expected = [1.0 if i % 3 else -2.0 for i in range(280) if 1 + i % 28 < 8]
+    assert week == {"pair": "XRP/USDT", "trades": len(expected), "wins": sum(p > 0 for p in expected),
+                    "losses": sum(p < 0 for p in expected), "pnl": sum(expected)}
+    assert set(store.pnl_by_pair()) == {"BTC/USDT", "XRP/USDT"}
+    plan = " ".join(row[-1] for row in store.conn.execute("EXPLAIN QUERY PLAN " + midas_storage.PAIR_PNL,
+                                                          ("XRP/USDT", "", "z")))
+    assert "idx_trades_pair_timestamp" in plan
+    assert store.tail(2) == [trade(279, "XRP/USDT", profit=-2.0), trade(279, "BTC/USDT", profit=-2.0)]
+    store.close()
+
+
+def test_json_history_is_imported_once(tmp_path):
+    journal = TradeJournal(str(tmp_path / "trade_log.jsonl"), legacy_path=None)
+    journal.append_many([trade(i) for i in range(5)])
+    (tmp_path / "capital.json").write_text(json.dumps({"capital": 150.0, "current_balance": 150.0}))
+    (tmp_path / "summary.json").write_text(json.dumps([{"date": "2025-01-01", "trades_today": 5}]))
+
+    store = SQLiteStore(str(tmp_path / "midas.db"))
+    args = (journal, str(tmp_path / "capital.json"), str(tmp_path / "summary.json"))
+    assert store.migrate_from_json(*args) == 7
+    assert store.migrate_from_json(*args) == 0
+    assert store.trades() == [trade(i) for i in range(5)]
+    assert store.summaries("2025-01-01", "2025-01-02") == [{"date": "2025-01-01", "trades_today": 5}]
+
+    ledger = CapitalLedger(path=None, flush_interval=0, store=store)
+    assert ledger.current_balance == 150.0
+    ledger.record(5.0, is_win=True)
+    assert store.load_capital()["current_balance"] == 155.0
+    store.close()
+
+
+def test_failed_or_missing_import_is_retried(tmp_path):
+    class BrokenJournal:
+        def iter_entries(self):
+            yield trade(0)
+            raise OSError("disk error")
+
+    store = SQLiteStore(str(tmp_path / "midas.db"))
+    with pytest.raises(OSError):
+        store.migrate_from_json(BrokenJournal())
+    assert store.trades() == []
+    assert store.migrate_from_json(capital_path=str(tmp_path / "capital.json")) == 0
+
+    journal = TradeJournal(str(tmp_path / "trade_log.jsonl"), legacy_path=None)
+    journal.append_many([trade(i) for i in range(3)])
+    (tmp_path / "capital.json").write_text(json.dumps({"capital": 120.0, "current_balance": 120.0}))
+    assert store.migrate_from_json(journal, str(tmp_path / "capital.json")) == 4
+    assert store.load_capital()["current_balance"] == 120.0
+    store.close()
+
+
+def test_logger_api_switches_backend(tmp_path, monkeypatch):
+    store = SQLiteStore(str(tmp_path / "midas.db"), flush_interval=60)
+    monkeypatch.setattr(midas_storage, "STORAGE_BACKEND", "sqlite")
+    monkeypatch.setattr(midas_storage, "_store", store)
+    midas_logger.log_trade("2025-01-02 10:00:00", "XRP/USDT", "buy", 0.5, 10)
+    midas_logger.log_trade("2025-01-02 11:00:00", "XRP/USDT", "sell", 0.55, 10, result="win", profit=0.5)
+
+    assert [t["side"] for t in midas_logger.query_trades("XRP/USDT", "2025-01-02")] == ["buy", "sell"]
+    assert midas_logger.pair_pnl("XRP/USDT")["pnl"] == 0.5
+    store.close()
@@ -0,0 +1,108 @@
+import multiprocessing
+import os
+
+from benchmarks.run_benchmarks import isolated_state, quiet, telegram_stub
+from core.midas_capital_tracker import load_capital
+from core.midas_fake_exchange import FakeExchange
+from core.midas_supervisor import RiskLedger, Supervisor, parse_universe, shard_universe, worker_paths
+
+
+def _close_trades(risk):
+    risk.reserve(40.0)
+    risk.record_close("XRP/USDT", -2.0, "2025-01-01", notional=10.0)
+    risk.record_close("BTC/USDT", 5.0, "2025-01-01")
+    risk.set_halted(True)
+
+
+def _crash_once(shard, risk, events, stop, config):
+    marker = os.path.join(config["state_dir"], f"{shard.name}.started")
+    if not os.path.exists(marker):
+        open(marker, "w").close()
+        os._exit(1)
+    events.put(("ready", shard.name, os.getpid()))
+    risk.record_close(shard.pairs[0], -1.5, "2025-01-01")
+    stop.wait(10)
+
+
+def _fake_exchange(name):
+    return FakeExchange(seed=1)
+
+
+def test_universe_parsing_and_stable_shards():
+    universe = parse_universe("mexc:XRP/USDT,BTC/USDT,binance:ETH/USDT,SOL/USDT,mexc:BTC/USDT", default_exchange="mexc")
+    assert universe == [("mexc", "XRP/USDT"), ("mexc", "BTC/USDT"), ("binance", "ETH/USDT"), ("binance", "SOL/USDT")]
+
+    pairs = [("mexc", f"COIN{i}/USDT") for i in range(300)]
+    shards = shard_universe(pairs, 8)
+    assert len(shards) == 8 and all(shard.exchange == "mexc" for shard in shards)
+    assert sorted(p for shard in shards for p in shard.pairs) == sorted(p for _, p in pairs)
+    owner = {pair: shard.index for shard in shards for pair in shard.pairs}
+    assert all(owner[pair] == shard.index for shard in shard_universe(pairs[:150], 8) for pair in shard.pairs)
+
+
+def test_risk_ledger_is_shared_across_processes():
+    context = multiprocessing.get_context("spawn")
+    risk = RiskLedger(100.0, slots=2, max_exposure=0.5, context=context)
+    child = context.Process(target=_close_trades, args=(risk.bind(1),))
+    child.start()
+    child.join(30)
+
+    assert child.exitcode == 0
+    assert risk.balance == 103.0 and risk.daily_loss == 2.0 and risk.halted
+    assert risk.exposure == 30.0
+    assert risk.reserve(20.0) and not risk.reserve(5.0)  # 50 of 103 * 0.5 used
+    risk.reset_daily()
+    assert not risk.halted and risk.daily_loss == 0.0
+    assert risk.balance == 103.0  # a close not yet drained by the supervisor is kept
+
+
+def test_supervisor_restarts_crashed_worker_and_persists_trades(tmp_path):
+    with telegram_stub() as server, isolated_state(f"http://127.0.0.1:{server.server_port}"), quiet():
+        supervisor = Supervisor([("mexc", "XRP/USDT")], workers=1, target=_crash_once,
+                                config={"state_dir": str(tmp_path)}, restart_backoff=0.05)
+        supervisor.start()
+        supervisor.run(stop=lambda: supervisor.trades >= 1, check_interval=0.05)
+        balance = load_capital()["current_balance"]
+
+    assert supervisor.restarts == {"mexc-0": 1}
+    assert supervisor.ready == {"mexc-0"}
+    assert balance == 100.0 - 1.5
+
+
+def test_workers_run_trading_sessions_on_their_shards(tmp_path):
+    config = {"state_dir": str(tmp_path), "exchange_factory": _fake_exchange, "poll_interval": 0.05}
+    universe = [("fake", pair) for pair in ("XRP/USDT", "BTC/USDT", "SOL/USDT")]
+    with telegram_stub() as server, isolated_state(f"http://127.0.0.1:{server.server_port}"), quiet():
+        supervisor = Supervisor(universe, workers=3, config=config)
+        supervisor.start()
+        supervisor.run(stop=lambda: len(supervisor.ready) == len(supervisor.shards), check_interval=0.05)
+
+    assert len(supervisor.shards) == 2
+    assert all(process.exitcode == 0 for process in supervisor.processes.values())
+    assert len({worker_paths(str(tmp_path), shard)["journal"] for shard in supervisor.shards}) == 2
+    assert sum(supervisor.restarts.values()) == 0
+
+
+def test_session_routes_closes_through_the_shared_ledger(monkeypatch):
+    monkeypatch.setattr("core.midas_positions.log_trade", lambda *a, **k: None)
+    from queue import Queue
+
+    from core.midas_paper_exchange import PaperExchange
+    from core.midas_positions import PositionBook
+    from core.midas_session import TradingSession
+
+    book = PositionBook(path=None, notify_changes=False)
+    book.open("XRP/USDT", "buy", 0.5, 100.0, take_profit_pct=0.02)
+    events = Queue()
+    risk = RiskLedger(100.0, context=multiprocessing.get_context("spawn")).bind(0, events)
+    paper = PaperExchange(balances={"USDT": 1000.0, "XRP": 100.0}, fee_pct=0.0, slippage_bps=0, spread_bps=0,
+                          fills_path=None, balances_path=None)
+    with quiet():
+        session = TradingSession(FakeExchange(), ["XRP/USDT"], positions=book, paper=paper, risk=risk)
+        assert risk.exposure == 50.0
+        session.handle_price("XRP/USDT", 0.52, 0)
+
+    assert risk.exposure == 0.0 and round(risk.balance, 6) == 102.0
+    assert session.capital["current_balance"] == risk.balance
+    kind, pair, profit, _ = events.get_nowait()
+    assert (kind, pair, round(profit, 6)) == ("trade", "XRP/USDT", 2.0)
@@ -0,0 +1,30 @@
+from core import midas_telegram
+
+
+class FakeResponse:
+    def __init__(self, status_code, text):
+        self.status_code, self.text = status_code, text
+
+    def json(self):
+        raise ValueError("not JSON")
+
+
+class FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+
+    def post(self, url, data=None, timeout=None):
+        return self.responses.pop(0)
+
+
+def test_rate_limit_with_a_non_json_body_backs_off_and_retries(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(midas_telegram, "BOT_TOKEN", "token")
+    monkeypatch.setattr(midas_telegram, "CHAT_ID", "chat")
+    monkeypatch.setattr(midas_telegram, "TELEGRAM_API_URL", "http://telegram.invalid/sendMessage")
+    monkeypatch.setattr(midas_telegram, "_session",
+                        FakeSession([FakeResponse(429, "<html>Too Many Requests</html>"), FakeResponse(200, "ok")]))
+    monkeypatch.setattr(midas_telegram.time, "sleep", sleeps.append)
+
+    assert midas_telegram.send_telegram_message("hello") is True
+    assert sleeps == [2]
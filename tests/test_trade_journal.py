@@ -0,0 +1,55 @@
+import json
+
+from core.midas_trade_journal import TradeJournal
+
+
+def make_journal(tmp_path, **kwargs):
+    return TradeJournal(
+        path=str(tmp_path / "trade_log.jsonl"),
+        legacy_path=str(tmp_path / "trade_log.json"),
+        **kwargs
+    )
+
+
+def test_append_and_read_back(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.append({"pair": "XRP/USDT", "price": 0.5})
+    journal.append_many([{"pair": "BTC/USDT", "price": 1.0}, {"pair": "SOL/USDT", "price": 2.0}])
+
+    assert [t["pair"] for t in journal.read_all()] == ["XRP/USDT", "BTC/USDT", "SOL/USDT"]
+    assert journal.tail(1) == [{"pair": "SOL/USDT", "price": 2.0}]
+
+
+def test_migrates_legacy_array_once(tmp_path):
+    legacy = tmp_path / "trade_log.json"
+    legacy.write_text(json.dumps([{"pair": "XRP/USDT"}, {"pair": "BTC/USDT"}], indent=4))
+
+    journal = make_journal(tmp_path)
+    journal.append({"pair": "SOL/USDT"})
+
+    assert [t["pair"] for t in journal.read_all()] == ["XRP/USDT", "BTC/USDT", "SOL/USDT"]
+    assert not legacy.exists()
+    assert (tmp_path / "trade_log.json.migrated").exists()
+
+
+def test_recovery_drops_only_torn_tail(tmp_path):
+    path = tmp_path / "trade_log.jsonl"
+    path.write_text('{"pair": "XRP/USDT"}\n{"pair": "BTC/USDT"}\n{"pair": "SOL')
+
+    journal = make_journal(tmp_path)
+    assert [t["pair"] for t in journal.read_all()] == ["XRP/USDT", "BTC/USDT"]
+
+    journal.append({"pair": "SOL/USDT"})
+    assert [t["pair"] for t in journal.read_all()] == ["XRP/USDT", "BTC/USDT", "SOL/USDT"]
+
+
+def test_segments_rotate_and_read_in_order(tmp_path):
+    journal = make_journal(tmp_path, segment_max_bytes=64)
+    for i in range(20):
+        journal.append({"n": i})
+
+    assert len(journal.segments()) > 1
+    assert [t["n"] for t in journal.read_all()] == list(range(20))
+
+    journal.reset()
+    assert journal.read_all() == []